@@ -5,4 +5,6 @@ set -o errexit
 make install
 
 python manage.py collectstatic --no-input
-python manage.py migrate
\ No newline at end of file
+python manage.py migrate
+# Missing partitions only leave rows in the default one: never block a deploy.
+python manage.py create_task_event_partitions || echo "Partitions of the task history were not created."
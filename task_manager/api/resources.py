@@ -0,0 +1,120 @@
+"""
+The JSON form of each model, and the query that reads just what it needs.
+
+`fields=` lists the fields to return and only those columns are
+selected. `include=` embeds related objects in place of their ids:
+foreign keys are joined, many-to-many relations prefetched in one more
+query, so a page costs the same number of queries whatever its size.
+"""
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db.models import Prefetch
+from django.utils.translation import gettext as _
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+
+def split(value: str) -> list:
+    return [name for name in (value or '').split(',') if name]
+
+
+class Resource:
+    model = None
+    # Plain fields, in output order; 'id' is always returned.
+    fields = ('id',)
+    # Relation name -> resource of the related model.
+    foreign_keys = {}
+    many = {}
+
+    @classmethod
+    def field_names(cls) -> tuple:
+        return cls.fields + tuple(cls.foreign_keys) + tuple(cls.many)
+
+    @classmethod
+    def parse(cls, params) -> tuple:
+        """(fields, include) of the query string."""
+        include = split(params.get('include'))
+        for name in include:
+            if name not in cls.foreign_keys and name not in cls.many:
+                raise ValidationError({'include': _(
+                    'Cannot include %(name)s.'
+                ) % {'name': name}})
+        fields = split(params.get('fields')) or list(cls.field_names())
+        for name in fields:
+            if name not in cls.field_names():
+                raise ValidationError({'fields': _(
+                    'Unknown field %(name)s.'
+                ) % {'name': name}})
+        fields = ['id'] + [name for name in fields if name != 'id']
+        return fields + [name for name in include if name not in fields], \
+            include
+
+    @classmethod
+    def columns(cls, prefix: str = '') -> list:
+        return [f'{prefix}{name}' for name in cls.fields]
+
+    @classmethod
+    def select(cls, queryset, fields, include, keep=()):
+        """`queryset` reading the columns of `fields` and `keep` only."""
+        only, joined, prefetched = set(keep), [], []
+        for name in fields:
+            if name in cls.foreign_keys and name in include:
+                joined.append(name)
+                only.update(cls.foreign_keys[name].columns(f'{name}__'))
+            elif name in cls.many:
+                related = cls.many[name]
+                columns = related.columns() if name in include else ['id']
+                prefetched.append(Prefetch(
+                    name, queryset=related.model.objects.only(*columns)
+                ))
+            else:
+                only.add(name)
+        if joined:
+            # With no arguments it would join every foreign key.
+            queryset = queryset.select_related(*joined)
+        return queryset.prefetch_related(*prefetched).only(*only)
+
+    @classmethod
+    def serialize(cls, obj, fields=None, include=()) -> dict:
+        data = {}
+        for name in fields or cls.fields:
+            if name in cls.foreign_keys:
+                related = getattr(obj, name) if name in include else None
+                data[name] = cls.foreign_keys[name].serialize(related) \
+                    if related else getattr(obj, f'{name}_id')
+            elif name in cls.many:
+                related = getattr(obj, name).all()
+                data[name] = [cls.many[name].serialize(item)
+                              for item in related] if name in include \
+                    else [item.pk for item in related]
+            else:
+                data[name] = getattr(obj, name)
+        return data
+
+
+class StatusResource(Resource):
+    model = Status
+    fields = ('id', 'name', 'tasks_count', 'timestamp', 'updated_at')
+
+
+class LabelResource(Resource):
+    model = Label
+    fields = ('id', 'name', 'tasks_count', 'timestamp', 'updated_at')
+
+
+class UserResource(Resource):
+    model = get_user_model()
+    fields = ('id', 'username', 'first_name', 'last_name', 'date_joined')
+
+
+class TaskResource(Resource):
+    model = Task
+    fields = ('id', 'name', 'description', 'timestamp', 'updated_at')
+    foreign_keys = {
+        'status': StatusResource,
+        'author': UserResource,
+        'executor': UserResource,
+    }
+    many = {'labels': LabelResource}
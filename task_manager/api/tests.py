@@ -0,0 +1,363 @@
+import json
+from unittest import mock
+
+from django.test import TestCase, Client
+from django.test.utils import override_settings, CaptureQueriesContext
+from django.db import IntegrityError, connection
+from django.core.cache import cache
+from django.contrib.auth import get_user_model
+from task_manager.statuses.models import Status
+from task_manager.labels.models import Label
+from task_manager.tasks.batch import TaskBatch
+from task_manager.tasks.counters import reconcile_counters, reconcile_days
+from task_manager.tasks.models import Task, TaskDay, TaskEvent
+from task_manager.tasks.search import get_backend
+
+
+@override_settings(LANGUAGE_CODE='en-us')
+class ApiTests(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        user_model = get_user_model()
+        cls.user = user_model.objects.create_user(username='api',
+                                                  first_name='Api')
+        cls.other = user_model.objects.create_user(username='other')
+        cls.status = Status.objects.create(name='New')
+        cls.label = Label.objects.create(name='bug')
+        cls.tasks = []
+        for number in range(5):
+            task = Task.objects.create(
+                name=f'Task {number}', status=cls.status,
+                author=cls.user if number % 2 else cls.other,
+                executor=cls.user if number == 0 else None,
+            )
+            task.labels.add(cls.label)
+            cls.tasks.append(task)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get_json(self, url, status_code=200):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status_code, url)
+        return response.json()
+
+    def test_task_list(self):
+        data = self.get_json('/api/tasks/')
+        self.assertEqual([task['name'] for task in data['results']],
+                         [f'Task {number}' for number in range(5)])
+        self.assertEqual(data['results'][0], {
+            'id': self.tasks[0].id,
+            'name': 'Task 0',
+            'description': '',
+            'timestamp': self.tasks[0].timestamp.isoformat()[:23] + 'Z',
+            'updated_at': data['results'][0]['updated_at'],
+            'status': self.status.id,
+            'author': self.other.id,
+            'executor': self.user.id,
+            'labels': [self.label.id],
+        })
+        self.assertIsNone(data['next'])
+
+    def test_keyset_pages(self):
+        names, url = [], '/api/tasks/?limit=2&fields=name'
+        while url:
+            data = self.get_json(url)
+            names += [task['name'] for task in data['results']]
+            url = data['next']
+        self.assertEqual(names, [f'Task {number}' for number in range(5)])
+        self.assertIsNotNone(data['previous'])
+
+        names, url = [], '/api/tasks/?limit=2&fields=name&ordering=-name'
+        while url:
+            data = self.get_json(url)
+            names += [task['name'] for task in data['results']]
+            url = data['next']
+        self.assertEqual(names, [f'Task {number}'
+                                 for number in reversed(range(5))])
+
+    def test_filters(self):
+        data = self.get_json('/api/tasks/?self_tasks=on&fields=name')
+        self.assertEqual([task['name'] for task in data['results']],
+                         ['Task 1', 'Task 3'])
+        data = self.get_json(f'/api/tasks/?executor={self.user.id}')
+        self.assertEqual(len(data['results']), 1)
+        data = self.get_json('/api/tasks/?status=0', 400)
+        self.assertIn('status', data['errors'])
+
+    def test_sparse_fields(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_json('/api/tasks/?fields=name,executor')
+        self.assertEqual(data['results'][0],
+                         {'id': self.tasks[0].id, 'name': 'Task 0',
+                          'executor': self.user.id})
+        select = next(query['sql'] for query in queries
+                      if query['sql'].startswith('SELECT "tasks_task"'))
+        self.assertNotIn('description', select)
+        self.assertNotIn('JOIN', select)
+
+        data = self.get_json('/api/tasks/?fields=password', 400)
+        self.assertEqual(data, {'errors': {'fields':
+                                           ['Unknown field password.']}})
+
+    def test_include(self):
+        url = '/api/tasks/?fields=name&include=status,executor,labels'
+        self.get_json(url)
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_json(url)
+        self.assertEqual(data['results'][0]['status']['name'], 'New')
+        self.assertEqual(data['results'][0]['executor']['first_name'],
+                         'Api')
+        self.assertIsNone(data['results'][1]['executor'])
+        self.assertEqual(data['results'][0]['labels'][0]['name'], 'bug')
+
+        for number in range(5, 20):
+            Task.objects.create(name=f'Task {number}', status=self.status,
+                                author=self.user).labels.add(self.label)
+        with self.assertNumQueries(len(queries)):
+            data = self.get_json(url)
+        self.assertEqual(len(data['results']), 20)
+
+        self.get_json('/api/tasks/?include=description', 400)
+
+    def test_detail(self):
+        task = self.tasks[0]
+        data = self.get_json(f'/api/tasks/{task.id}/?include=labels')
+        self.assertEqual(data['labels'], [{
+            'id': self.label.id, 'name': 'bug', 'tasks_count': 5,
+            'timestamp': data['labels'][0]['timestamp'],
+            'updated_at': data['labels'][0]['updated_at'],
+        }])
+        self.assertEqual(self.get_json(f'/api/statuses/{self.status.id}/'
+                                       '?fields=name'),
+                         {'id': self.status.id, 'name': 'New'})
+        data = self.get_json('/api/tasks/0/', 404)
+        self.assertEqual(data, {'detail': 'Not found.'})
+
+    def test_etag(self):
+        for url in ('/api/tasks/', f'/api/tasks/{self.tasks[0].id}/',
+                    '/api/statuses/', '/api/labels/', '/api/users/'):
+            response = self.client.get(url)
+            etag = response['ETag']
+            response = self.client.get(url, headers={'If-None-Match': etag})
+            self.assertEqual(response.status_code, 304, url)
+
+        Label.objects.filter(pk=self.label.pk).update(name='Bug')
+        response = self.client.get('/api/tasks/',
+                                   headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+
+    def test_authentication(self):
+        self.client.logout()
+        data = self.get_json('/api/tasks/', 401)
+        self.assertEqual(data, {'detail': 'Authentication required.'})
+        data = self.get_json('/api/users/?fields=username')
+        self.assertEqual([user['username'] for user in data['results']],
+                         ['api', 'other'])
+        response = self.client.post('/api/users/')
+        self.assertEqual(response.status_code, 405)
+
+    def test_translated_errors(self):
+        response = self.client.get('/api/tasks/?include=name',
+                                   HTTP_ACCEPT_LANGUAGE='ru')
+        self.assertEqual(response.json(), {'errors': {
+            'include': ['Нельзя включить name.'],
+        }})
+        self.client.logout()
+        response = self.client.get('/api/tasks/', HTTP_ACCEPT_LANGUAGE='ru')
+        self.assertEqual(response.json(),
+                         {'detail': 'Требуется аутентификация.'})
+
+
+@override_settings(LANGUAGE_CODE='en-us')
+class BatchTests(TestCase):
+    url = '/api/tasks/batch/'
+
+    @classmethod
+    def setUpTestData(cls):
+        user_model = get_user_model()
+        cls.user = user_model.objects.create_user(username='batch')
+        cls.other = user_model.objects.create_user(username='other')
+        cls.new = Status.objects.create(name='New')
+        cls.done = Status.objects.create(name='Done')
+        cls.bug = Label.objects.create(name='bug')
+        cls.feature = Label.objects.create(name='feature')
+        cls.task = Task.objects.create(name='Existing', status=cls.new,
+                                       author=cls.other)
+        cls.task.labels.add(cls.bug)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def post(self, items, status_code=200):
+        response = self.client.post(self.url, json.dumps(items),
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, status_code)
+        return response.json()
+
+    def counters(self) -> list:
+        return [
+            list(Status.objects.order_by('pk')
+                 .values_list('tasks_count', flat=True)),
+            list(Label.objects.order_by('pk')
+                 .values_list('tasks_count', flat=True)),
+            list(get_user_model().objects.order_by('pk').values_list(
+                'authored_tasks_count', 'assigned_tasks_count')),
+            list(TaskDay.objects.values_list('day', 'tasks_count')),
+        ]
+
+    def assertCountersInStep(self):
+        counters = self.counters()
+        reconcile_counters()
+        reconcile_days()
+        self.assertEqual(counters, self.counters())
+
+    def test_create(self):
+        items = [{'op': 'create', 'name': f'Batch {number}',
+                  'status': self.done.pk, 'executor': self.other.pk,
+                  'labels': [self.bug.pk, self.feature.pk]}
+                 for number in range(20)]
+        with CaptureQueriesContext(connection) as queries:
+            data = self.post(items)
+        ids = [result['id'] for result in data['results']]
+        self.assertEqual(list(Task.objects.filter(name__startswith='Batch')
+                              .order_by('pk').values_list('pk', flat=True)),
+                         ids)
+        task = Task.objects.get(pk=ids[0])
+        self.assertEqual(task.author, self.user)
+        self.assertEqual(set(task.labels.all()), {self.bug, self.feature})
+        self.assertEqual(Status.objects.get(pk=self.done.pk).tasks_count, 20)
+        self.assertCountersInStep()
+        self.assertEqual(list(get_backend().filter(Task.objects.all(),
+                                                   'Batch 7')),
+                         [Task.objects.get(name='Batch 7')])
+
+        more = [{**item, 'name': f'More {number}'}
+                for number, item in enumerate(items * 5)]
+        with self.assertNumQueries(len(queries)):
+            self.post(more)
+
+    def test_update_and_delete(self):
+        created = self.post([{'op': 'create', 'name': 'Mine',
+                              'status': self.new.pk}])['results'][0]['id']
+        data = self.post([
+            {'op': 'update', 'id': self.task.pk, 'name': 'Renamed',
+             'status': self.done.pk, 'labels': [self.feature.pk]},
+            {'op': 'delete', 'id': created},
+            {'op': 'create', 'name': 'Existing', 'status': self.new.pk},
+        ])
+        self.assertEqual([result['op'] for result in data['results']],
+                         ['update', 'delete', 'create'])
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.name, self.task.status, self.task.author),
+                         ('Renamed', self.done, self.other))
+        self.assertEqual(list(self.task.labels.all()), [self.feature])
+        self.assertFalse(Task.objects.filter(pk=created).exists())
+        self.assertTrue(Task.objects.filter(name='Existing').exists())
+        self.assertCountersInStep()
+        self.assertEqual(
+            list(TaskEvent.objects.order_by('pk')
+                 .values_list('task_id', 'kind', 'changes')),
+            [(created, TaskEvent.Kind.CREATED,
+              {'name': [None, 'Mine'], 'status': [None, self.new.pk]}),
+             (created, TaskEvent.Kind.DELETED, {'name': ['Mine', None]}),
+             (self.task.pk, TaskEvent.Kind.CHANGED,
+              {'name': ['Existing', 'Renamed'],
+               'status': [self.new.pk, self.done.pk],
+               'labels': [[self.bug.pk], [self.feature.pk]]}),
+             (Task.objects.get(name='Existing').pk, TaskEvent.Kind.CREATED,
+              {'name': [None, 'Existing'], 'status': [None, self.new.pk]})]
+        )
+
+        self.post([{'op': 'update', 'id': self.task.pk, 'description': 'x'}])
+        self.task.refresh_from_db()
+        self.assertEqual((self.task.name, self.task.description),
+                         ('Renamed', 'x'))
+
+    def test_invalid_items(self):
+        Task.objects.create(name='Kept', status=self.new, author=self.other)
+        data = self.post([
+            {'op': 'create', 'name': 'Fine', 'status': self.new.pk},
+            {'op': 'create', 'name': 'KEPT', 'status': 0},
+            {'op': 'create', 'name': '', 'labels': 'bug', 'color': 'red'},
+            {'op': 'create', 'name': 'Twice', 'status': self.new.pk},
+            {'op': 'create', 'name': 'twice', 'status': self.new.pk},
+            {'op': 'delete', 'id': self.task.pk},
+            {'op': 'update', 'id': 0},
+            {'op': 'move'},
+            {'op': 'create', 'name': 'Kept', 'status': self.new.pk},
+            {'op': 'create', 'name': 'Twice', 'status': self.new.pk},
+        ], 400)
+        errors = data['errors']
+        self.assertEqual(errors[0], {})
+        self.assertEqual(errors[1], {
+            'name': ['Task with this Name already exists.'],
+            'status': ['Select a valid choice. That choice is not one of '
+                       'the available choices.'],
+        })
+        self.assertEqual(set(errors[2]), {'name', 'status', 'labels',
+                                          'color'})
+        self.assertEqual(errors[3], {})
+        self.assertIn('name', errors[4])
+        self.assertEqual(errors[5], {'id': ['Only its author can delete '
+                                            'a task']})
+        self.assertEqual(errors[6], {'id': ['Task not found.']})
+        self.assertIn('op', errors[7])
+        self.assertEqual(errors[8], {
+            'name': ['Task with this Name already exists.'],
+        })
+        self.assertIn('name', errors[9])
+        self.assertFalse(Task.objects.filter(name='Fine').exists())
+
+    def test_swapped_and_chained_names(self):
+        first = Task.objects.create(name='First', status=self.new,
+                                    author=self.user)
+        second = Task.objects.create(name='Second', status=self.new,
+                                     author=self.user)
+        self.post([
+            {'op': 'update', 'id': first.pk, 'name': 'Second'},
+            {'op': 'update', 'id': second.pk, 'name': 'First'},
+        ])
+        self.post([
+            {'op': 'update', 'id': first.pk, 'name': 'Third'},
+            {'op': 'update', 'id': self.task.pk, 'name': 'First'},
+            {'op': 'update', 'id': second.pk, 'name': 'Existing'},
+        ])
+        self.assertEqual(
+            list(Task.objects.order_by('pk').values_list('name', flat=True)),
+            ['First', 'Third', 'Existing'],
+        )
+
+    def test_names_taken_twice(self):
+        with mock.patch.object(TaskBatch, 'save',
+                               side_effect=IntegrityError):
+            data = self.post([{'op': 'create', 'name': 'Racy',
+                               'status': self.new.pk}], 400)
+        self.assertIn('send the batch again', str(data['errors']))
+
+    def test_translated_errors(self):
+        response = self.client.post(
+            self.url, json.dumps(['x', {'op': 'create', 'color': 'red'}]),
+            content_type='application/json', HTTP_ACCEPT_LANGUAGE='ru',
+        )
+        errors = response.json()['errors']
+        self.assertEqual(errors[0], {'op': ['Ожидался объект.']})
+        self.assertEqual(errors[1]['color'], ['Неизвестное поле.'])
+
+    def test_invalid_requests(self):
+        response = self.client.post(self.url, 'not json',
+                                    content_type='application/json')
+        self.assertEqual(response.status_code, 400)
+        self.post({'op': 'create'}, 400)
+        self.assertEqual(self.client.get(self.url).status_code, 405)
+
+        self.client.logout()
+        self.post([], 401)
+
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+        response = client.post(self.url, '[]',
+                               content_type='application/json')
+        self.assertEqual(response.status_code, 403)
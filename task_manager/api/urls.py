@@ -0,0 +1,18 @@
+from django.urls import path
+
+from . import views
+
+
+urlpatterns = [
+    path('tasks/', views.TaskList.as_view(), name='api_tasks'),
+    path('tasks/batch/', views.TaskBatchView.as_view(),
+         name='api_tasks_batch'),
+    path('tasks/<int:pk>/', views.TaskDetail.as_view(), name='api_task'),
+    path('statuses/', views.StatusList.as_view(), name='api_statuses'),
+    path('statuses/<int:pk>/', views.StatusDetail.as_view(),
+         name='api_status'),
+    path('labels/', views.LabelList.as_view(), name='api_labels'),
+    path('labels/<int:pk>/', views.LabelDetail.as_view(), name='api_label'),
+    path('users/', views.UserList.as_view(), name='api_users'),
+    path('users/<int:pk>/', views.UserDetail.as_view(), name='api_user'),
+]
@@ -0,0 +1,212 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import NON_FIELD_ERRORS, ValidationError
+from django.db import IntegrityError
+from django.http import Http404, JsonResponse
+from django.utils.translation import gettext as _
+from django.views import View
+
+from task_manager.labels.models import Label
+from task_manager.mixin import ConditionalGetMixin, KeysetPaginationMixin
+from task_manager.statuses.models import Status
+from task_manager.tasks.batch import MAX_ITEMS, TaskBatch
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.models import Task
+
+from .resources import (LabelResource, StatusResource, TaskResource,
+                        UserResource)
+
+
+class ApiView(View):
+    """
+    A read-only JSON endpoint of `resource`. Errors are JSON too: 400
+    with the invalid parameters, 401 for anonymous users unless
+    `login_required` is off, and 404.
+    """
+    http_method_names = ['get', 'head', 'options']
+    resource = None
+    login_required = True
+    use_replica = True
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.login_required and not request.user.is_authenticated:
+            return self.error(_('Authentication required.'), 401)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except Http404 as error:
+            return self.error(str(error) or _('Not found.'), 404)
+        except ValidationError as error:
+            errors = error.message_dict if hasattr(error, 'error_dict') \
+                else {NON_FIELD_ERRORS: error.messages}
+            return JsonResponse({'errors': errors}, status=400)
+
+    @staticmethod
+    def error(detail: str, status: int) -> JsonResponse:
+        return JsonResponse({'detail': detail}, status=status)
+
+    def get(self, request, *args, **kwargs):
+        return JsonResponse(self.get_data())
+
+    def get_data(self) -> dict:
+        """The JSON object of a GET; the list and detail views fill it."""
+        return {}
+
+    def get_queryset(self):
+        return self.resource.model._default_manager.all()
+
+
+class ApiListView(ConditionalGetMixin, KeysetPaginationMixin, ApiView):
+    # session, user, versions and the rows
+    query_budget = 4
+    max_paginate_by = 200
+
+    def get_limit(self) -> int:
+        try:
+            limit = int(self.request.GET.get('limit', self.paginate_by))
+        except ValueError:
+            raise ValidationError({'limit': _('Enter a whole number.')})
+        return min(max(limit, 1), self.max_paginate_by)
+
+    def get_data(self) -> dict:
+        fields, include = self.resource.parse(self.request.GET)
+        queryset = self.resource.select(
+            self.get_queryset(), fields, include,
+            keep=[name.lstrip('-') for name in self.get_keyset()]
+        )
+        query, cut = self.keyset_query(queryset, self.get_limit())
+        _paginator, page, rows, _is_paginated = cut(list(query))
+        return {
+            'results': [self.resource.serialize(row, fields, include)
+                        for row in rows],
+            'previous': self.page_url(page.previous_query)
+            if page.has_previous() else None,
+            'next': self.page_url(page.next_query)
+            if page.has_next() else None,
+        }
+
+    def page_url(self, query) -> str:
+        return self.request.build_absolute_uri(f'?{query()}')
+
+
+class ApiDetailView(ConditionalGetMixin, ApiView):
+    # session, user, versions and the object
+    query_budget = 4
+
+    def get_data(self) -> dict:
+        fields, include = self.resource.parse(self.request.GET)
+        queryset = self.resource.select(self.get_queryset(), fields,
+                                        include)
+        try:
+            obj = queryset.get(pk=self.kwargs['pk'])
+        except self.resource.model.DoesNotExist:
+            raise Http404
+        return self.resource.serialize(obj, fields, include)
+
+
+class TaskList(ApiListView):
+    resource = TaskResource
+    watermark_models = (Task, Status, Label, get_user_model())
+    # and the label prefetch, two filter choices and the labels choices
+    query_budget = 8
+
+    def get_queryset(self):
+        self.filterset = TasksFilter(self.request.GET,
+                                     queryset=Task.objects.all(),
+                                     request=self.request)
+        if not self.filterset.is_valid():
+            raise ValidationError(self.filterset.errors)
+        return self.filterset.qs
+
+    def get_keyset(self) -> tuple:
+        return self.filterset.get_keyset()
+
+
+class TaskDetail(ApiDetailView):
+    resource = TaskResource
+    watermark_models = (Task, Status, Label, get_user_model())
+    # and the label prefetch
+    query_budget = 5
+
+
+class TaskBatchView(ApiView):
+    """
+    Create, update and delete tasks from a JSON array of items, all in one
+    transaction or, if any item is invalid, none. The answer has the
+    task id of every item, or the errors of every item. As with any
+    session POST, send the CSRF token in X-CSRFToken.
+
+    A name another request takes between the checks and the writes fails
+    the unique constraint, and the batch is checked once more; a second
+    failure is a 400.
+    """
+    http_method_names = ['post']
+    use_replica = False
+
+    def post(self, request, *args, **kwargs):
+        items = self.parse(request.body)
+        try:
+            return self.save(items)
+        except IntegrityError:
+            pass
+        # Checked again, the batch shows the names taken meanwhile.
+        try:
+            return self.save(items)
+        except IntegrityError:
+            raise ValidationError(_('The names changed meanwhile, '
+                                    'send the batch again.'))
+
+    @staticmethod
+    def parse(body: bytes) -> list:
+        try:
+            items = json.loads(body)
+        except ValueError:
+            raise ValidationError(_('Invalid JSON.'))
+        if not isinstance(items, list) or len(items) > MAX_ITEMS:
+            raise ValidationError(
+                _('Send an array of at most %(count)s items.') %
+                {'count': MAX_ITEMS}
+            )
+        return items
+
+    def save(self, items: list) -> JsonResponse:
+        batch = TaskBatch(items, self.request.user)
+        if not batch.is_valid():
+            return JsonResponse({'errors': batch.errors}, status=400)
+        ids = batch.save()
+        return JsonResponse({'results': [
+            {'op': item['op'], 'id': pk} for item, pk in zip(items, ids)
+        ]})
+
+
+class StatusList(ApiListView):
+    resource = StatusResource
+    watermark_models = (Status,)
+
+
+class StatusDetail(ApiDetailView):
+    resource = StatusResource
+    watermark_models = (Status,)
+
+
+class LabelList(ApiListView):
+    resource = LabelResource
+    watermark_models = (Label,)
+
+
+class LabelDetail(ApiDetailView):
+    resource = LabelResource
+    watermark_models = (Label,)
+
+
+class UserList(ApiListView):
+    resource = UserResource
+    watermark_models = (get_user_model(),)
+    keyset_field = 'date_joined'
+    login_required = False
+
+
+class UserDetail(ApiDetailView):
+    resource = UserResource
+    watermark_models = (get_user_model(),)
+    login_required = False
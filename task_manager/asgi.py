@@ -2,6 +2,8 @@
 ASGI config for task_manager project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Set ASYNC_VIEWS to serve the read-only pages with the async views, and
+CONN_MAX_AGE=0: every request queries from a thread of its own.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.1/howto/deployment/asgi/
@@ -0,0 +1,7 @@
+"""
+Benchmark data and runner.
+
+`manage.py seed_benchmark` fills the database with a reproducible data
+set, `manage.py run_benchmark` hits every URL and writes the latency,
+query and memory numbers as JSON.
+"""
@@ -0,0 +1,97 @@
+"""
+One sync worker against one event loop serving the async views.
+
+A sleep before every query stands in for a database across the network.
+The sync worker answers the requests one after another. The event loop
+answers `concurrency` of them at a time, each with its own thread for
+queries as under ASGI, so their round trips overlap.
+"""
+import asyncio
+from contextlib import contextmanager
+from itertools import cycle, islice
+from time import perf_counter, sleep
+from unittest import mock
+
+from asgiref.sync import ThreadSensitiveContext
+from django.db.backends.utils import CursorWrapper
+from django.test import AsyncClient, Client
+from django.test.utils import override_settings
+
+from .runner import percentile
+from ..mixin import async_views
+
+
+@contextmanager
+def query_latency(seconds: float):
+    execute = CursorWrapper._execute
+
+    def slow_execute(self, *args):
+        sleep(seconds)
+        return execute(self, *args)
+
+    with mock.patch.object(CursorWrapper, '_execute', slow_execute):
+        yield
+
+
+def summary(timings: list, seconds: float, errors: int) -> dict:
+    timings = sorted(timings)
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'rps': round(len(timings) / seconds, 1),
+        'p50_ms': round(percentile(timings, 0.50) * 1000, 1),
+        'p95_ms': round(percentile(timings, 0.95) * 1000, 1),
+    }
+
+
+class ConcurrencyRunner:
+    def __init__(self, user, urls: list, requests: int = 200,
+                 concurrency: int = 20):
+        self.user = user
+        self.urls = urls
+        self.requests = requests
+        self.concurrency = concurrency
+
+    def planned(self):
+        return islice(cycle(self.urls), self.requests)
+
+    def run_sync(self) -> dict:
+        client = Client()
+        client.force_login(self.user)
+        timings, errors = [], 0
+        start = perf_counter()
+        for url in self.planned():
+            request_start = perf_counter()
+            response = client.get(url)
+            timings.append(perf_counter() - request_start)
+            errors += response.status_code != 200
+        return summary(timings, perf_counter() - start, errors)
+
+    async def run_async(self) -> dict:
+        client = AsyncClient()
+        await client.aforce_login(self.user)
+        planned = self.planned()
+        timings, errors = [], 0
+
+        async def worker():
+            nonlocal errors
+            for url in planned:
+                request_start = perf_counter()
+                # What the ASGI handler does for every request.
+                async with ThreadSensitiveContext():
+                    response = await client.get(url)
+                timings.append(perf_counter() - request_start)
+                errors += response.status_code != 200
+
+        start = perf_counter()
+        await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        return summary(timings, perf_counter() - start, errors)
+
+    def run(self, latency: float) -> dict:
+        # The host the test clients send.
+        with query_latency(latency), \
+                override_settings(ALLOWED_HOSTS=['testserver']):
+            results = {'sync': self.run_sync()}
+            with async_views():
+                results['async'] = asyncio.run(self.run_async())
+        return results
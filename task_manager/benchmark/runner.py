@@ -0,0 +1,208 @@
+"""
+Hit every GET URL of the project with the test client and measure it.
+
+URLs come from the URL conf, so new views are benchmarked without
+listing them here. A pattern with a pk is filled in with a row of the
+model its prefix stands for. Each URL gets the p50/p95/p99 latency, the
+queries per request and the peak RSS of the process so far.
+"""
+import platform
+import resource
+import subprocess
+import sys
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.models import Task
+
+
+# URL prefixes that are not the application's own pages.
+SKIPPED = ('admin/',)
+# URL prefix -> sample filling in its <int:pk> or <int:id>.
+PREFIX_SAMPLES = {
+    'users/': 'user',
+    'statuses/': 'status',
+    'labels/': 'label',
+    'tasks/': 'task',
+    'api/users/': 'user',
+    'api/statuses/': 'status',
+    'api/labels/': 'label',
+    'api/tasks/': 'task',
+}
+# Extra query strings per URL name: {model} is a pk of the model.
+VARIANTS = {
+    'index_tasks': (
+        'q=fix+login', 'status={status}', 'label={label}',
+        'executor={user}', 'self_tasks=on', 'export=csv',
+    ),
+    'api_tasks': (
+        'status={status}', 'fields=id,name,status',
+        'include=status,author,executor,labels',
+    ),
+    'autocomplete_users': ('q=bench_1',),
+    'autocomplete_labels': ('q=bench',),
+}
+
+
+def url_names(resolver=None, prefix=''):
+    """(route, name) of every named GET pattern, depth first."""
+    resolver = resolver or get_resolver()
+    for pattern in resolver.url_patterns:
+        route = prefix + str(pattern.pattern)
+        if route.startswith(SKIPPED):
+            continue
+        if isinstance(pattern, URLResolver):
+            yield from url_names(pattern, route)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            view_class = getattr(pattern.callback, 'view_class', None)
+            if allows_get(view_class):
+                yield route, pattern.name
+
+
+def allows_get(view_class) -> bool:
+    if view_class is None:
+        return True
+    return 'get' in view_class.http_method_names \
+        and hasattr(view_class, 'get')
+
+
+def percentile(values: list, share: float) -> float:
+    """Nearest-rank percentile of sorted `values`."""
+    index = max(0, round(share * len(values) + 0.5) - 1)
+    return values[min(index, len(values) - 1)]
+
+
+def peak_rss_kb() -> int:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak // 1024 if sys.platform == 'darwin' else peak
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True, text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+class Runner:
+    def __init__(self, user, iterations: int = 20, warmup: int = 2):
+        # An allowed host, so that no test environment is needed.
+        self.client = Client(SERVER_NAME='127.0.0.1', headers={
+            'Authorization': f'Bearer {settings.METRICS_TOKEN}',
+        })
+        self.client.force_login(user)
+        self.user = user
+        self.iterations = iterations
+        self.warmup = warmup
+        self.samples = {
+            'user': user.pk,
+            'status': Status.objects.values_list('pk', flat=True).first(),
+            'label': Label.objects.values_list('pk', flat=True).first(),
+            'task': Task.objects.filter(author=user)
+                                .values_list('pk', flat=True).first(),
+        }
+
+    def sample_pk(self, route: str):
+        for prefix, sample in PREFIX_SAMPLES.items():
+            if route.startswith(prefix):
+                return self.samples[sample]
+        return None
+
+    def urls(self):
+        """(name, url) of every URL to measure."""
+        for route, name in url_names():
+            if '<' in route:
+                pk = self.sample_pk(route)
+                if pk is None:
+                    continue
+                url = reverse(name, args=[pk])
+            else:
+                url = reverse(name)
+            yield name, url
+            for variant in VARIANTS.get(name, ()):
+                yield name, f'{url}?{variant.format(**self.samples)}'
+
+    def get(self, url):
+        """(status code, seconds, queries, bytes) of one GET, body included."""
+        with CaptureQueriesContext(connection) as queries:
+            start = perf_counter()
+            response = self.client.get(url)
+            if response.streaming:
+                size = sum(len(chunk) for chunk in response.streaming_content)
+            else:
+                size = len(response.content)
+            elapsed = perf_counter() - start
+        return response.status_code, elapsed, len(queries), size
+
+    def measure(self, url) -> dict:
+        for _ in range(self.warmup):
+            self.get(url)
+        runs = [self.get(url) for _ in range(self.iterations)]
+        timings = sorted(run[1] for run in runs)
+        return {
+            'status': runs[-1][0],
+            'p50_ms': round(percentile(timings, 0.50) * 1000, 3),
+            'p95_ms': round(percentile(timings, 0.95) * 1000, 3),
+            'p99_ms': round(percentile(timings, 0.99) * 1000, 3),
+            'queries': max(run[2] for run in runs),
+            'bytes': runs[-1][3],
+            'peak_rss_kb': peak_rss_kb(),
+        }
+
+    def run(self, log=print) -> dict:
+        results = {}
+        for name, url in self.urls():
+            results[url] = {'name': name, **self.measure(url)}
+            log(f'{url}: p95 {results[url]["p95_ms"]} ms, '
+                f'{results[url]["queries"]} queries')
+        return {
+            'meta': {
+                'commit': git_commit(),
+                'python': platform.python_version(),
+                'django': django.get_version(),
+                'database': connection.vendor,
+                'iterations': self.iterations,
+                'rows': {
+                    'users': get_user_model().objects.count(),
+                    'statuses': Status.objects.count(),
+                    'labels': Label.objects.count(),
+                    'tasks': Task.objects.count(),
+                },
+            },
+            'urls': results,
+            'peak_rss_kb': peak_rss_kb(),
+        }
+
+
+def compare(baseline: dict, current: dict, tolerance: float,
+            min_ms: float = 1.0) -> list:
+    """
+    Messages about URLs that run more queries, or whose p95 grew by more
+    than `tolerance` and `min_ms` both.
+    """
+    regressions = []
+    for url, now in current['urls'].items():
+        before = baseline['urls'].get(url)
+        if before is None:
+            continue
+        if now['queries'] > before['queries']:
+            regressions.append(f'{url}: {before["queries"]} -> '
+                               f'{now["queries"]} queries')
+        growth = now['p95_ms'] - before['p95_ms']
+        if growth > max(before['p95_ms'] * tolerance, min_ms):
+            regressions.append(f'{url}: p95 {before["p95_ms"]} -> '
+                               f'{now["p95_ms"]} ms')
+    return regressions
@@ -0,0 +1,164 @@
+"""
+A reproducible benchmark data set.
+
+The same sizes and seed give the same rows, so runs on different
+commits measure the same data. Label and status popularity follows a
+Zipf curve: a few are on most tasks, most are on a few.
+"""
+from itertools import accumulate
+from random import Random
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management import call_command
+from django.db import transaction
+
+from task_manager.choices import invalidate_choices
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import bulk, fragments
+from task_manager.tasks.counters import reconcile_counters, reconcile_days
+from task_manager.tasks.models import Task
+from task_manager.versions import bump
+
+
+PREFIX = 'bench'
+SIZES = {
+    'users': 100_000,
+    'statuses': 1_000,
+    'labels': 10_000,
+    'tasks': 1_000_000,
+}
+# Mean and cap of the number of labels on a task.
+LABELS_PER_TASK = 1.5
+MAX_LABELS_PER_TASK = 8
+# Share of tasks with an executor.
+ASSIGNED = 0.8
+WORDS = (
+    'fix', 'add', 'update', 'review', 'deploy', 'test', 'report', 'login',
+    'page', 'search', 'export', 'import', 'label', 'status', 'user', 'task',
+    'cache', 'query', 'index', 'form', 'filter', 'api', 'docs', 'build',
+)
+
+
+def bench_users():
+    return get_user_model().objects.filter(username__startswith=f'{PREFIX}_')
+
+
+def bench_statuses():
+    return Status.objects.filter(name__startswith=f'{PREFIX} ')
+
+
+def bench_labels():
+    return Label.objects.filter(name__startswith=f'{PREFIX} ')
+
+
+def scaled(scale: float) -> dict:
+    return {name: max(1, round(size * scale)) for name, size in SIZES.items()}
+
+
+def zipf_weights(count: int) -> list:
+    return list(accumulate(1 / rank for rank in range(1, count + 1)))
+
+
+class Seeder:
+    def __init__(self, sizes: dict, seed: int = 0, batch_size: int = 5000,
+                 log=print):
+        self.sizes = sizes
+        self.random = Random(seed)
+        self.batch_size = batch_size
+        self.log = log
+
+    def run(self):
+        if bench_users().exists():
+            raise ValueError('Benchmark data exists, flush it first.')
+        users = self.create_users()
+        statuses = self.create(Status, 'statuses')
+        labels = self.create(Label, 'labels')
+        self.create_tasks(users, statuses, labels)
+
+        self.log('Reconciling counters and the search index')
+        reconcile_counters()
+        reconcile_days()
+        bump(Task)
+        call_command('rebuild_search_index', verbosity=0)
+        for name in ('statuses', 'labels', 'users'):
+            invalidate_choices(name)
+        fragments.invalidate_rows()
+
+    def batches(self, total: int):
+        for start in range(0, total, self.batch_size):
+            yield range(start, min(start + self.batch_size, total))
+
+    def create_users(self) -> list:
+        user_model = get_user_model()
+        # Unusable, so no hashing; the runner logs in with force_login.
+        password = make_password(None)
+        pks = []
+        for numbers in self.batches(self.sizes['users']):
+            pks += [user.pk for user in user_model.objects.bulk_create(
+                user_model(username=f'{PREFIX}_{number}',
+                           first_name=PREFIX.title(), last_name=str(number),
+                           password=password)
+                for number in numbers
+            )]
+        self.log(f'Created {len(pks)} users')
+        return pks
+
+    def create(self, model, name: str) -> list:
+        objects = model.objects.bulk_create(
+            [model(name=f'{PREFIX} {name} {number}')
+             for number in range(self.sizes[name])],
+            batch_size=self.batch_size,
+        )
+        self.log(f'Created {len(objects)} {name}')
+        return [obj.pk for obj in objects]
+
+    def words(self, count: int) -> str:
+        return ' '.join(self.random.choices(WORDS, k=count))
+
+    def create_tasks(self, users, statuses, labels):
+        through = Task.labels.through
+        status_weights = zipf_weights(len(statuses))
+        label_weights = zipf_weights(len(labels))
+        choice, random = self.random.choice, self.random.random
+        links = 0
+        for numbers in self.batches(self.sizes['tasks']):
+            tasks = [Task(
+                name=f'{self.words(3)} {number}',
+                description=self.words(12),
+                status_id=self.random.choices(
+                    statuses, cum_weights=status_weights)[0],
+                author_id=choice(users),
+                executor_id=choice(users) if random() < ASSIGNED else None,
+            ) for number in numbers]
+            with transaction.atomic():
+                Task.objects.bulk_create(tasks)
+                rows = [
+                    through(task_id=task.pk, label_id=label)
+                    for task in tasks
+                    for label in set(self.random.choices(
+                        labels, cum_weights=label_weights,
+                        k=self.label_count(),
+                    ))
+                ]
+                through.objects.bulk_create(rows)
+            links += len(rows)
+            self.log(f'Created {numbers.stop} tasks')
+        self.log(f'Linked {links} labels')
+
+    def label_count(self) -> int:
+        count = int(self.random.expovariate(1 / LABELS_PER_TASK))
+        return min(count, MAX_LABELS_PER_TASK)
+
+
+def flush(log=print):
+    """Delete the benchmark rows and their tasks."""
+    users = bench_users()
+    count = bulk.delete_tasks(Task.objects.filter(author__in=users))
+    log(f'Deleted {count} tasks')
+    for queryset in (bench_statuses(), bench_labels(), users):
+        queryset.delete()
+    for name in ('statuses', 'labels', 'users'):
+        invalidate_choices(name)
+    fragments.invalidate_rows()
@@ -0,0 +1,134 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.urls import reverse
+
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+
+
+CHOICES_TIMEOUT = 60 * 60
+VERSION_KEY = 'version:{name}'
+CHOICES_KEY = 'choices:{name}:{version}'
+
+
+def _querysets():
+    return {
+        'statuses': Status.objects.only('id', 'name'),
+        'labels': Label.objects.only('id', 'name'),
+        'users': get_user_model().objects.only('id', 'first_name',
+                                               'last_name'),
+    }
+
+
+def get_version(name):
+    """A number that changes every time `bump_version(name)` is called."""
+    key = VERSION_KEY.format(name=name)
+    version = cache.get(key)
+    if version is None:
+        # A fresh number, so entries of an evicted version are never reused.
+        version = time.time_ns()
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(name):
+    try:
+        cache.incr(VERSION_KEY.format(name=name))
+    except ValueError:
+        get_version(name)
+
+
+def get_choices(name):
+    """Return [(pk, str(obj)), ...] of statuses, labels or users."""
+    key = CHOICES_KEY.format(name=name, version=get_version(name))
+    choices = cache.get(key)
+    if choices is None:
+        # From the primary: rows of a lagging replica would be cached
+        # for CHOICES_TIMEOUT past the version bump.
+        queryset = _querysets()[name].using(DEFAULT_DB_ALIAS).order_by('pk')
+        choices = [(obj.pk, str(obj)) for obj in queryset]
+        cache.set(key, choices, CHOICES_TIMEOUT)
+    return choices
+
+
+def invalidate_choices(name):
+    bump_version(name)
+    # Bump again once committed: a request may have cached the old rows
+    # between the write and the commit.
+    transaction.on_commit(lambda: bump_version(name))
+
+
+class CachedChoicesMixin:
+    """
+    Fill select widgets from the choices cache instead of the database.
+
+    `cached_choices` maps a form field to a get_choices() name. Submitted
+    values are still validated against the field queryset.
+    """
+    cached_choices = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name, name in self.cached_choices.items():
+            field = self.fields[field_name]
+            choices = get_choices(name)
+            if getattr(field, 'empty_label', None) is not None:
+                choices = [('', field.empty_label)] + choices
+            field.widget.choices = choices
+
+
+class AutocompleteMixin:
+    """
+    Render only the selected options of a select widget.
+
+    `autocomplete_fields` maps a form field to the url name of a JSON
+    endpoint; the page script fetches the other options from it.
+    """
+    autocomplete_fields = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        for field_name, url_name in self.autocomplete_fields.items():
+            field = self.fields[field_name]
+            value = self[field_name].value()
+            if not isinstance(value, (list, tuple)):
+                value = [value]
+            pks = [str(getattr(item, 'pk', item)) for item in value
+                   if item not in (None, '')]
+            pks = [pk for pk in pks if pk.isdigit()]
+
+            choices = [(obj.pk, str(obj))
+                       for obj in field.queryset.filter(pk__in=pks)] \
+                if pks else []
+            if getattr(field, 'empty_label', None) is not None:
+                choices = [('', field.empty_label)] + choices
+            field.widget.choices = choices
+            field.widget.attrs['data-autocomplete-url'] = reverse(url_name)
+
+
+@receiver([post_save, post_delete], sender=Status)
+def invalidate_statuses(sender, **kwargs):
+    invalidate_choices('statuses')
+
+
+@receiver([post_save, post_delete], sender=Label)
+def invalidate_labels(sender, **kwargs):
+    invalidate_choices('labels')
+
+
+def only_last_login(update_fields) -> bool:
+    # Every login saves last_login, which is not shown anywhere.
+    return bool(update_fields) and set(update_fields) == {'last_login'}
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_users(sender, update_fields=None, **kwargs):
+    if only_last_login(update_fields):
+        return
+    invalidate_choices('users')
@@ -1,5 +1,56 @@
 from django.contrib.auth.forms import AuthenticationForm
 from django.contrib.auth import get_user_model
+from django.db.models import F, UniqueConstraint
+from django.utils.text import capfirst
+
+
+def unique_message(model, field_name: str) -> str:
+    """The error ModelForm shows for a value another row has."""
+    field = model._meta.get_field(field_name)
+    return field.error_messages['unique'] % {
+        'model_name': capfirst(model._meta.verbose_name),
+        'field_label': field.verbose_name,
+    }
+
+
+def unique_constraints(model) -> dict:
+    """{constraint name: its first field} of the model's UniqueConstraints."""
+    constraints = {}
+    for constraint in model._meta.constraints:
+        if not isinstance(constraint, UniqueConstraint):
+            continue
+        fields = list(constraint.fields) or [
+            expression.name for outer in constraint.expressions
+            for expression in outer.flatten() if isinstance(expression, F)
+        ]
+        constraints[constraint.name] = fields[0]
+    return constraints
+
+
+class UniqueConstraintMixin:
+    """
+    A ModelForm that leaves the model's UniqueConstraints to the database
+    instead of a SELECT before every write. Its view saves it with
+    SaveUniqueMixin, which turns a violation back into the form error.
+
+    The name constraints compare Lower('name'). SQLite's lower() folds
+    ASCII letters only, so there "Открыт" and "ОТКРЫТ" are two names;
+    Postgres folds every letter.
+    """
+
+    def _get_validation_exclusions(self):
+        # Excluded fields are skipped by Model.validate_constraints().
+        return super()._get_validation_exclusions() \
+            | set(unique_constraints(self._meta.model).values())
+
+    def add_unique_error(self, error) -> bool:
+        """Add the error of the constraint `error` names, if it is one."""
+        model = self._meta.model
+        for name, field in unique_constraints(model).items():
+            if name in str(error):
+                self.add_error(field, unique_message(model, field))
+                return True
+        return False
 
 
 class LoginUserForm(AuthenticationForm):
@@ -0,0 +1,27 @@
+from django.db import models
+from django.db.backends.ddl_references import Statement, Table
+
+
+class PrefixIndex(models.Index):
+    """
+    An index on one column that `istartswith` can use: Postgres compares
+    UPPER(column::text) with LIKE, SQLite's LIKE optimisation needs a
+    NOCASE index. Other databases get a plain index.
+    """
+
+    def create_sql(self, model, schema_editor, using='', **kwargs):
+        quote = schema_editor.quote_name
+        column = quote(model._meta.get_field(self.fields[0]).column)
+        vendor = schema_editor.connection.vendor
+        if vendor == 'postgresql':
+            expression = f'UPPER({column}::text) text_pattern_ops'
+        elif vendor == 'sqlite':
+            expression = f'{column} COLLATE NOCASE'
+        else:
+            expression = column
+        return Statement(
+            'CREATE INDEX %(name)s ON %(table)s (%(expression)s)',
+            name=quote(self.name),
+            table=Table(model._meta.db_table, quote),
+            expression=expression,
+        )
@@ -6,6 +6,6 @@ from .models import Label
 
 @admin.register(Label)
 class LabelsAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'timestamp')
+    list_display = ('id', 'name', 'tasks_count', 'timestamp')
     search_fields = ['name']
     list_filter = (('timestamp', DateFieldListFilter),)
@@ -1,8 +1,10 @@
 from django.forms import ModelForm
+
+from task_manager.forms import UniqueConstraintMixin
 from .models import Label
 
 
-class LabelForm(ModelForm):
+class LabelForm(UniqueConstraintMixin, ModelForm):
     class Meta:
         model = Label
         fields = ('name', )
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+import task_manager.indexes
+
+
+INDEX = task_manager.indexes.PrefixIndex(fields=['name'],
+                                         name='label_name_prefix_idx')
+
+
+def create_index(apps, schema_editor):
+    schema_editor.add_index(apps.get_model('labels', 'Label'), INDEX)
+
+
+def drop_index(apps, schema_editor):
+    # SQLite table rebuilds of older migration states dropped it.
+    schema_editor.execute(f'DROP INDEX IF EXISTS {INDEX.name};')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_index, drop_index),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name='label', index=INDEX),
+            ],
+        ),
+    ]
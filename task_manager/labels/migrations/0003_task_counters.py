@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0002_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='label',
+            name='tasks_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Tasks'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0005_name_ci_unique'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='label',
+            index=models.Index(fields=['-tasks_count'], name='label_tasks_count_idx'),
+        ),
+    ]
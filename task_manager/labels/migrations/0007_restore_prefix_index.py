@@ -0,0 +1,26 @@
+from django.db import migrations
+
+
+def restore_indexes(apps, schema_editor):
+    # Before 0002 declared its indexes, later SQLite table rebuilds
+    # dropped them.
+    model = apps.get_model('labels', 'Label')
+    connection = schema_editor.connection
+    with connection.cursor() as cursor:
+        existing = connection.introspection.get_constraints(
+            cursor, model._meta.db_table
+        )
+    for index in model._meta.indexes:
+        if index.name not in existing:
+            schema_editor.add_index(model, index)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0006_tasks_count_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(restore_indexes, migrations.RunPython.noop),
+    ]
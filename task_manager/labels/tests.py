@@ -114,6 +114,13 @@ class LabelsTests(TestCase):
                                     {'name': 'create new label'})
         status_code = response.status_code
         self.assertEqual(status_code, 200)
+# Checking the uniqueness of the label name, regardless of case.
+        response = self.client.post('/labels/create/',
+                                    {'name': 'Create New Label'})
+        status_code = response.status_code
+        self.assertEqual(status_code, 200)
+        self.assertEqual(Label.objects.filter(
+            name__iexact='create new label').count(), 1)
 
         new_label_id = Label.objects.get(name='create new label').id
 # Checking for label changes.
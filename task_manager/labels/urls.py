@@ -1,9 +1,16 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 
+if settings.ASYNC_VIEWS:
+    Index = views.AsyncIndexLabels
+else:
+    Index = views.IndexLabels
+
+
 urlpatterns = [
-    path('', views.IndexLabels.as_view(), name='index_labels'),
+    path('', Index.as_view(), name='index_labels'),
     path('create/', views.CreateLabel.as_view(), name='create_label'),
     path('<int:pk>/update/', views.UpdateLabel.as_view(), name='update_label'),
     path('<int:pk>/delete/', views.DeleteLabel.as_view(), name='delete_label'),
@@ -1,5 +1,6 @@
 from typing import Any
 
+from django.db import transaction
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.views.generic.list import ListView
 
@@ -13,7 +14,9 @@ from .forms import LabelForm
 from django.urls import reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
-from task_manager.mixin import NoAuthMixin, NoPermissionMixin
+from task_manager.mixin import (NoAuthMixin, NoPermissionMixin,
+                                ConditionalGetMixin, KeysetPaginationMixin,
+                                AsyncListMixin, SaveUniqueMixin)
 
 
 class UseInTask(UserPassesTestMixin):
@@ -24,14 +27,27 @@ class UseInTask(UserPassesTestMixin):
 
         if self.request.method == 'POST':
             label = self.get_object()
-            tasks = label.labels.all()
-
-            return not tasks
+            return not label.tasks_count
         return True
 
+    def form_valid(self, form):
+        # The counter may lag behind a task saved just now: lock the label,
+        # which waits for such a link, then look at the links themselves.
+        with transaction.atomic():
+            label = Label.objects.select_for_update().get(pk=self.object.pk)
+            # The tasks of the label: Task.labels has related_name='labels'.
+            if label.labels.exists():
+                return self.handle_no_permission()
+            return super().form_valid(form)
+
 
-class IndexLabels(NoPermissionMixin, NoAuthMixin, ListView):
+class IndexLabels(NoPermissionMixin, NoAuthMixin, ConditionalGetMixin,
+                  KeysetPaginationMixin, ListView):
     model = Label
+    watermark_models = (Label,)
+    # session, user, versions and the rows
+    query_budget = 4
+    use_replica = True
     template_name = 'labels/index_labels.html'
     context_object_name = 'labels'
 
@@ -41,16 +57,20 @@ class IndexLabels(NoPermissionMixin, NoAuthMixin, ListView):
         return context
 
 
-class CreateLabel(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
-                  CreateView):
+class AsyncIndexLabels(AsyncListMixin, IndexLabels):
+    pass
+
+
+class CreateLabel(NoPermissionMixin, NoAuthMixin, SaveUniqueMixin,
+                  SuccessMessageMixin, CreateView):
     form_class = LabelForm
     template_name = 'labels/create_label.html'
     success_url = reverse_lazy('index_labels')
     success_message = _('Label successfully created')
 
 
-class UpdateLabel(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
-                  UpdateView):
+class UpdateLabel(NoPermissionMixin, NoAuthMixin, SaveUniqueMixin,
+                  SuccessMessageMixin, UpdateView):
     model = Label
     form_class = LabelForm
     template_name = 'labels/update_label.html'
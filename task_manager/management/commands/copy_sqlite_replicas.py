@@ -0,0 +1,24 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = ('Copy the SQLite primary database onto the SQLite replicas of '
+            'DATABASE_REPLICA_URLS, to try replica reads locally.')
+
+    def handle(self, *args, **options):
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError('Set DATABASE_REPLICA_URLS first.')
+        primary = connections[DEFAULT_DB_ALIAS]
+        for alias in [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]:
+            if connections[alias].vendor != 'sqlite':
+                raise CommandError(f'{alias} is not an SQLite database.')
+
+        primary.ensure_connection()
+        for alias in settings.DATABASE_REPLICAS:
+            replica = connections[alias]
+            replica.ensure_connection()
+            primary.connection.backup(replica.connection)
+            self.stdout.write(f'Copied {primary.settings_dict["NAME"]} to '
+                              f'{replica.settings_dict["NAME"]}')
@@ -0,0 +1,48 @@
+import json
+from pathlib import Path
+
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.benchmark.runner import Runner, compare
+from task_manager.benchmark.seed import bench_users
+
+
+class Command(BaseCommand):
+    help = ('Measure every GET URL with the test client and print the '
+            'results as JSON.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=20)
+        parser.add_argument('--warmup', type=int, default=2)
+        parser.add_argument('--output', type=Path,
+                            help='Write the JSON here instead of stdout.')
+        parser.add_argument('--compare', type=Path,
+                            help='Earlier results; exit with an error if a '
+                                 'URL got slower or runs more queries.')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed p95 growth for --compare.')
+        parser.add_argument('--min-ms', type=float, default=1.0,
+                            help='p95 growth --compare always allows.')
+
+    def handle(self, *args, **options):
+        user = bench_users().order_by('pk').first()
+        if user is None:
+            raise CommandError('No benchmark data, run seed_benchmark.')
+
+        runner = Runner(user, iterations=options['iterations'],
+                        warmup=options['warmup'])
+        results = runner.run(log=self.stderr.write)
+
+        report = json.dumps(results, indent=2)
+        if options['output']:
+            options['output'].write_text(report + '\n')
+        else:
+            self.stdout.write(report)
+
+        if options['compare']:
+            baseline = json.loads(options['compare'].read_text())
+            regressions = compare(baseline, results, options['tolerance'],
+                                  options['min_ms'])
+            if regressions:
+                raise CommandError('Regressions:\n' + '\n'.join(regressions))
+            self.stderr.write('No regressions.')
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.urls import reverse
+
+from task_manager.benchmark.concurrency import ConcurrencyRunner
+from task_manager.benchmark.seed import bench_users
+from task_manager.tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = ('Serve the task list and detail with slow queries from one '
+            'sync worker, then from one event loop with the async views.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=20)
+        parser.add_argument('--latency-ms', type=float, default=10.0,
+                            help='Delay added to every query.')
+
+    def handle(self, *args, **options):
+        user = bench_users().order_by('pk').first()
+        if user is None:
+            raise CommandError('No benchmark data, run seed_benchmark.')
+        task = Task.objects.filter(author=user).order_by('pk').first()
+        urls = [reverse('index_tasks')]
+        if task is not None:
+            urls.append(reverse('show_task', args=[task.pk]))
+
+        runner = ConcurrencyRunner(user, urls, options['requests'],
+                                   options['concurrency'])
+        results = runner.run(options['latency_ms'] / 1000)
+        for mode, result in results.items():
+            self.stdout.write(
+                '{}: {rps} req/s, p50 {p50_ms} ms, p95 {p95_ms} ms, '
+                '{errors} errors over {requests} requests'.format(
+                    mode, **result)
+            )
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from task_manager.benchmark.seed import SIZES, Seeder, flush, scaled
+
+
+class Command(BaseCommand):
+    help = ('Fill the database with benchmark users, statuses, labels and '
+            'tasks. The same options always give the same rows.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0,
+                            help='Multiply every default size.')
+        for name, size in SIZES.items():
+            parser.add_argument(f'--{name}', type=int,
+                                help=f'Default: {size} times --scale.')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=5000)
+        parser.add_argument('--flush', action='store_true',
+                            help='Delete earlier benchmark rows first.')
+
+    def handle(self, *args, **options):
+        sizes = scaled(options['scale'])
+        for name in SIZES:
+            if options[name] is not None:
+                sizes[name] = options[name]
+
+        if options['flush']:
+            flush(log=self.stdout.write)
+        try:
+            Seeder(sizes, seed=options['seed'],
+                   batch_size=options['batch_size'],
+                   log=self.stdout.write).run()
+        except ValueError as error:
+            raise CommandError(f'{error} Use --flush.')
+        self.stdout.write(self.style.SUCCESS('Benchmark data is ready.'))
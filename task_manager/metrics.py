@@ -0,0 +1,256 @@
+"""
+Per-view query count and timings.
+
+MetricsMiddleware measures every request and adds them up per URL name.
+The numbers of one request go out in the Server-Timing header, the
+totals at /metrics in the Prometheus text format, along with the state of
+the worker's database connection pools.
+
+A view may declare `query_budget`, the most queries one GET of it may
+run. With QUERY_BUDGET_ENFORCE on (the tests turn it on), going over
+the budget raises QueryBudgetExceeded.
+"""
+import logging
+from collections import defaultdict
+from contextlib import ExitStack
+from threading import Lock
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.http import Http404, HttpResponse
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+from django.utils.crypto import constant_time_compare
+
+
+logger = logging.getLogger(__name__)
+
+UNRESOLVED = '<unresolved>'
+# Counter name -> help text, in /metrics order.
+COUNTERS = {
+    'requests': 'Requests served.',
+    'queries': 'SQL queries run.',
+    'db_seconds': 'Time spent in SQL queries.',
+    'render_seconds': 'Time spent rendering templates.',
+    'request_seconds': 'Time spent in the view, including the above.',
+}
+
+# psycopg_pool statistic -> (metric type, help text).
+POOL_METRICS = {
+    'pool_max': ('gauge', 'Most connections the pool opens.'),
+    'pool_size': ('gauge', 'Connections open, busy or idle.'),
+    'pool_available': ('gauge', 'Idle connections.'),
+    'requests_waiting': ('gauge', 'Requests waiting for a connection.'),
+    'requests_num': ('counter', 'Connections handed out.'),
+    'requests_queued': ('counter', 'Requests that waited for a connection.'),
+    'requests_errors': ('counter', 'Requests that gave up waiting.'),
+    'connections_lost': ('counter', 'Connections failing the health check.'),
+}
+
+_totals = defaultdict(lambda: dict.fromkeys(COUNTERS, 0))
+_lock = Lock()
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class RequestMetrics:
+    """Query count and timings of one request."""
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.render_seconds = 0.0
+        self.request_seconds = 0.0
+        self._render_start = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Database execute wrapper."""
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.db_seconds += perf_counter() - start
+
+    def render_started(self):
+        self._render_start = perf_counter()
+
+    def render_finished(self, response):
+        self.render_seconds += perf_counter() - self._render_start
+
+    def server_timing(self) -> str:
+        return ', '.join([
+            f'db;dur={self.db_seconds * 1000:.1f};'
+            f'desc="{self.queries} queries"',
+            f'render;dur={self.render_seconds * 1000:.1f}',
+            f'total;dur={self.request_seconds * 1000:.1f}',
+        ])
+
+
+def record(view: str, metrics: RequestMetrics):
+    with _lock:
+        totals = _totals[view]
+        totals['requests'] += 1
+        for name in COUNTERS.keys() - {'requests'}:
+            totals[name] += getattr(metrics, name)
+
+
+def snapshot() -> dict:
+    with _lock:
+        return {view: dict(totals) for view, totals in _totals.items()}
+
+
+def reset():
+    with _lock:
+        _totals.clear()
+
+
+def view_name(request) -> str:
+    match = request.resolver_match
+    return match.view_name if match and match.view_name else UNRESOLVED
+
+
+def query_budget(request):
+    match = request.resolver_match
+    view_class = getattr(match and match.func, 'view_class', None)
+    return getattr(view_class, 'query_budget', None)
+
+
+def pooled_aliases() -> list:
+    return [alias for alias, database in settings.DATABASES.items()
+            if database.get('OPTIONS', {}).get('pool')]
+
+
+def pool_stats() -> dict:
+    """Database alias -> psycopg_pool statistics, for pooled databases."""
+    return {alias: connections[alias].pool.get_stats()
+            for alias in pooled_aliases()}
+
+
+def wrap_connections(stack: ExitStack, metrics: RequestMetrics):
+    for connection in connections.all():
+        stack.enter_context(connection.execute_wrapper(metrics))
+
+
+class MetricsMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        metrics = request.metrics = RequestMetrics()
+        start = perf_counter()
+        with ExitStack() as stack:
+            wrap_connections(stack, metrics)
+            response = self.get_response(request)
+        return self.finish(request, response, metrics, start)
+
+    async def __acall__(self, request):
+        metrics = request.metrics = RequestMetrics()
+        start = perf_counter()
+        # Connections belong to a thread: wrap those of the thread the
+        # request's queries run in.
+        stack = ExitStack()
+        await sync_to_async(wrap_connections)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        return self.finish(request, response, metrics, start)
+
+    def finish(self, request, response, metrics, start):
+        metrics.request_seconds = perf_counter() - start
+        record(view_name(request), metrics)
+        response.headers['Server-Timing'] = metrics.server_timing()
+        self.check_budget(request, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        request.metrics.render_started()
+        response.add_post_render_callback(request.metrics.render_finished)
+        return response
+
+    @staticmethod
+    def check_budget(request, metrics):
+        budget = query_budget(request)
+        if request.method != 'GET' or budget is None \
+                or metrics.queries <= budget:
+            return
+        message = (f'{view_name(request)} ran {metrics.queries} queries, '
+                   f'its budget is {budget}.')
+        if settings.QUERY_BUDGET_ENFORCE:
+            raise QueryBudgetExceeded(message)
+        logger.warning(message)
+
+
+class BudgetTestRunner(DiscoverRunner):
+    """
+    Run the tests with QUERY_BUDGET_ENFORCE on and sessions in the cache:
+    the budgets are those of a deployment with a shared cache, which the
+    local memory of the single test process is.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self._budgets = override_settings(
+            QUERY_BUDGET_ENFORCE=True,
+            SESSION_ENGINE='django.contrib.sessions.backends.cached_db',
+        )
+        self._budgets.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self._budgets.disable()
+        super().teardown_test_environment(**kwargs)
+
+
+def metrics_view(request):
+    """The totals and the pools in the Prometheus text format."""
+    token = settings.METRICS_TOKEN
+    # Without a token the endpoint is for local development only.
+    authorized = constant_time_compare(
+        request.headers.get('Authorization', ''), f'Bearer {token}'
+    ) if token else settings.DEBUG
+    if not authorized:
+        raise Http404
+
+    lines = request_lines(snapshot()) + pool_lines(pool_stats())
+    return HttpResponse('\n'.join(lines) + '\n',
+                        content_type='text/plain; version=0.0.4')
+
+
+def request_lines(totals: dict) -> list:
+    lines = []
+    for name, help_text in COUNTERS.items():
+        metric = f'task_manager_{name}_total'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} counter')
+        for view, values in sorted(totals.items()):
+            lines.append(f'{metric}{{view="{view}"}} {values[name]}')
+    return lines
+
+
+def pool_lines(stats: dict) -> list:
+    if not stats:
+        return []
+    lines = []
+    for name, (metric_type, help_text) in POOL_METRICS.items():
+        metric = f'task_manager_db_pool_{name.removeprefix("pool_")}'
+        if metric_type == 'counter':
+            metric += '_total'
+        lines.append(f'# HELP {metric} {help_text}')
+        lines.append(f'# TYPE {metric} {metric_type}')
+        for alias, values in sorted(stats.items()):
+            lines.append(f'{metric}{{database="{alias}"}} '
+                         f'{values.get(name, 0)}')
+    return lines
@@ -0,0 +1,82 @@
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from whitenoise import middleware
+
+from task_manager import routers
+
+
+class WhiteNoiseMiddleware(middleware.WhiteNoiseMiddleware):
+    """
+    WhiteNoise that can also run in an async middleware chain.
+
+    The stock middleware is sync only, which makes Django run the whole
+    ASGI request in a thread. Here only static files are served from a
+    thread; other requests go straight on.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response=None, *args, **kwargs):
+        super().__init__(get_response, *args, **kwargs)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        return super().__call__(request)
+
+    async def __acall__(self, request):
+        if self.autorefresh:
+            static_file = await sync_to_async(self.find_file)(
+                request.path_info
+            )
+        else:
+            static_file = self.files.get(request.path_info)
+        if static_file is not None:
+            return await sync_to_async(self.serve)(static_file, request)
+        return await self.get_response(request)
+
+
+class ReplicaMiddleware:
+    """
+    Read from a replica in views with `use_replica`, unless the session
+    is pinned to the primary; pin it after a POST or another write.
+    Does nothing while DATABASE_REPLICAS is empty.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        with routers.request_state():
+            response = self.get_response(request)
+        if self.writes(request):
+            routers.pin(request)
+        return response
+
+    async def __acall__(self, request):
+        with routers.request_state():
+            response = await self.get_response(request)
+        if self.writes(request):
+            await sync_to_async(routers.pin)(request)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        view_class = getattr(view_func, 'view_class', None)
+        if settings.DATABASE_REPLICAS \
+                and getattr(view_class, 'use_replica', False) \
+                and not routers.is_pinned(request):
+            routers.use_replica()
+
+    @staticmethod
+    def writes(request) -> bool:
+        return bool(settings.DATABASE_REPLICAS) \
+            and request.method not in ('GET', 'HEAD', 'OPTIONS', 'TRACE')
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Version',
+            fields=[
+                ('table', models.CharField(max_length=100, primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -1,8 +1,28 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from contextlib import contextmanager
+from functools import reduce
+from hashlib import md5
+from importlib import reload
+from operator import or_
+
+from asgiref.sync import sync_to_async
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connections, transaction
+from django.db.models import Q
+from django.http import Http404
+from django.middleware.csrf import get_token
 from django.shortcuts import redirect
 from django.contrib import messages
 from django.contrib.auth.mixins import LoginRequiredMixin
-from django.urls import reverse_lazy
-from django.utils.translation import gettext_lazy as _
+from django.test.utils import override_settings
+from django.urls import clear_url_caches, reverse_lazy
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import quote_etag
+from django.utils.translation import get_language, gettext_lazy as _
+from django.views import View
+
+from .versions import versions, versions_query
 
 
 class NoAuthMixin(LoginRequiredMixin):
@@ -24,3 +44,331 @@ class NoPermissionMixin:
             messages.error(self.request, _(
                 'You are not authorized! Please come in.'))
         return redirect(self.permission_denied_url)
+
+
+class SaveUniqueMixin:
+    """
+    Save the UniqueConstraintMixin form of a create or update view in a
+    savepoint; a unique constraint violation shows the form again with
+    its error.
+    """
+
+    def form_valid(self, form):
+        try:
+            with transaction.atomic():
+                return super().form_valid(form)
+        except IntegrityError as error:
+            if not form.add_unique_error(error):
+                raise
+            return self.form_invalid(form)
+
+
+class KeysetPage:
+    """One page of rows cut by KeysetPaginationMixin."""
+
+    def __init__(self, object_list, params, cursor_kwarg, keyset,
+                 has_previous, has_next):
+        self.object_list = object_list
+        self.params = params
+        self.cursor_kwarg = cursor_kwarg
+        self.keyset = keyset
+        self._has_previous = has_previous
+        self._has_next = has_next
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_previous(self):
+        return self._has_previous and bool(self.object_list)
+
+    def has_next(self):
+        return self._has_next and bool(self.object_list)
+
+    def has_other_pages(self):
+        return self.has_previous() or self.has_next()
+
+    def _query(self, direction, row):
+        params = self.params.copy()
+        params[self.cursor_kwarg] = encode_cursor(
+            direction, [getattr(row, name) for name in self.keyset]
+        )
+        return params.urlencode()
+
+    def previous_query(self):
+        return self._query('prev', self.object_list[0])
+
+    def next_query(self):
+        return self._query('next', self.object_list[-1])
+
+
+def encode_cursor(direction, values):
+    raw = json.dumps([direction, *values], default=lambda value:
+                     value.isoformat())
+    return urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor):
+    direction, *values = json.loads(urlsafe_b64decode(cursor.encode()))
+    if direction not in ('prev', 'next') or not values:
+        raise ValueError(cursor)
+    return direction, values
+
+
+def _field(model, name):
+    return model._meta.pk if name == 'pk' else model._meta.get_field(name)
+
+
+def keyset_filter(queryset, key: list, lookup: str) -> Q:
+    """
+    The rows after `key`, [(attname, value)] in ORDER BY order, when every
+    column is ordered in the `lookup` ('gt' or 'lt') direction.
+
+    NULLs are where the database sorts them, so the order stays the one
+    of a plain index.
+    """
+    (name, value), rest = key[0], key[1:]
+    nulls_after = (lookup == 'gt') == \
+        connections[queryset.db].features.nulls_order_largest
+    nullable = _field(queryset.model, name).null
+    terms = []
+    if value is None:
+        if not nulls_after:
+            terms.append(Q(**{f'{name}__isnull': False}))
+        same = Q(**{f'{name}__isnull': True})
+    else:
+        terms.append(Q(**{f'{name}__{lookup}': value}))
+        if nulls_after and nullable:
+            terms.append(Q(**{f'{name}__isnull': True}))
+        same = Q(**{name: value})
+    if rest:
+        terms.append(same & keyset_filter(queryset, rest, lookup))
+    condition = reduce(or_, terms)
+    if value is not None and not (nulls_after and nullable):
+        # Redundant, but a range the index can seek to.
+        condition &= Q(**{f'{name}__{lookup}e': value})
+    return condition
+
+
+class KeysetPaginationMixin:
+    """
+    Paginate a ListView by its ordering columns and pk instead of OFFSET.
+
+    Every page is one indexed range query, so deep pages cost the same
+    as the first one. Other GET parameters (e.g. filters) are kept in
+    the previous/next links.
+    """
+    paginate_by = 50
+    keyset_field = 'timestamp'
+    cursor_kwarg = 'cursor'
+
+    def get_keyset(self) -> tuple:
+        """
+        The ordering: field names, all with or all without '-'. The pk
+        follows unless the last field is unique.
+        """
+        return (self.keyset_field,)
+
+    def paginate_queryset(self, queryset, page_size):
+        query, cut = self.keyset_query(queryset, page_size)
+        return cut(list(query))
+
+    def get_cursor(self):
+        """(direction, [key values] or None) of the requested page."""
+        cursor = self.request.GET.get(self.cursor_kwarg)
+        if not cursor:
+            return 'next', None
+        try:
+            return decode_cursor(cursor)
+        except (ValueError, TypeError):
+            raise Http404(_('Invalid page.'))
+
+    def get_key(self, model, keyset, values) -> list:
+        if len(values) != len(keyset):
+            raise Http404(_('Invalid page.'))
+        try:
+            return [(name, _field(model, name).to_python(value))
+                    for name, value in zip(keyset, values)]
+        except ValidationError:
+            raise Http404(_('Invalid page.'))
+
+    def keyset_query(self, queryset, page_size):
+        """
+        The query of one page and a function that turns its rows into
+        paginate_queryset()'s result.
+        """
+        direction, values = self.get_cursor()
+        names = self.get_keyset()
+        model = queryset.model
+        keyset = [_field(model, name.lstrip('-')).attname for name in names]
+        if not _field(model, keyset[-1]).unique:
+            keyset.append('pk')
+        descending = names[0].startswith('-') != (direction == 'prev')
+        if values:
+            key = self.get_key(model, keyset, values)
+            queryset = queryset.filter(
+                keyset_filter(queryset, key, 'lt' if descending else 'gt')
+            )
+        ordering = [f'-{name}' if descending else name for name in keyset]
+
+        def cut(rows):
+            has_more = len(rows) > page_size
+            rows = rows[:page_size]
+            if direction == 'prev':
+                rows.reverse()
+                has_previous, has_next = has_more, True
+            else:
+                has_previous, has_next = bool(values), has_more
+
+            page = KeysetPage(rows, self.request.GET, self.cursor_kwarg,
+                              keyset, has_previous, has_next)
+            return None, page, rows, page.has_other_pages()
+
+        return queryset.order_by(*ordering)[:page_size + 1], cut
+
+
+class ConditionalGetMixin:
+    """
+    Answer a repeated GET with 304 Not Modified while nothing on the page
+    has changed.
+
+    The ETag covers the versions of `watermark_models` (one primary key
+    lookup, see task_manager.versions), the query string, the user, the
+    language and the CSRF cookie. There is no Last-Modified: a date in
+    whole seconds misses changes within the second. A request with
+    pending messages is always rendered, so they are shown and consumed.
+    """
+    watermark_models = ()
+
+    def get(self, request, *args, **kwargs):
+        if self.has_messages():
+            return super().get(request, *args, **kwargs)
+
+        etag = self.get_etag(versions(self.watermark_models))
+        response = self.not_modified(etag)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        return self.add_etag(response, etag)
+
+    def has_messages(self) -> bool:
+        return bool(len(messages.get_messages(self.request)))
+
+    def not_modified(self, etag):
+        return get_conditional_response(self.request, etag=etag)
+
+    @staticmethod
+    def add_etag(response, etag):
+        if response.status_code == 200:
+            response.headers.setdefault('ETag', etag)
+        patch_cache_control(response, private=True, no_cache=True)
+        return response
+
+    def get_etag(self, state) -> str:
+        # Pages embed a CSRF token: set the cookie now so the tag is stable.
+        get_token(self.request)
+        parts = [
+            state, self.request.GET.urlencode(), self.request.user.pk,
+            get_language(), self.request.META.get('CSRF_COOKIE'),
+        ]
+        return quote_etag(md5(repr(parts).encode()).hexdigest())
+
+
+def reload_urls():
+    """Import the URL confs again, so they see the current ASYNC_VIEWS."""
+    from task_manager import urls
+    from task_manager.labels import urls as labels_urls
+    from task_manager.statuses import urls as statuses_urls
+    from task_manager.tasks import urls as tasks_urls
+    from task_manager.users import urls as users_urls
+    for module in (tasks_urls, statuses_urls, labels_urls, users_urls, urls):
+        reload(module)
+    clear_url_caches()
+
+
+@contextmanager
+def async_views():
+    """Route the read pages to their async views while in the block."""
+    try:
+        with override_settings(ASYNC_VIEWS=True):
+            reload_urls()
+            yield
+    finally:
+        reload_urls()
+
+
+class AsyncReadMixin:
+    """
+    Serve the GET of a ConditionalGetMixin view as a coroutine, for ASGI.
+
+    The user, the versions and the rows are read with the async ORM, so
+    a slow query does not hold a worker. Building the context (cached
+    choices, forms) runs in the request's thread. Put it first in the
+    bases of the sync view; `login_required` stands in for NoAuthMixin.
+    """
+    login_required = True
+
+    async def dispatch(self, request, *args, **kwargs):
+        request.user = await request.auser()
+        if self.login_required and not request.user.is_authenticated:
+            self.permission_denied_url = reverse_lazy('login')
+            return self.handle_no_permission()
+        return await View.dispatch(self, request, *args, **kwargs)
+
+    async def get(self, request, *args, **kwargs):
+        if await sync_to_async(self.has_messages)():
+            return await self.arender()
+
+        query = versions_query(self.watermark_models)
+        etag = self.get_etag(sorted([row async for row in query]))
+        response = self.not_modified(etag)
+        if response is None:
+            response = await self.arender()
+        return self.add_etag(response, etag)
+
+    async def arender(self):
+        """
+        The page of a view with no rows of its own to read: the context
+        is all built in the request's thread. The list and detail mixins
+        read theirs with the async ORM first.
+        """
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+
+class AsyncListMixin(AsyncReadMixin):
+    """AsyncReadMixin for a KeysetPaginationMixin list."""
+
+    async def arender(self):
+        self.object_list = await sync_to_async(self.get_object_list)()
+        query, cut = self.keyset_query(
+            self.object_list, self.get_paginate_by(self.object_list)
+        )
+        self.paginated = cut([row async for row in query])
+        context = await sync_to_async(self.get_context_data)()
+        return self.render_to_response(context)
+
+    def get_object_list(self):
+        return self.get_queryset()
+
+    def paginate_queryset(self, queryset, page_size):
+        return self.paginated
+
+
+class AsyncDetailMixin(AsyncReadMixin):
+    """AsyncReadMixin for a DetailView."""
+
+    async def arender(self):
+        self.object = await self.aget_object()
+        context = await sync_to_async(self.get_context_data)(
+            object=self.object
+        )
+        return self.render_to_response(context)
+
+    async def aget_object(self):
+        queryset = self.get_queryset()
+        try:
+            return await queryset.aget(pk=self.kwargs[self.pk_url_kwarg])
+        except queryset.model.DoesNotExist:
+            raise Http404
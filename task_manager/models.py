@@ -0,0 +1,29 @@
+from django.db import models
+
+
+class Version(models.Model):
+    """A number moved by every write to a table; see task_manager.versions."""
+    table = models.CharField(max_length=100, primary_key=True)
+    version = models.BigIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f'{self.table} {self.version}'
+
+
+class CountersMixin:
+    """
+    Keeps `counter_fields` out of the saves of loaded rows: queryset
+    updates move them (see task_manager.tasks.counters), so the copy a
+    form or a login holds is stale by the time it saves.
+    """
+    counter_fields = ()
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if (update_fields is None and not self._state.adding
+                and not kwargs.get('force_insert')):
+            update_fields = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.name not in self.counter_fields
+            ]
+        super().save(*args, update_fields=update_fields, **kwargs)
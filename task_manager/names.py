@@ -0,0 +1,29 @@
+"""
+Names unique regardless of case, the *_name_ci_unique constraints on
+Lower('name') of tasks, statuses and labels.
+"""
+
+
+def rename_case_duplicates(model, field: str = 'name'):
+    """
+    Suffix ' (<id>)' to the names that differ from an older row's only
+    in case, so that the constraint can be added to a table holding them.
+    """
+    max_length = model._meta.get_field(field).max_length
+    seen, renamed = set(), []
+    for row in model.objects.order_by('pk').only('pk', field).iterator():
+        name = getattr(row, field)
+        if name.lower() in seen:
+            suffix = f' ({row.pk})'
+            name = name[:max_length - len(suffix)] + suffix
+            setattr(row, field, name)
+            renamed.append(row)
+        seen.add(name.lower())
+    model.objects.bulk_update(renamed, [field], batch_size=1000)
+
+
+def rename_duplicates_of(app_label: str, model_name: str):
+    """A RunPython function renaming the duplicates of a model."""
+    def rename(apps, schema_editor):
+        rename_case_duplicates(apps.get_model(app_label, model_name))
+    return rename
@@ -0,0 +1,81 @@
+"""
+Reads of the list and detail pages from read replicas.
+
+A view opts in with `use_replica = True`. While ReplicaMiddleware handles
+a request for such a view, ReplicaRouter sends reads of the task manager's
+own models to one replica, picked per request. Everything else, writes
+and the cached filter choices included, uses the primary.
+
+After a user writes, their session is pinned to the primary for
+REPLICA_PIN_SECONDS, so they read what they wrote despite replica lag.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from random import choice
+from time import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+
+ROUTED_APPS = {'users', 'statuses', 'labels', 'tasks'}
+PIN_SESSION_KEY = '_primary_until'
+
+
+class ReplicaState:
+    """Replica the current request reads from, None for the primary."""
+
+    def __init__(self):
+        self.alias = None
+
+
+# Holds an object rather than the alias: sync_to_async runs code in a copy
+# of the context, where a new value would not reach the caller.
+_state = ContextVar('replica_state', default=None)
+
+
+@contextmanager
+def request_state():
+    token = _state.set(ReplicaState())
+    try:
+        yield
+    finally:
+        _state.reset(token)
+
+
+def use_replica():
+    state = _state.get()
+    if state is not None and settings.DATABASE_REPLICAS:
+        state.alias = choice(settings.DATABASE_REPLICAS)
+
+
+def current_replica():
+    state = _state.get()
+    return state and state.alias
+
+
+def is_pinned(request) -> bool:
+    return request.session.get(PIN_SESSION_KEY, 0) > time()
+
+
+def pin(request):
+    request.session[PIN_SESSION_KEY] = time() + settings.REPLICA_PIN_SECONDS
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if model._meta.app_label in ROUTED_APPS:
+            return current_replica()
+        return None
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.0/ref/settings/
 from pathlib import Path
 from dotenv import load_dotenv
 import os
+import tempfile
 import dj_database_url
 
 
@@ -65,13 +66,15 @@ INSTALLED_APPS = [
 MIDDLEWARE = [
     'django.middleware.locale.LocaleMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'task_manager.middleware.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
+    'task_manager.middleware.ReplicaMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'task_manager.metrics.MetricsMiddleware',
     'rollbar.contrib.django.middleware.RollbarNotifierMiddleware',
 ]
 
@@ -99,13 +102,78 @@ WSGI_APPLICATION = 'task_manager.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.0/ref/settings/#databases
 print(DATABASE_URL)
+# Use 0 under ASGI: requests run in short-lived threads, each with its own
+# connection.
+CONN_MAX_AGE = int(os.getenv('CONN_MAX_AGE', 600))
+# Check a kept or pooled connection before a request uses it, instead of
+# failing on one the server or a proxy has dropped.
+CONN_HEALTH_CHECKS = os.getenv('CONN_HEALTH_CHECKS', '1') != '0'
+
+# Share Postgres connections in a psycopg pool per worker process instead
+# of keeping one open per thread; CONN_MAX_AGE does not apply then. Keep
+# workers * DB_POOL_MAX_SIZE under the server's max_connections.
+DB_POOL = bool(os.getenv('DB_POOL', False))
+DB_POOL_OPTIONS = {
+    'min_size': int(os.getenv('DB_POOL_MIN_SIZE', 2)),
+    'max_size': int(os.getenv('DB_POOL_MAX_SIZE', 4)),
+    # Seconds a request waits for a free connection before it fails.
+    'timeout': float(os.getenv('DB_POOL_TIMEOUT', 10)),
+    # Seconds until idle connections above min_size are closed, and until
+    # any connection is replaced with a fresh one.
+    'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', 300)),
+    'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', 3600)),
+}
+
+
+def pooled(database: dict) -> dict:
+    if DB_POOL and database.get('ENGINE') == \
+            'django.db.backends.postgresql':
+        from psycopg_pool import ConnectionPool
+
+        options = dict(DB_POOL_OPTIONS)
+        if CONN_HEALTH_CHECKS:
+            # The pool sends an empty query on each connection before
+            # handing it out and replaces the ones that fail.
+            options['check'] = ConnectionPool.check_connection
+        database['CONN_MAX_AGE'] = 0
+        database.setdefault('OPTIONS', {})['pool'] = options
+    return database
+
+
 DATABASES = {
-    'default': dj_database_url.config(
+    'default': pooled(dj_database_url.config(
         # Feel free to alter this value to suit your needs.
         default=DATABASE_URL,
-        conn_max_age=600
-    )
+        conn_max_age=CONN_MAX_AGE,
+        conn_health_checks=CONN_HEALTH_CHECKS,
+    ))
 }
+
+if DATABASES['default']['ENGINE'] == 'django.db.backends.sqlite3':
+    # A file rather than the in-memory default: threads of the concurrency
+    # tests then wait for each other's locks instead of failing on them.
+    # Kept out of the checkout.
+    DATABASES['default']['TEST'] = {'NAME': os.path.join(
+        tempfile.gettempdir(), 'task_manager_test.sqlite3'
+    )}
+
+# Read replicas: comma separated URLs of copies of the database above,
+# e.g. SQLite files refreshed with `manage.py copy_sqlite_replicas`.
+# Views with use_replica read from them, see task_manager/routers.py.
+DATABASE_REPLICAS = []
+for number, url in enumerate(filter(None, os.getenv(
+        'DATABASE_REPLICA_URLS', '').split(','))):
+    alias = f'replica_{number}'
+    DATABASES[alias] = pooled(dj_database_url.parse(
+        url, conn_max_age=CONN_MAX_AGE, conn_health_checks=CONN_HEALTH_CHECKS,
+    ))
+    # Tests run against the primary only.
+    DATABASES[alias]['TEST'] = {'MIRROR': 'default'}
+    DATABASE_REPLICAS.append(alias)
+DATABASE_ROUTERS = ['task_manager.routers.ReplicaRouter']
+# How long a user reads from the primary after writing.
+REPLICA_PIN_SECONDS = int(os.getenv('REPLICA_PIN_SECONDS', 5))
+
 # DATABASES = {
 #     'default': {
 #         'ENGINE': 'django.db.backends.sqlite3',
@@ -113,6 +181,69 @@ DATABASES = {
 #     }
 # }
 
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND',
+                             'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', ''),
+    }
+}
+
+# Where sessions live: 'cached_db' (cache in front of the table), 'cache'
+# (cache only, sessions die with it) or 'db'. Both cache engines use the
+# 'default' cache above and need one the workers share (CACHE_BACKEND of
+# memcached, redis, the database or files): in the per-process local
+# memory default a worker would keep serving a session that another one
+# changed or ended. Without a shared cache sessions stay in 'db'.
+LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SESSION_STORE = os.getenv('SESSION_STORE', 'cached_db')
+if CACHES['default']['BACKEND'] in LOCAL_CACHES:
+    SESSION_STORE = 'db'
+SESSION_ENGINE = 'django.contrib.sessions.backends.' + SESSION_STORE
+
+# Flash messages: 'cookie' keeps them in a signed cookie so that they never
+# write the session; 'fallback' spills large ones into the session.
+MESSAGE_STORAGE = {
+    'cookie': 'django.contrib.messages.storage.cookie.CookieStorage',
+    'fallback': 'django.contrib.messages.storage.fallback.FallbackStorage',
+    'session': 'django.contrib.messages.storage.session.SessionStorage',
+}[os.getenv('MESSAGE_STORE', 'cookie')]
+
+# Route the task, status, label and user read views to their async
+# versions. Set it when serving task_manager.asgi.
+ASYNC_VIEWS = bool(os.getenv('ASYNC_VIEWS', False))
+
+# Bearer token /metrics asks for; without one it answers only with DEBUG.
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+# Raise instead of logging when a view runs more queries than its
+# query_budget. The test runner turns it on.
+QUERY_BUDGET_ENFORCE = bool(os.getenv('QUERY_BUDGET_ENFORCE', False))
+TEST_RUNNER = 'task_manager.metrics.BudgetTestRunner'
+
+# Upper bound of an autocomplete query on Postgres, in milliseconds.
+AUTOCOMPLETE_TIMEOUT_MS = int(os.getenv('AUTOCOMPLETE_TIMEOUT_MS', 200))
+
+
+# Hasher of new passwords: 'pbkdf2' or 'argon2' (argon2-cffi, installed
+# with Django's argon2 extra). The others still check older hashes, which
+# are rehashed at the next login.
+PASSWORD_HASHER = os.getenv('PASSWORD_HASHER', 'pbkdf2')
+# PBKDF2 rounds; 0 keeps Django's default.
+PBKDF2_ITERATIONS = int(os.getenv('PBKDF2_ITERATIONS', 0))
+PASSWORD_HASHERS = [
+    'task_manager.users.hashers.PBKDF2PasswordHasher',
+    'django.contrib.auth.hashers.Argon2PasswordHasher',
+    'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+    'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    'django.contrib.auth.hashers.ScryptPasswordHasher',
+]
+if PASSWORD_HASHER == 'argon2':
+    PASSWORD_HASHERS.insert(0, PASSWORD_HASHERS.pop(1))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.0/ref/settings/#auth-password-validators
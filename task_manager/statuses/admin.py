@@ -6,6 +6,6 @@ from .models import Status
 
 @admin.register(Status)
 class StatusAdmin(admin.ModelAdmin):
-    list_display = ('id', 'name', 'timestamp')
+    list_display = ('id', 'name', 'tasks_count', 'timestamp')
     search_fields = ['name']
     list_filter = (('timestamp', DateFieldListFilter),)
@@ -1,8 +1,10 @@
 from django.forms import ModelForm
+
+from task_manager.forms import UniqueConstraintMixin
 from .models import Status
 
 
-class StatusForm(ModelForm):
+class StatusForm(UniqueConstraintMixin, ModelForm):
     class Meta:
         model = Status
         fields = ('name', )
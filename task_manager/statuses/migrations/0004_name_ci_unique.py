@@ -0,0 +1,28 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:17
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+from task_manager.names import rename_duplicates_of
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('statuses', '0003_updated_at'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='status',
+            name='name',
+            field=models.CharField(max_length=200, verbose_name='Name'),
+        ),
+        # Rows whose names differ only in case would fail the constraint.
+        migrations.RunPython(rename_duplicates_of('statuses', 'Status'),
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='status',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='status_name_ci_unique'),
+        ),
+    ]
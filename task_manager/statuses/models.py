@@ -1,10 +1,25 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.utils.translation import gettext_lazy as _
 
+from task_manager.models import CountersMixin
 
-class Status(models.Model):
-    name = models.CharField(max_length=200, unique=True, verbose_name=_('Name'))
+
+class Status(CountersMixin, models.Model):
+    name = models.CharField(max_length=200, verbose_name=_('Name'))
     timestamp = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name=_('Date of change'))
+    # Maintained by task_manager.tasks.counters.
+    counter_fields = ('tasks_count',)
+    tasks_count = models.IntegerField(default=0, editable=False,
+                                      verbose_name=_('Tasks'))
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(Lower('name'),
+                                    name='status_name_ci_unique'),
+        ]
 
     def __str__(self) -> str:
         return self.name
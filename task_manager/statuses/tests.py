@@ -1,5 +1,11 @@
-from django.test import TestCase, Client
-from django.test.utils import override_settings
+from concurrent.futures import ThreadPoolExecutor
+from threading import Barrier
+from unittest import skipUnless
+
+from django.test import TestCase, TransactionTestCase, Client
+from django.test.utils import override_settings, CaptureQueriesContext
+from django.db import connection, connections
+from django.core.cache import cache
 from django.contrib.auth import get_user_model
 from .models import Status
 
@@ -138,3 +144,96 @@ class StatusesTests(TestCase):
         self.assertIn('Status deleted successfully', content)
         self.assertNotIn('test status rename', content)
         self.assertRedirects(response_redirect, '/statuses/', 302, 200)
+
+
+class SessionQueriesTests(TestCase):
+    ROUNDS = 5
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='sessions')
+
+    def session_queries(self, name: str) -> int:
+        """Session table queries of a create / list / list loop."""
+        cache.clear()
+        client = Client()
+        client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            for number in range(self.ROUNDS):
+                client.post('/statuses/create/',
+                            {'name': f'{name} status {number}'})
+                self.assertIn('alert-success',
+                              client.get('/statuses/').content.decode())
+                client.get('/statuses/')
+        return sum('django_session' in query['sql'] for query in queries)
+
+    def test_session_queries(self):
+        with override_settings(
+            SESSION_ENGINE='django.contrib.sessions.backends.db',
+            MESSAGE_STORAGE='django.contrib.messages.storage.session.'
+                            'SessionStorage',
+        ):
+            before = self.session_queries('Before')
+        after = self.session_queries('After')
+
+        # A read per request, a write per added and per shown message.
+        self.assertEqual(before, self.ROUNDS * 5)
+        self.assertEqual(after, 0)
+
+
+@override_settings(LANGUAGE_CODE='en-us')
+class UniqueNameTests(TransactionTestCase):
+    THREADS = 8
+    ERROR = 'Status with this Name already exists.'
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(username='unique')
+        Status.objects.create(name='Open')
+
+    def create(self, name: str, barrier: Barrier = None):
+        client = Client()
+        client.force_login(self.user)
+        try:
+            if barrier:
+                barrier.wait(timeout=10)
+            return client.post('/statuses/create/', {'name': name})
+        finally:
+            if barrier:
+                connections.close_all()
+
+    def test_case_insensitive(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.create('OPEN')
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(self.ERROR, response.content.decode())
+        # The constraint checks the name, not a query before the INSERT.
+        self.assertFalse([query for query in queries
+                          if query['sql'].startswith('SELECT 1 AS')
+                          and Status._meta.db_table in query['sql']])
+        self.assertEqual(Status.objects.count(), 1)
+
+    @skipUnless(connection.vendor == 'postgresql',
+                "SQLite's lower() folds ASCII letters only.")
+    def test_case_insensitive_cyrillic(self):
+        Status.objects.create(name='Открыт')
+        response = self.create('ОТКРЫТ')
+        self.assertIn(self.ERROR, response.content.decode())
+        self.assertEqual(Status.objects.filter(
+            name__iexact='открыт').count(), 1)
+
+    def test_parallel_creates(self):
+        barrier = Barrier(self.THREADS)
+        names = [('closed', 'Closed', 'CLOSED')[number % 3]
+                 for number in range(self.THREADS)]
+        with ThreadPoolExecutor(self.THREADS) as executor:
+            responses = list(executor.map(
+                lambda name: self.create(name, barrier), names
+            ))
+
+        codes = sorted(response.status_code for response in responses)
+        self.assertEqual(codes, [200] * (self.THREADS - 1) + [302])
+        for response in responses:
+            if response.status_code == 200:
+                self.assertIn(self.ERROR, response.content.decode())
+        self.assertEqual(Status.objects.filter(
+            name__iexact='closed').count(), 1)
@@ -1,9 +1,16 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 
+if settings.ASYNC_VIEWS:
+    Index = views.AsyncIndexStatuses
+else:
+    Index = views.IndexStatuses
+
+
 urlpatterns = [
-    path('', views.IndexStatuses.as_view(), name='index_statuses'),
+    path('', Index.as_view(), name='index_statuses'),
     path('create/', views.CreateStatus.as_view(), name='create_status'),
     path('<int:pk>/update/',
          views.UpdateStatus.as_view(),
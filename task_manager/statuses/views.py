@@ -1,5 +1,5 @@
 from typing import Any
-from django.http import HttpRequest, HttpResponse
+from django.http import HttpResponse
 from django.db.models.deletion import ProtectedError
 from django.shortcuts import redirect
 
@@ -15,11 +15,18 @@ from django.utils.translation import gettext_lazy as _
 from .models import Status
 from .forms import StatusForm
 
-from task_manager.mixin import NoAuthMixin, NoPermissionMixin
+from task_manager.mixin import (NoAuthMixin, NoPermissionMixin,
+                                ConditionalGetMixin, KeysetPaginationMixin,
+                                AsyncListMixin, SaveUniqueMixin)
 
 
-class IndexStatuses(NoPermissionMixin, NoAuthMixin, ListView):
+class IndexStatuses(NoPermissionMixin, NoAuthMixin, ConditionalGetMixin,
+                    KeysetPaginationMixin, ListView):
     model = Status
+    watermark_models = (Status,)
+    # session, user, versions and the rows
+    query_budget = 4
+    use_replica = True
     template_name = 'statuses/index_statuses.html'
     context_object_name = 'statuses'
 
@@ -29,16 +36,20 @@ class IndexStatuses(NoPermissionMixin, NoAuthMixin, ListView):
         return context
 
 
-class CreateStatus(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
-                   CreateView):
+class AsyncIndexStatuses(AsyncListMixin, IndexStatuses):
+    pass
+
+
+class CreateStatus(NoPermissionMixin, NoAuthMixin, SaveUniqueMixin,
+                   SuccessMessageMixin, CreateView):
     form_class = StatusForm
     template_name = 'statuses/create_status.html'
     success_url = reverse_lazy('index_statuses')
     success_message = _('Status successfully created')
 
 
-class UpdateStatus(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
-                   UpdateView):
+class UpdateStatus(NoPermissionMixin, NoAuthMixin, SaveUniqueMixin,
+                   SuccessMessageMixin, UpdateView):
     model = Status
     form_class = StatusForm
     template_name = 'statuses/update_status.html'
@@ -54,13 +65,15 @@ class DeleteStatus(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
     success_message = _('Status deleted successfully')
     error_del_message = _("The status cannot be deleted because it is in use.")
 
-    def post(self,
-             request: HttpRequest,
-             *args: str,
-             **kwargs: Any) -> HttpResponse:
+    def form_valid(self, form):
+        if self.object.tasks_count:
+            return self.in_use()
         try:
-            return super().post(request, *args, **kwargs)
+            return super().form_valid(form)
         except ProtectedError:
-            messages.add_message(request, messages.ERROR,
-                                 self.error_del_message)
-            return redirect(reverse_lazy('index_statuses'))
+            return self.in_use()
+
+    def in_use(self) -> HttpResponse:
+        messages.add_message(self.request, messages.ERROR,
+                             self.error_del_message)
+        return redirect(reverse_lazy('index_statuses'))
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'task_manager.tasks'
+
+    def ready(self):
+        from task_manager import choices, versions  # noqa: F401
+        from . import counters, fragments, search  # noqa: F401
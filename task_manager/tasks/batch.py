@@ -0,0 +1,321 @@
+"""
+Many task creates, updates and deletes in one transaction.
+
+Every item is checked as TaskForm checks one task: the plain fields by
+TaskForm's own form fields, with its error messages. The related rows,
+the tasks to change and the names already taken are looked up once for
+the whole batch, and the changes are written with bulk_create and
+bulk_update. Counters, the search index, the history and the table
+versions are kept in step the way `bulk` does.
+"""
+from collections import Counter
+from uuid import uuid4
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.utils.translation import gettext as _
+
+from . import bulk, history
+from .counters import (FK_COUNTERS, LABEL_COUNTER, change_counter,
+                       change_day_counter, change_fk_counters, task_day)
+from .forms import TaskForm
+from .models import Task, TaskEvent
+from .search import get_backend
+from .signals import mute_task_signals
+from ..forms import unique_message
+from ..versions import bump
+from ..labels.models import Label
+from ..statuses.models import Status
+
+
+MAX_ITEMS = 10_000
+OPERATIONS = ('create', 'update', 'delete')
+PLAIN_FIELDS = ('name', 'description')
+# Form field -> model of the ids it takes.
+RELATIONS = {'status': Status, 'executor': get_user_model()}
+BATCH_SIZE = 1000
+
+
+def _int(value) -> int:
+    if isinstance(value, bool):
+        raise ValueError(value)
+    return int(value)
+
+
+def _ids(value) -> list:
+    if not isinstance(value, list):
+        raise TypeError(value)
+    return [_int(pk) for pk in value]
+
+
+class TaskBatch:
+    """
+    Items are dicts with `op` ('create', 'update' or 'delete'), the `id`
+    of the task to update or delete, and TaskForm fields: `name`,
+    `description`, `status` and `executor` ids and a list of `labels`
+    ids. An update changes the given fields only.
+    """
+
+    def __init__(self, items: list, user):
+        self.items = items
+        self.user = user
+        self.errors = [{} for _item in items]
+        self.cleaned = [None] * len(items)
+
+    def add_error(self, index: int, field: str, message: str):
+        self.errors[index].setdefault(field, []).append(str(message))
+
+    def is_valid(self) -> bool:
+        for index, item in enumerate(self.items):
+            self.cleaned[index] = self.clean_item(index, item)
+        self.clean_tasks()
+        self.clean_relations()
+        self.clean_names()
+        return not any(self.errors)
+
+    def clean_item(self, index: int, item) -> dict:
+        if not isinstance(item, dict):
+            self.add_error(index, 'op', _('Expected an object.'))
+            return {}
+        op = item.get('op')
+        if op not in OPERATIONS:
+            self.add_error(index, 'op', _('Expected one of: %(ops)s.') %
+                           {'ops': ', '.join(OPERATIONS)})
+            return {}
+        cleaned = {'op': op}
+        if op != 'create':
+            self.clean_id(index, cleaned, item.get('id'))
+        if op != 'delete':
+            self.clean_fields(index, cleaned, item)
+        return cleaned
+
+    def clean_id(self, index: int, cleaned: dict, value):
+        try:
+            cleaned['id'] = _int(value)
+        except (TypeError, ValueError):
+            self.add_error(index, 'id', _('Enter a whole number.'))
+
+    def clean_fields(self, index: int, cleaned: dict, item: dict):
+        for name in item.keys() - {'op', 'id'} - set(TaskForm.Meta.fields):
+            self.add_error(index, name, _('Unknown field.'))
+        for name in TaskForm.Meta.fields:
+            if name not in item and cleaned['op'] == 'update':
+                continue
+            if name in PLAIN_FIELDS:
+                self.clean_plain(index, cleaned, name, item.get(name))
+            else:
+                self.clean_ids(index, cleaned, name, item.get(name))
+
+    def clean_plain(self, index: int, cleaned: dict, name: str, value):
+        try:
+            cleaned[name] = TaskForm.base_fields[name].clean(value)
+        except ValidationError as error:
+            for message in error.messages:
+                self.add_error(index, name, message)
+
+    def clean_ids(self, index: int, cleaned: dict, name: str, value):
+        field = TaskForm.base_fields[name]
+        if value in (None, '', []):
+            if field.required:
+                self.add_error(index, name, field.error_messages['required'])
+            else:
+                cleaned[name] = [] if name == 'labels' else None
+            return
+        try:
+            cleaned[name] = _ids(value) if name == 'labels' else _int(value)
+        except (TypeError, ValueError):
+            self.add_error(index, name, field.error_messages['invalid_choice']
+                           % {'value': value})
+
+    def operations(self, *ops):
+        for index, cleaned in enumerate(self.cleaned):
+            if cleaned and cleaned['op'] in ops:
+                yield index, cleaned
+
+    def clean_tasks(self):
+        """The tasks to update and delete exist; deletes are the author's."""
+        ids = {cleaned['id'] for _index, cleaned
+               in self.operations('update', 'delete') if 'id' in cleaned}
+        self.tasks = Task.objects.only(
+            'id', 'name', 'description', 'author_id', *FK_COUNTERS
+        ).in_bulk(ids)
+        seen = set()
+        for index, cleaned in self.operations('update', 'delete'):
+            task = self.tasks.get(cleaned.get('id'))
+            if task is None:
+                self.add_error(index, 'id', _('Task not found.'))
+            elif task.pk in seen:
+                self.add_error(index, 'id', _('The task is in the batch '
+                                              'more than once.'))
+            elif cleaned['op'] == 'delete' and \
+                    task.author_id != self.user.pk:
+                self.add_error(index, 'id',
+                               _('Only its author can delete a task'))
+            seen.add(cleaned.get('id'))
+
+    @staticmethod
+    def related_ids(cleaned: dict, name: str) -> list:
+        value = cleaned.get(name)
+        if name == 'labels':
+            return value or []
+        return [] if value is None else [value]
+
+    def clean_relations(self):
+        """Every related id exists."""
+        found = self.existing_ids()
+        for index, cleaned in self.operations('create', 'update'):
+            for name, existing in found.items():
+                message = TaskForm.base_fields[name] \
+                    .error_messages['invalid_choice']
+                for pk in self.related_ids(cleaned, name):
+                    if pk not in existing:
+                        self.add_error(index, name, message % {'value': pk})
+
+    def existing_ids(self) -> dict:
+        """Form field -> ids of the batch that exist, one query a model."""
+        models = {**RELATIONS, 'labels': Label}
+        wanted = {name: set() for name in models}
+        for _index, cleaned in self.operations('create', 'update'):
+            for name, ids in wanted.items():
+                ids.update(self.related_ids(cleaned, name))
+        return {name: set(models[name].objects.filter(pk__in=ids)
+                          .values_list('pk', flat=True)) if ids else set()
+                for name, ids in wanted.items()}
+
+    def clean_names(self):
+        """
+        Names stay unique regardless of case, in the batch and with the
+        other tasks.
+        """
+        final = {}
+        for index, cleaned in self.operations('create', 'update'):
+            if cleaned.get('name'):
+                final.setdefault(cleaned['name'].lower(), []).append(index)
+        taken = set(self.taken_names(final))
+        for name, indexes in final.items():
+            # The first item may have a name no other task keeps.
+            for index in indexes if name in taken else indexes[1:]:
+                self.add_error(index, 'name', unique_message(Task, 'name'))
+
+    def taken_names(self, names) -> list:
+        """The lower-cased `names` other tasks keep after the batch."""
+        freed = [cleaned['id'] for _index, cleaned
+                 in self.operations('update', 'delete')
+                 if 'id' in cleaned and ('name' in cleaned
+                                         or cleaned['op'] == 'delete')]
+        return Task.objects.annotate(lower_name=Lower('name')) \
+            .filter(lower_name__in=list(names)).exclude(pk__in=freed) \
+            .values_list('lower_name', flat=True)
+
+    def save(self) -> list:
+        """Apply a valid batch; the id of each item's task, in order."""
+        self.counters = {attname: Counter() for attname in FK_COUNTERS}
+        self.label_counter = Counter()
+        # Task id -> the history changes of its item.
+        self.changes = {}
+        with transaction.atomic(), mute_task_signals():
+            delete_ids = [cleaned['id'] for _index, cleaned
+                          in self.operations('delete')]
+            if delete_ids:
+                bulk.delete_tasks(Task.objects.filter(pk__in=delete_ids),
+                                  actor=self.user)
+            updated = self.update()
+            created = self.create()
+            self.set_labels()
+
+            change_fk_counters(self.counters)
+            change_counter(*LABEL_COUNTER, self.label_counter)
+            bump(Task)
+            get_backend().index(updated + created)
+            for kind, tasks in ((TaskEvent.Kind.CHANGED, updated),
+                                (TaskEvent.Kind.CREATED, created)):
+                history.record(kind, [(task.pk, self.changes[task.pk])
+                                      for task in tasks], actor=self.user)
+        return [cleaned.get('id') for cleaned in self.cleaned]
+
+    def count(self, task, sign: int):
+        for attname in FK_COUNTERS:
+            self.counters[attname][getattr(task, attname)] += sign
+
+    def free_names(self):
+        """
+        Move the renamed tasks to placeholder names first: the unique
+        index is checked row by row, so a swap or a chain of names would
+        hit a name the next row is about to free.
+        """
+        renamed = [self.tasks[cleaned['id']] for _index, cleaned
+                   in self.operations('update') if 'name' in cleaned]
+        if len(renamed) < 2:
+            return
+        prefix = uuid4().hex
+        Task.objects.bulk_update(
+            [Task(pk=task.pk, name=f'{prefix} {task.pk}') for task in renamed],
+            ['name'], batch_size=BATCH_SIZE,
+        )
+
+    def update(self) -> list:
+        tasks, fields = [], {'updated_at'}
+        now = timezone.now()
+        self.free_names()
+        for _index, cleaned in self.operations('update'):
+            task = self.tasks[cleaned['id']]
+            old = history.values(task)
+            self.count(task, -1)
+            for name in PLAIN_FIELDS:
+                if name in cleaned:
+                    setattr(task, name, cleaned[name])
+                    fields.add(name)
+            for name in RELATIONS:
+                if name in cleaned:
+                    setattr(task, f'{name}_id', cleaned[name])
+                    fields.add(f'{name}_id')
+            task.updated_at = now
+            self.count(task, 1)
+            self.changes[task.pk] = history.diff(old, history.values(task))
+            tasks.append(task)
+        Task.objects.bulk_update(tasks, list(fields), batch_size=BATCH_SIZE)
+        return tasks
+
+    def create(self) -> list:
+        tasks = []
+        for _index, cleaned in self.operations('create'):
+            tasks.append(Task(
+                name=cleaned['name'], description=cleaned['description'],
+                status_id=cleaned['status'], executor_id=cleaned['executor'],
+                author_id=self.user.pk,
+            ))
+            self.count(tasks[-1], 1)
+        Task.objects.bulk_create(tasks, batch_size=BATCH_SIZE)
+        change_day_counter(Counter(task_day(task.timestamp)
+                                   for task in tasks))
+        for (_index, cleaned), task in zip(self.operations('create'), tasks):
+            cleaned['id'] = task.pk
+            self.changes[task.pk] = history.diff({}, history.values(task))
+        return tasks
+
+    def set_labels(self):
+        """Replace the labels of the tasks the items give labels for."""
+        through = Task.labels.through
+        labels = {cleaned['id']: cleaned['labels'] for _index, cleaned
+                  in self.operations('create', 'update')
+                  if 'labels' in cleaned}
+        old = through.objects.filter(task_id__in=[
+            pk for _index, cleaned in self.operations('update')
+            if (pk := cleaned['id']) in labels
+        ])
+        old_labels = {pk: [] for pk in labels}
+        for task_id, label_id in old.values_list('task_id', 'label_id'):
+            old_labels[task_id].append(label_id)
+            self.label_counter[label_id] -= 1
+        old.delete()
+        for pk, label_ids in labels.items():
+            self.changes[pk].update(history.label_diff(old_labels[pk],
+                                                       label_ids))
+        links = [through(task_id=task_id, label_id=label_id)
+                 for task_id, label_ids in labels.items()
+                 for label_id in set(label_ids)]
+        through.objects.bulk_create(links, batch_size=BATCH_SIZE)
+        self.label_counter.update(link.label_id for link in links)
@@ -0,0 +1,153 @@
+"""
+Set-based changes of many tasks at once.
+
+Each function takes a queryset of tasks, runs in one transaction and keeps
+the denormalized counters, the search index and the table versions in
+step with a handful of grouped queries instead of per-row signals. The
+changed tasks get a history event of `actor`.
+"""
+from collections import Counter
+from itertools import groupby, islice
+
+from django.db import connection, transaction
+from django.db.models import Count
+from django.db.models.functions import TruncDate
+from django.utils import timezone
+
+from . import history
+from .counters import (FK_COUNTERS, LABEL_COUNTER, change_counter,
+                       change_day_counter, change_fk_counters)
+from .models import Task, TaskEvent
+from .search import get_backend
+from ..versions import bump
+
+
+BATCH_SIZE = 1000
+
+
+def _selected(queryset):
+    return Task.objects.filter(pk__in=queryset.order_by().values('pk'))
+
+
+def _decrements(queryset, field: str) -> Counter:
+    """{value of `field`: -number of rows} for the counters."""
+    rows = queryset.order_by().values_list(field).annotate(count=Count('pk'))
+    return Counter({value: -count for value, count in rows})
+
+
+def _delete_rows(model, column: str, values) -> int:
+    """DELETE the `model` rows whose `column` is in `values`, unsignalled."""
+    quote = connection.ops.quote_name
+    placeholders = ', '.join(['%s'] * len(values))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {quote(model._meta.db_table)} '
+            f'WHERE {quote(column)} IN ({placeholders})',
+            list(values),
+        )
+        return cursor.rowcount
+
+
+def _touch(tasks):
+    """Move updated_at of the tasks whose labels changed."""
+    Task.objects.filter(pk__in=tasks).update(updated_at=timezone.now())
+
+
+def set_relation(queryset, attname: str, value, actor=None) -> int:
+    """Point `status_id` or `executor_id` of every selected task to `value`."""
+    model, field = FK_COUNTERS[attname]
+    name = attname.removesuffix('_id')
+    tasks = _selected(queryset)
+    with transaction.atomic():
+        old = tasks.exclude(**{attname: value}).values_list('pk', attname)
+        history.record(TaskEvent.Kind.CHANGED, (
+            (pk, {name: [old_value, value]})
+            for pk, old_value in old.iterator(chunk_size=BATCH_SIZE)
+        ), actor=actor)
+        deltas = _decrements(tasks, attname)
+        count = tasks.update(**{attname: value, 'updated_at': timezone.now()})
+        deltas[value] += count
+        change_counter(model, field, deltas)
+        bump(Task)
+    return count
+
+
+def add_labels(queryset, labels, actor=None) -> int:
+    """Link the labels to the selected tasks; return the number of links."""
+    through = Task.labels.through
+    tasks = _selected(queryset)
+    created = Counter()
+    with transaction.atomic():
+        for label in labels:
+            missing = tasks.exclude(labels=label).values_list('pk', flat=True)
+            missing = missing.iterator(chunk_size=BATCH_SIZE)
+            while batch := list(islice(missing, BATCH_SIZE)):
+                through.objects.bulk_create(
+                    [through(task_id=pk, label_id=label.pk) for pk in batch]
+                )
+                _touch(batch)
+                history.record(TaskEvent.Kind.CHANGED, [
+                    (pk, {'labels': [[], [label.pk]]}) for pk in batch
+                ], actor=actor)
+                created[label.pk] += len(batch)
+        change_counter(*LABEL_COUNTER, created)
+        bump(Task)
+    return sum(created.values())
+
+
+def remove_labels(queryset, labels, actor=None) -> int:
+    """Unlink the labels from the selected tasks; return the number of links."""
+    links = Task.labels.through.objects.filter(
+        task_id__in=queryset.order_by().values('pk'), label__in=labels
+    )
+    with transaction.atomic():
+        deltas = _decrements(links, 'label_id')
+        rows = links.order_by('task_id', 'label_id') \
+            .values_list('task_id', 'label_id').iterator(chunk_size=BATCH_SIZE)
+        history.record(TaskEvent.Kind.CHANGED, (
+            (pk, {'labels': [[label for _pk, label in group], []]})
+            for pk, group in groupby(rows, key=lambda row: row[0])
+        ), actor=actor)
+        _touch(links.values('task_id'))
+        links.delete()
+        change_counter(*LABEL_COUNTER, deltas)
+        bump(Task)
+    return -sum(deltas.values())
+
+
+def delete_tasks(queryset, actor=None) -> int:
+    """
+    Delete the selected tasks and their label links.
+
+    Runs its own DELETE statements: the Task receivers keep the Collector
+    from fast deleting, so `QuerySet.delete()` would fetch and signal
+    every row.
+    """
+    tasks = _selected(queryset)
+    links = Task.labels.through.objects.filter(task__in=tasks)
+    with transaction.atomic():
+        deltas = {attname: _decrements(tasks, attname)
+                  for attname in FK_COUNTERS}
+        label_deltas = _decrements(links, 'label_id')
+        day_deltas = _decrements(
+            tasks.annotate(day=TruncDate('timestamp')), 'day'
+        )
+        names = list(tasks.values_list('pk', 'name'))
+        pks = [pk for pk, _name in names]
+        history.record(TaskEvent.Kind.DELETED,
+                       [(pk, history.deleted(name)) for pk, name in names],
+                       actor=actor)
+
+        # By pk: a label filter would stop matching once links are gone.
+        deleted = 0
+        for start in range(0, len(pks), BATCH_SIZE):
+            batch = pks[start:start + BATCH_SIZE]
+            _delete_rows(links.model, 'task_id', batch)
+            deleted += _delete_rows(Task, Task._meta.pk.column, batch)
+
+        change_fk_counters(deltas)
+        change_counter(*LABEL_COUNTER, label_deltas)
+        change_day_counter(day_deltas)
+        bump(Task)
+        get_backend().remove(pks)
+    return deleted
@@ -0,0 +1,215 @@
+"""
+Denormalized task counters on Status, Label and User, and the tasks per
+creation day (TaskDay).
+
+Signals keep them in step with single-object writes; bulk writes have to
+call `change_counter` themselves or run `manage.py reconcile_counters`.
+"""
+from collections import Counter
+
+from django.apps import apps as global_apps
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, TruncDate
+from django.db.models.signals import (m2m_changed, post_delete, post_save,
+                                      pre_delete, pre_save)
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .models import Task, TaskDay
+from .signals import task_signals_muted
+from ..versions import bump
+
+
+# Task foreign key -> (model label, counter field).
+FK_COUNTERS = {
+    'status_id': ('statuses.Status', 'tasks_count'),
+    'author_id': ('users.User', 'authored_tasks_count'),
+    'executor_id': ('users.User', 'assigned_tasks_count'),
+}
+LABEL_COUNTER = ('labels.Label', 'tasks_count')
+
+
+def _by_delta(changes: dict) -> dict:
+    """{(field, delta): [pk, ...]} of {field: {pk: delta}}, skipping zeros."""
+    by_delta = {}
+    for field, deltas in changes.items():
+        for pk, delta in deltas.items():
+            if pk is not None and delta:
+                by_delta.setdefault((field, delta), []).append(pk)
+    return by_delta
+
+
+def change_counters(model, changes: dict):
+    """
+    Apply {field: {pk: delta}} to `model` rows, one UPDATE per field and
+    delta.
+
+    In a transaction the rows are locked first, in primary key order:
+    writers of the same rows (a task's author and executor swapped in
+    another) then queue up instead of deadlocking. The rows' updated_at
+    and the model's version move too: the counters are on their list
+    pages.
+    """
+    if isinstance(model, str):
+        model = global_apps.get_model(model)
+    by_delta = _by_delta(changes)
+    if not by_delta:
+        return
+    pks = set().union(*by_delta.values())
+    if len(pks) > 1 and transaction.get_connection().in_atomic_block:
+        list(model.objects.filter(pk__in=pks).order_by('pk')
+             .select_for_update().values_list('pk', flat=True))
+    now = timezone.now()
+    for (field, delta), pks in by_delta.items():
+        model.objects.filter(pk__in=pks).update(
+            **{field: F(field) + delta, 'updated_at': now}
+        )
+    bump(model)
+
+
+def change_counter(model, field: str, deltas: dict):
+    """Apply {pk: delta} to `field` of `model` rows; see change_counters."""
+    change_counters(model, {field: deltas})
+
+
+def change_fk_counters(deltas: dict):
+    """
+    Apply {Task foreign key attname: {pk: delta}} to the FK_COUNTERS, the
+    fields of a model at once: the author and the executor are both users.
+    """
+    by_model = {}
+    for attname, (model, field) in FK_COUNTERS.items():
+        if attname in deltas:
+            by_model.setdefault(model, {})[field] = deltas[attname]
+    for model, changes in by_model.items():
+        change_counters(model, changes)
+
+
+def task_day(timestamp):
+    """The TaskDay of a creation time: its date in the current time zone."""
+    return timezone.localdate(timestamp)
+
+
+def change_day_counter(deltas: dict):
+    """change_counter of TaskDay rows, adding the days first seen."""
+    days = [day for day, delta in deltas.items() if delta]
+    TaskDay.objects.bulk_create([TaskDay(day=day) for day in days],
+                                ignore_conflicts=True)
+    change_counter(TaskDay, 'tasks_count', deltas)
+
+
+def _count(queryset, field: str):
+    counts = queryset.filter(**{field: OuterRef('pk')}).order_by() \
+        .values(field).annotate(count=Count('pk')).values('count')
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
+
+
+def reconcile_counters(apps=global_apps):
+    """Recompute every counter from the tasks table."""
+    task_model = apps.get_model('tasks', 'Task')
+    through = task_model.labels.through
+    tasks = task_model.objects.all()
+
+    apps.get_model('statuses', 'Status').objects.update(
+        tasks_count=_count(tasks, 'status')
+    )
+    apps.get_model('labels', 'Label').objects.update(
+        tasks_count=_count(through.objects.all(), 'label')
+    )
+    apps.get_model('users', 'User').objects.update(
+        authored_tasks_count=_count(tasks, 'author'),
+        assigned_tasks_count=_count(tasks, 'executor'),
+    )
+    if apps is global_apps:
+        # Migrations run it before the versions table exists.
+        bump(*(apps.get_model(label) for label in ('statuses.Status',
+                                                   'labels.Label',
+                                                   'users.User')))
+
+
+def reconcile_days(apps=global_apps):
+    """Recompute the TaskDay rows from the tasks table."""
+    day_model = apps.get_model('tasks', 'TaskDay')
+    rows = apps.get_model('tasks', 'Task').objects.order_by() \
+        .values_list(TruncDate('timestamp')).annotate(count=Count('pk'))
+    day_model.objects.all().delete()
+    day_model.objects.bulk_create(
+        [day_model(day=day, tasks_count=count) for day, count in rows],
+        batch_size=1000,
+    )
+    if apps is global_apps:
+        bump(day_model)
+
+
+@receiver(pre_save, sender=Task)
+def remember_relations(sender, instance, **kwargs):
+    if task_signals_muted():
+        return
+    instance._counter_relations = None
+    if instance.pk is not None:
+        instance._counter_relations = Task.objects.filter(
+            pk=instance.pk
+        ).values(*FK_COUNTERS).first()
+
+
+@receiver(post_save, sender=Task)
+def count_saved_task(sender, instance, created, **kwargs):
+    if task_signals_muted():
+        return
+    old = getattr(instance, '_counter_relations', None) or {}
+    deltas = {}
+    for attname in FK_COUNTERS:
+        old_pk, new_pk = old.get(attname), getattr(instance, attname)
+        if old_pk != new_pk:
+            deltas[attname] = {old_pk: -1, new_pk: 1}
+    change_fk_counters(deltas)
+    if created:
+        change_day_counter({task_day(instance.timestamp): 1})
+
+
+@receiver(pre_delete, sender=Task)
+def remember_labels(sender, instance, **kwargs):
+    if task_signals_muted():
+        return
+    instance._counter_labels = list(
+        Task.labels.through.objects.filter(task_id=instance.pk)
+        .values_list('label_id', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Task)
+def count_deleted_task(sender, instance, **kwargs):
+    if task_signals_muted():
+        return
+    change_fk_counters({attname: {getattr(instance, attname): -1}
+                        for attname in FK_COUNTERS})
+    labels = getattr(instance, '_counter_labels', [])
+    change_counter(*LABEL_COUNTER, dict.fromkeys(labels, -1))
+    change_day_counter({task_day(instance.timestamp): -1})
+
+
+@receiver(m2m_changed, sender=Task.labels.through)
+def count_labels(sender, instance, action, reverse, pk_set, **kwargs):
+    if task_signals_muted():
+        return
+    if action in ('pre_remove', 'pre_clear'):
+        # Django passes the requested ids: count only existing links.
+        links = sender.objects.filter(
+            **{'label_id' if reverse else 'task_id': instance.pk}
+        )
+        if pk_set is not None:
+            links = links.filter(
+                **{'task_id__in' if reverse else 'label_id__in': pk_set}
+            )
+        instance._counter_links = list(links.values_list('label_id',
+                                                         flat=True))
+        return
+
+    if action == 'post_add':
+        labels = [instance.pk] * len(pk_set) if reverse else pk_set
+        change_counter(*LABEL_COUNTER, Counter(labels))
+    elif action in ('post_remove', 'post_clear'):
+        labels = Counter(getattr(instance, '_counter_links', []))
+        change_counter(*LABEL_COUNTER,
+                       {label: -count for label, count in labels.items()})
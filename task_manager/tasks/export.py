@@ -0,0 +1,154 @@
+"""
+Streaming export of the task list as CSV or JSON Lines.
+
+Rows are read as tuples through `.iterator()` (a server-side cursor on
+Postgres) in the order of the given queryset and written out one by one,
+so memory does not grow with the number of tasks. Label names come from a
+correlated subquery; in CSV they are one nested CSV record, which
+`import_tasks` reads back.
+"""
+import csv
+import json
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+
+from django.db.models import Aggregate, CharField, OuterRef, Subquery, Value
+from django.http import StreamingHttpResponse
+
+from .models import Task
+
+
+CHUNK_SIZE = 2000
+LABEL_SEPARATOR = '\x1f'
+COLUMNS = ('id', 'name', 'description', 'status', 'author', 'executor',
+           'labels', 'timestamp')
+
+
+class GroupConcat(Aggregate):
+    function = 'GROUP_CONCAT'
+    output_field = CharField()
+
+    def as_postgresql(self, compiler, connection, **extra_context):
+        return super().as_sql(compiler, connection, function='STRING_AGG',
+                              **extra_context)
+
+
+def _label_names():
+    names = Task.labels.through.objects.filter(task=OuterRef('pk')) \
+        .order_by().values('task') \
+        .annotate(names=GroupConcat('label__name', Value(LABEL_SEPARATOR))) \
+        .values('names')
+    return Subquery(names, output_field=CharField())
+
+
+def _full_name(first_name, last_name):
+    return f'{first_name or ""} {last_name or ""}'.strip()
+
+
+def _export_values(queryset):
+    return queryset.annotate(label_names=_label_names()).values_list(
+            'id', 'name', 'description', 'status__name',
+            'author__first_name', 'author__last_name',
+            'executor__first_name', 'executor__last_name',
+            'label_names', 'timestamp',
+        )
+
+
+def _row(values) -> dict:
+    (pk, name, description, status, author_first, author_last,
+     executor_first, executor_last, labels, timestamp) = values
+    return {
+        'id': pk,
+        'name': name,
+        'description': description,
+        'status': status,
+        'author': _full_name(author_first, author_last),
+        'executor': _full_name(executor_first, executor_last),
+        'labels': labels.split(LABEL_SEPARATOR) if labels else [],
+        'timestamp': timestamp.isoformat(),
+    }
+
+
+def export_rows(queryset):
+    for values in _export_values(queryset).iterator(chunk_size=CHUNK_SIZE):
+        yield _row(values)
+
+
+def _next_chunk(values) -> list:
+    return list(islice(values, CHUNK_SIZE))
+
+
+async def aexport_rows(queryset):
+    # Not aiterator(): it starts a values_list() query in the event loop.
+    values = _export_values(queryset).iterator(chunk_size=CHUNK_SIZE)
+    while chunk := await sync_to_async(_next_chunk)(values):
+        for row in chunk:
+            yield _row(row)
+
+
+class Echo:
+    """A file-like object for csv.writer that returns what is written."""
+
+    def write(self, value):
+        return value
+
+
+_csv = csv.writer(Echo())
+
+
+def _labels_cell(names) -> str:
+    """The names as a CSV record: quoted where a name has a comma."""
+    return _csv.writerow(names).rstrip('\r\n')
+
+
+def csv_line(row) -> str:
+    return _csv.writerow([_labels_cell(row[column]) if column == 'labels'
+                          else row[column] for column in COLUMNS])
+
+
+def jsonl_line(row) -> str:
+    return json.dumps(row, ensure_ascii=False) + '\n'
+
+
+# format -> (line of a row, header line, content type)
+FORMATS = {
+    'csv': (csv_line, _csv.writerow(COLUMNS), 'text/csv'),
+    'jsonl': (jsonl_line, '', 'application/x-ndjson'),
+}
+
+
+def export_lines(rows, export_format: str):
+    line, header, _content_type = FORMATS[export_format]
+    if header:
+        yield header
+    for row in rows:
+        yield line(row)
+
+
+async def aexport_lines(rows, export_format: str):
+    line, header, _content_type = FORMATS[export_format]
+    if header:
+        yield header
+    async for row in rows:
+        yield line(row)
+
+
+def export_response(queryset, export_format: str,
+                    asynchronous: bool = False) -> StreamingHttpResponse:
+    """
+    The export as a streaming response; an asynchronous one reads the
+    rows a chunk at a time in the request's thread, for ASGI.
+    """
+    # The rows are read after the view returns: keep the view's database.
+    queryset = queryset.using(queryset.db)
+    if asynchronous:
+        lines = aexport_lines(aexport_rows(queryset), export_format)
+    else:
+        lines = export_lines(export_rows(queryset), export_format)
+    response = StreamingHttpResponse(
+        lines, content_type=FORMATS[export_format][2]
+    )
+    response['Content-Disposition'] = \
+        f'attachment; filename="tasks.{export_format}"'
+    return response
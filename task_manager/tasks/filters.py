@@ -1,24 +1,109 @@
+from operator import mod
+
+from django.utils.functional import lazy
 from django.utils.translation import gettext_lazy as _
 
 from django_filters import FilterSet
-from django_filters import ChoiceFilter, BooleanFilter
+from django_filters import (ChoiceFilter, BooleanFilter, CharFilter,
+                            OrderingFilter)
 
 from django import forms
 from .models import Task
-from ..labels.models import Label
+from .search import get_backend
+
+from task_manager.choices import CachedChoicesMixin, get_choices
+
+
+class TasksFilterForm(CachedChoicesMixin, forms.Form):
+    cached_choices = {'status': 'statuses',
+                      'executor': 'users'}
+
+
+# `format % label` when the label is shown, in the language of then.
+_descending_label = lazy(mod, str)
+
+
+class KeysetOrderingFilter(OrderingFilter):
+    """
+    One of a few orderings, each the leading columns of a Task index, so
+    the rows come in index order and keyset pages need no sort.
+
+    `keysets` maps a choice to its columns. A relation is ordered by its
+    id, which groups the tasks by it, then by date of creation.
+    """
+    keysets = {
+        'timestamp': ('timestamp',),
+        'name': ('name',),
+        'status': ('status', 'timestamp'),
+        'executor': ('executor', 'timestamp'),
+        'author': ('author', 'timestamp'),
+    }
+    default = ('timestamp',)
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('fields', {name: name for name in self.keysets})
+        super().__init__(*args, **kwargs)
+
+    def build_choices(self, fields, labels):
+        """
+        OrderingFilter's choices, with the descending labels formatted when
+        shown: formatting them here would freeze the language of import.
+        """
+        labels = {
+            **{f'-{param}': _descending_label(self.descending_fmt,
+                                              labels[field])
+               for field, param in fields.items() if field in labels},
+            **labels,
+        }
+        return super().build_choices(fields, labels)
+
+    def get_keyset(self, value) -> tuple:
+        """The keyset of a cleaned value: the first ordering given."""
+        if not value:
+            return self.default
+        name = value[0]
+        keyset = self.keysets[name.lstrip('-')]
+        if name.startswith('-'):
+            return tuple(f'-{column}' for column in keyset)
+        return keyset
+
+    def get_ordering(self, value) -> tuple:
+        """The order_by() of a cleaned value: its keyset, then the pk."""
+        keyset = self.get_keyset(value)
+        pk = '-pk' if keyset[0].startswith('-') else 'pk'
+        return (*keyset, pk)
+
+    def filter(self, qs, value):
+        if not value:
+            return qs
+        return qs.order_by(*self.get_ordering(value))
 
 
 class TasksFilter(FilterSet):
+    q = CharFilter(method='filter_search', label=_('Search'))
     label = ChoiceFilter(
-        choices=lambda: [(label.id, label.name)
-                         for label
-                         in Label.objects.all()],
+        choices=lambda: get_choices('labels'),
         field_name='labels',
         label=_('Label'),
     )
     self_tasks = BooleanFilter(widget=forms.CheckboxInput,
                                method='filter_author',
                                label=_('Only your tasks'))
+    ordering = KeysetOrderingFilter(
+        label=_('Sort by'),
+        field_labels={
+            'timestamp': _('Date of creation'),
+            'name': _('Name'),
+            'status': _('Status'),
+            'executor': _('Executor'),
+            'author': _('Author'),
+        },
+    )
+
+    def __init__(self, data=None, queryset=None, **kwargs):
+        if queryset is None:
+            queryset = Task.objects.for_list()
+        super().__init__(data, queryset, **kwargs)
 
     def filter_author(self, queryset, *args, **kwargs):
         author = args[-1]
@@ -27,6 +112,26 @@ class TasksFilter(FilterSet):
             return queryset.filter(author=author)
         return queryset
 
+    def _ordering_value(self):
+        if self.is_bound and self.is_valid():
+            return self.form.cleaned_data['ordering']
+        return None
+
+    def get_keyset(self) -> tuple:
+        """The KeysetPaginationMixin ordering of the chosen sort."""
+        return self.filters['ordering'].get_keyset(self._ordering_value())
+
+    def get_ordering(self) -> tuple:
+        """The full order_by() of the chosen sort, for unpaginated reads."""
+        return self.filters['ordering'].get_ordering(self._ordering_value())
+
+    def filter_search(self, queryset, name, value):
+        if value:
+            return get_backend().filter(queryset, value)
+        return queryset
+
     class Meta:
         model = Task
-        fields = ['status', 'executor', 'label', 'self_tasks']
+        form = TasksFilterForm
+        fields = ['q', 'status', 'executor', 'label', 'self_tasks',
+                  'ordering']
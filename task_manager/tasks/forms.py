@@ -1,8 +1,79 @@
+from django import forms
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
 from django.forms import ModelForm
+from django.utils.translation import gettext_lazy as _
+
 from .models import Task
+from ..labels.models import Label
+from ..statuses.models import Status
+
+from task_manager.choices import AutocompleteMixin, CachedChoicesMixin
+from task_manager.forms import UniqueConstraintMixin
+
 
+class TaskForm(UniqueConstraintMixin, AutocompleteMixin, CachedChoicesMixin,
+               ModelForm):
+    cached_choices = {'status': 'statuses'}
+    autocomplete_fields = {'executor': 'autocomplete_users',
+                           'labels': 'autocomplete_labels'}
 
-class TaskForm(ModelForm):
     class Meta:
         model = Task
         fields = ('name', 'description', 'status', 'executor', 'labels')
+
+
+class IdsField(forms.Field):
+    widget = forms.MultipleHiddenInput
+    default_error_messages = {
+        'invalid': _('Enter a list of values.'),
+    }
+
+    def to_python(self, value):
+        try:
+            return [int(pk) for pk in value or []]
+        except (TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid'],
+                                  code='invalid')
+
+
+class BulkTaskForm(AutocompleteMixin, CachedChoicesMixin, forms.Form):
+    ACTIONS = (
+        ('status', _('Change status')),
+        ('executor', _('Change executor')),
+        ('add_labels', _('Add labels')),
+        ('remove_labels', _('Remove labels')),
+        ('delete', _('Delete')),
+    )
+    REQUIRED = {'status': 'status',
+                'add_labels': 'labels',
+                'remove_labels': 'labels'}
+
+    # Rendered next to the filter form, which has the same field names.
+    prefix = 'bulk'
+    cached_choices = {'status': 'statuses'}
+    autocomplete_fields = {'executor': 'autocomplete_users',
+                           'labels': 'autocomplete_labels'}
+
+    action = forms.ChoiceField(choices=ACTIONS, label=_('Action'))
+    status = forms.ModelChoiceField(queryset=Status.objects.all(),
+                                    required=False, label=_('Status'))
+    executor = forms.ModelChoiceField(queryset=get_user_model().objects.all(),
+                                      required=False, label=_('Executor'))
+    labels = forms.ModelMultipleChoiceField(queryset=Label.objects.all(),
+                                            required=False,
+                                            label=_('Labels'))
+    select_all = forms.BooleanField(required=False,
+                                    label=_('All filtered tasks'))
+    ids = IdsField(required=False)
+
+    def clean(self):
+        cleaned_data = super().clean()
+        if not cleaned_data.get('select_all') and \
+                not cleaned_data.get('ids'):
+            raise ValidationError(_('Select tasks for the action.'))
+
+        field = self.REQUIRED.get(cleaned_data.get('action'))
+        if field and not cleaned_data.get(field):
+            self.add_error(field, self.fields[field].error_messages['required'])
+        return cleaned_data
@@ -0,0 +1,62 @@
+"""
+Cached HTML of the task table rows.
+
+A row is keyed on the task id, its updated_at, the active language and a
+generation number. Saving a task changes updated_at; saving or deleting a
+status or user (whose names the row shows) bumps the generation.
+"""
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from task_manager.choices import bump_version, get_version, only_last_login
+from ..statuses.models import Status
+
+
+ROW_TEMPLATE = 'tasks/task_row.html'
+ROW_TIMEOUT = 60 * 60 * 24
+GENERATION = 'task_rows'
+
+
+def row_key(task, language: str, generation: int) -> str:
+    return (f'task_row:{generation}:{language}:{task.pk}:'
+            f'{task.updated_at.timestamp()}')
+
+
+def render_rows(tasks) -> list:
+    """HTML of every task row: one get_many, rendering only the misses."""
+    language = get_language()
+    generation = get_version(GENERATION)
+    keys = [row_key(task, language, generation) for task in tasks]
+    cached = cache.get_many(keys)
+
+    rows, missing = [], {}
+    for key, task in zip(keys, tasks):
+        html = cached.get(key)
+        if html is None:
+            html = missing[key] = render_to_string(ROW_TEMPLATE,
+                                                   {'task': task})
+        rows.append(mark_safe(html))
+    if missing:
+        cache.set_many(missing, ROW_TIMEOUT)
+    return rows
+
+
+def invalidate_rows():
+    bump_version(GENERATION)
+
+
+@receiver([post_save, post_delete], sender=Status)
+def invalidate_status_rows(sender, **kwargs):
+    invalidate_rows()
+
+
+@receiver([post_save, post_delete], sender=get_user_model())
+def invalidate_user_rows(sender, update_fields=None, **kwargs):
+    if only_last_login(update_fields):
+        return
+    invalidate_rows()
@@ -0,0 +1,156 @@
+"""
+The append-only change history of tasks.
+
+Every write path records what it changed in its own transaction: the
+task forms through `form_changes`, bulk actions, batches and imports
+through `record`, one bulk INSERT per thousand events. An event keeps
+only the changed fields; `describe` turns them back into names for the
+task page with the cached choices.
+
+On Postgres the table is partitioned by month: `create_partitions` adds
+the coming months ahead of time, rows outside them go to the default
+partition. A month that already has rows there is skipped with a warning.
+"""
+import logging
+from datetime import date
+from itertools import islice
+
+from django.db import IntegrityError, connection, models, transaction
+from django.utils import timezone
+
+from task_manager.choices import get_choices
+
+from .models import Task, TaskEvent
+
+
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 1000
+# Form field -> Task attribute of the fields an event records.
+FIELDS = {'name': 'name', 'description': 'description',
+          'status': 'status_id', 'executor': 'executor_id'}
+# Form field -> get_choices() name of the relations.
+CHOICES = {'status': 'statuses', 'executor': 'users', 'labels': 'labels'}
+
+
+def _pk(value):
+    return value.pk if isinstance(value, models.Model) else value
+
+
+def values(task) -> dict:
+    return {name: getattr(task, attname) for name, attname in FIELDS.items()}
+
+
+def diff(old: dict, new: dict) -> dict:
+    """{field: [old, new]} of the fields `new` changes."""
+    return {name: [old.get(name), value] for name, value in new.items()
+            if value != old.get(name) and (value or old.get(name))}
+
+
+def label_diff(old, new) -> dict:
+    removed = sorted(set(map(_pk, old)) - set(map(_pk, new)))
+    added = sorted(set(map(_pk, new)) - set(map(_pk, old)))
+    return {'labels': [removed, added]} if removed or added else {}
+
+
+def form_changes(form) -> dict:
+    """The changes of a saved TaskForm, from its initial to cleaned data."""
+    old = {name: _pk(form.initial.get(name)) for name in FIELDS}
+    new = {name: _pk(form.cleaned_data.get(name)) for name in FIELDS}
+    return {**diff(old, new),
+            **label_diff(form.initial.get('labels') or [],
+                         form.cleaned_data.get('labels') or [])}
+
+
+def created(task, labels=()) -> dict:
+    return {**diff({}, values(task)), **label_diff([], labels)}
+
+
+def deleted(name: str) -> dict:
+    return {'name': [name, None]}
+
+
+def record(kind: int, changes, actor=None) -> int:
+    """
+    Append an event of `kind` for every (task id, changes) pair; a change
+    that changes nothing is skipped. Return the number of events.
+    """
+    now = timezone.now()
+    actor_id = _pk(actor)
+    events = (TaskEvent(task_id=task_id, actor_id=actor_id, kind=kind,
+                        changes=task_changes, created_at=now)
+              for task_id, task_changes in changes if task_changes)
+    count = 0
+    while batch := list(islice(events, BATCH_SIZE)):
+        TaskEvent.objects.bulk_create(batch)
+        count += len(batch)
+    return count
+
+
+def timeline(task):
+    """The events of a task for the page, with their actor, oldest first."""
+    return task.events.select_related('actor').only(
+        'id', 'task_id', 'kind', 'changes', 'created_at',
+        'actor__first_name', 'actor__last_name',
+    )
+
+
+def describe(events) -> list:
+    """
+    [(event, [(field label, old, new)])] with the names of relations;
+    for labels, old and new are the removed and the added ones.
+    """
+    used = {name for event in events for name in event.changes}
+    names = {name: dict(get_choices(choices))
+             for name, choices in CHOICES.items() if name in used}
+
+    def show(name, value):
+        if name == 'labels':
+            return ', '.join(names[name].get(pk, f'#{pk}') for pk in value)
+        if name in names and value is not None:
+            return names[name].get(value, f'#{value}')
+        return value or ''
+
+    return [(event, [(Task._meta.get_field(name).verbose_name,
+                      show(name, old), show(name, new))
+                     for name, (old, new) in event.changes.items()])
+            for event in events]
+
+
+def partition_name(month: date) -> str:
+    return f'{TaskEvent._meta.db_table}_{month:%Y_%m}'
+
+
+def next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def create_partitions(start: date, months: int) -> list:
+    """
+    Add the monthly Postgres partitions from `start` on; the names of
+    those that exist afterwards.
+
+    Postgres refuses a partition for a month with rows in the default
+    partition; such a month is logged and left to the default one.
+    """
+    table = TaskEvent._meta.db_table
+    month, names = start.replace(day=1), []
+    with connection.cursor() as cursor:
+        for _number in range(months):
+            end = next_month(month)
+            try:
+                with transaction.atomic():
+                    cursor.execute(
+                        f'CREATE TABLE IF NOT EXISTS {partition_name(month)} '
+                        f'PARTITION OF {table} FOR VALUES '
+                        f"FROM ('{month} 00:00+00') TO ('{end} 00:00+00')"
+                    )
+            except IntegrityError:
+                logger.warning(
+                    'Skipped partition %s: the default partition already '
+                    'has rows of that month.', partition_name(month)
+                )
+            else:
+                names.append(partition_name(month))
+            month = end
+    return names
@@ -0,0 +1,53 @@
+from statistics import mean
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import setup_test_environment
+from django.urls import reverse
+
+from task_manager.tasks import fragments
+
+
+class Command(BaseCommand):
+    help = 'Time the task list with cold and warm row fragment caches.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=20)
+        parser.add_argument(
+            '--user', help='Username to render the list for '
+                           '(default: the first user).',
+        )
+
+    def handle(self, *args, **options):
+        setup_test_environment()
+        self.client = Client()
+        self.client.force_login(self.get_user(options['user']))
+        self.url = reverse('index_tasks')
+
+        for cold in (True, False):
+            self.run(cold)
+            timings = [self.run(cold) for _ in range(options['runs'])]
+            self.stdout.write('{}: {:.2f} ms mean over {} runs'.format(
+                'cold' if cold else 'warm', mean(timings), len(timings)))
+
+    def get_user(self, username):
+        users = get_user_model().objects.order_by('pk')
+        if username:
+            users = users.filter(username=username)
+        user = users.first()
+        if user is None:
+            raise CommandError('No user to render the task list for.')
+        return user
+
+    def run(self, cold: bool) -> float:
+        """Milliseconds to render the list, dropping cached rows if cold."""
+        if cold:
+            fragments.invalidate_rows()
+        start = perf_counter()
+        response = self.client.get(self.url)
+        elapsed = perf_counter() - start
+        if response.status_code != 200:
+            raise CommandError(f'{self.url} returned {response.status_code}.')
+        return elapsed * 1000
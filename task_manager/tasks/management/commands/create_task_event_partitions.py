@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.utils import timezone
+
+from task_manager.tasks.history import create_partitions
+
+
+class Command(BaseCommand):
+    help = ('Create the monthly Postgres partitions of the task history '
+            'from this month on. Run it before a month starts: a month '
+            'with rows in the default partition is skipped with a '
+            'warning.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months', type=int, default=3,
+                            help='Number of months, this one included.')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write('The task history is partitioned on '
+                              'Postgres only.')
+            return
+        names = create_partitions(timezone.now().date(), options['months'])
+        for name in names:
+            self.stdout.write(f'Partition {name} is ready.')
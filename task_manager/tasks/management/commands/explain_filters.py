@@ -0,0 +1,100 @@
+import re
+from itertools import combinations
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+
+from task_manager.tasks.filters import TasksFilter
+from task_manager.tasks.models import Task
+from task_manager.tasks.views import IndexTasks
+
+
+FILTERS = ('q', 'status', 'executor', 'label', 'self_tasks')
+PAGE_SIZE = 50
+# A plan that reads the whole task table: SQLite and Postgres wording.
+FULL_SCAN = re.compile(r'\bSCAN tasks_task\b(?! USING)'
+                       r'|Seq Scan on tasks_task\b')
+# A plan that sorts the rows instead of reading them in index order.
+SORT = re.compile(r'USE TEMP B-TREE FOR .*ORDER BY|\bSort\b')
+
+
+class Command(BaseCommand):
+    help = ('Print the query plan of the task list for every filter set '
+            'and for the first two pages of every ordering.')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan', action='store_true',
+            help='Exit with an error if a plan scans the whole task table.',
+        )
+        parser.add_argument(
+            '--fail-on-sort', action='store_true',
+            help='Exit with an error if an ordering needs a sort.',
+        )
+
+    def handle(self, *args, **options):
+        user = get_user_model()(pk=1)
+        user._state.adding = False
+        self.explain_filters(user, options['fail_on_scan'])
+        self.explain_orderings(user, options['fail_on_sort'])
+
+    def explain_filters(self, user, fail_on_scan: bool):
+        request = RequestFactory().get('/tasks/')
+        request.user = user
+        values = {'q': 'task', 'status': 1, 'executor': 1, 'label': '1',
+                  'self_tasks': True}
+
+        scans = []
+        for size in range(len(FILTERS) + 1):
+            for names in combinations(FILTERS, size):
+                filterset = TasksFilter(request=request)
+                queryset = Task.objects.for_list()
+                for name in names:
+                    queryset = filterset.filters[name].filter(queryset,
+                                                              values[name])
+                queryset = queryset.order_by('timestamp', 'pk')[:PAGE_SIZE]
+                plan = queryset.explain()
+
+                title = ', '.join(names) or 'no filters'
+                self.stdout.write(self.style.MIGRATE_HEADING(title))
+                self.stdout.write(plan)
+                if FULL_SCAN.search(plan):
+                    scans.append(title)
+
+        if scans and fail_on_scan:
+            raise CommandError(
+                'Full scan of the task table: ' + '; '.join(scans)
+            )
+
+    def explain_orderings(self, user, fail_on_sort: bool):
+        sorts = []
+        choices = TasksFilter.base_filters['ordering'].extra['choices']
+        for value, _label in choices:
+            title = f'ordering={value}'
+            query = f'?ordering={value}'
+            for page in ('first page', 'next page'):
+                queryset, cut = self.page_query(user, query)
+                plan = queryset.explain()
+                self.stdout.write(self.style.MIGRATE_HEADING(
+                    f'{title}, {page}'
+                ))
+                self.stdout.write(plan)
+                if SORT.search(plan):
+                    sorts.append(f'{title}, {page}')
+                rows = cut(list(queryset))[1]
+                if not rows.has_next():
+                    break
+                query = f'?{rows.next_query()}'
+
+        if sorts and fail_on_sort:
+            raise CommandError('Sorted task rows: ' + '; '.join(sorts))
+
+    @staticmethod
+    def page_query(user, query: str):
+        """The keyset query of a task list page and its cut."""
+        view = IndexTasks()
+        view.setup(RequestFactory().get(f'/tasks/{query}'))
+        view.request.user = user
+        view.filterset = TasksFilter(view.request.GET, request=view.request)
+        return view.keyset_query(view.filterset.qs, PAGE_SIZE)
@@ -0,0 +1,192 @@
+import csv
+import json
+import time
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models.functions import Lower
+
+from task_manager.choices import invalidate_choices
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks.counters import (FK_COUNTERS, LABEL_COUNTER,
+                                         change_counter, change_day_counter,
+                                         change_fk_counters, task_day)
+from task_manager.tasks import history
+from task_manager.tasks.models import Task, TaskEvent
+from task_manager.tasks.search import get_backend
+from task_manager.versions import bump
+
+
+def read_rows(path: Path, file_format: str):
+    with path.open(newline='', encoding='utf-8') as file:
+        if file_format == 'csv':
+            yield from csv.DictReader(file)
+            return
+        for line in file:
+            if line.strip():
+                yield json.loads(line)
+
+
+def lower_names(queryset) -> dict:
+    return {name.lower(): pk
+            for name, pk in queryset.values_list('name', 'pk')}
+
+
+class Command(BaseCommand):
+    help = ('Import tasks from a CSV or JSON Lines file with the columns '
+            'name, description, status, author, executor, labels. '
+            'Users are looked up by username, statuses and labels by name '
+            'regardless of case; missing ones are created.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', type=Path)
+        parser.add_argument('--format', choices=('csv', 'jsonl'),
+                            help='Defaults to the file extension.')
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--author',
+                            help='Username for rows without a known author.')
+        parser.add_argument('--label-separator', default=',',
+                            help='Separator of label names in CSV files; '
+                                 'names containing it are double-quoted, '
+                                 'as in the export.')
+        parser.add_argument('--checkpoint', type=Path,
+                            help='File with the number of imported rows; '
+                                 'an existing one resumes the import.')
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or path.suffix.lstrip('.')
+        if file_format not in ('csv', 'jsonl'):
+            raise CommandError('Unknown format, use --format csv|jsonl.')
+
+        self.label_separator = options['label_separator']
+        if len(self.label_separator) != 1:
+            raise CommandError('--label-separator must be one character.')
+        self.load_maps(options['author'])
+        checkpoint = options['checkpoint']
+        done = int(checkpoint.read_text()) \
+            if checkpoint and checkpoint.exists() else 0
+
+        rows = islice(read_rows(path, file_format), done, None)
+        self.created = self.skipped = 0
+        started = time.monotonic()
+        while batch := list(islice(rows, options['batch_size'])):
+            self.import_batch(batch)
+            done += len(batch)
+            if checkpoint:
+                checkpoint.write_text(str(done))
+            self.report(done, started)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {self.created} tasks, skipped {self.skipped}.'
+        ))
+
+    def load_maps(self, author):
+        users = get_user_model().objects.values_list('username', 'pk')
+        self.users = dict(users.iterator())
+        # Lower-cased name -> pk, as names are unique regardless of case.
+        self.statuses = lower_names(Status.objects.all())
+        self.labels = lower_names(Label.objects.all())
+        self.default_author = self.users.get(author)
+        if author and self.default_author is None:
+            raise CommandError(f'Unknown author: {author}')
+
+    def report(self, done, started):
+        elapsed = time.monotonic() - started
+        rate = done / elapsed if elapsed else 0
+        self.stdout.write(f'{done} rows, {self.created} created, '
+                          f'{rate:.0f} rows/s')
+
+    def label_names(self, row) -> list:
+        labels = row.get('labels') or []
+        if isinstance(labels, str):
+            labels = next(csv.reader([labels], skipinitialspace=True,
+                                     delimiter=self.label_separator), [])
+        return [name.strip() for name in labels if name.strip()]
+
+    def create_missing(self, model, known: dict, names: set, choices: str):
+        names = {name.lower(): name for name in names}
+        missing = names.keys() - known.keys()
+        if not missing:
+            return
+        model.objects.bulk_create([model(name=names[key]) for key in missing],
+                                  ignore_conflicts=True)
+        known.update(lower_names(model.objects.annotate(
+            lower_name=Lower('name')
+        ).filter(lower_name__in=missing)))
+        bump(model)
+        invalidate_choices(choices)
+
+    def build_task(self, row):
+        author = self.users.get(row.get('author')) or self.default_author
+        status = self.statuses.get((row.get('status') or '').lower())
+        if not row.get('name') or author is None or status is None:
+            return None
+        return Task(name=row['name'],
+                    description=row.get('description') or '',
+                    status_id=status,
+                    author_id=author,
+                    executor_id=self.users.get(row.get('executor')))
+
+    def import_batch(self, rows):
+        with transaction.atomic():
+            self.create_missing(Status, self.statuses,
+                                {row['status'] for row in rows
+                                 if row.get('status')}, 'statuses')
+            self.create_missing(Label, self.labels,
+                                {name for row in rows
+                                 for name in self.label_names(row)},
+                                'labels')
+
+            existing = set(Task.objects.annotate(
+                lower_name=Lower('name')
+            ).filter(
+                lower_name__in=[(row.get('name') or '').lower()
+                                for row in rows]
+            ).values_list('lower_name', flat=True))
+            tasks, labels = [], []
+            for row in rows:
+                task = self.build_task(row)
+                if task is None or task.name.lower() in existing:
+                    self.skipped += 1
+                    continue
+                existing.add(task.name.lower())
+                tasks.append(task)
+                labels.append(self.label_names(row))
+
+            tasks = Task.objects.bulk_create(tasks)
+            self.link_labels(tasks, labels)
+            self.count(tasks)
+            get_backend().index(tasks)
+            bump(Task)
+            history.record(TaskEvent.Kind.CREATED, [
+                (task.pk, history.created(task, [self.labels[name.lower()]
+                                                 for name in names]))
+                for task, names in zip(tasks, labels)
+            ])
+            self.created += len(tasks)
+
+    def link_labels(self, tasks, labels):
+        through = Task.labels.through
+        label_ids = [{self.labels[name.lower()] for name in names}
+                     for names in labels]
+        through.objects.bulk_create([
+            through(task_id=task.pk, label_id=label_id)
+            for task, ids in zip(tasks, label_ids) for label_id in ids
+        ])
+        change_counter(*LABEL_COUNTER, Counter(
+            label_id for ids in label_ids for label_id in ids
+        ))
+
+    def count(self, tasks):
+        change_fk_counters({
+            attname: Counter(getattr(task, attname) for task in tasks)
+            for attname in FK_COUNTERS
+        })
+        change_day_counter(Counter(task_day(task.timestamp)
+                                   for task in tasks))
@@ -0,0 +1,35 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from task_manager.tasks.models import Task
+from task_manager.tasks.search import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of tasks.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        backend = get_backend()
+        batch_size = options['batch_size']
+        tasks = Task.objects.only('id', 'name', 'description') \
+            .order_by('pk').iterator(chunk_size=batch_size)
+
+        total = 0
+        with transaction.atomic():
+            backend.clear()
+            batch = []
+            for task in tasks:
+                batch.append(task)
+                if len(batch) == batch_size:
+                    backend.index(batch)
+                    total += len(batch)
+                    batch = []
+            backend.index(batch)
+            total += len(batch)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {total} tasks with {type(backend).__name__}.'
+        ))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from task_manager.tasks.counters import reconcile_counters, reconcile_days
+
+
+class Command(BaseCommand):
+    help = ('Recompute the dashboard statistics: the task counters of '
+            'statuses, labels and users and the tasks per day.')
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            reconcile_counters()
+            reconcile_days()
+        self.stdout.write(self.style.SUCCESS('Statistics rebuilt.'))
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from task_manager.tasks.counters import reconcile_counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute the task counters of statuses, labels and users.'
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            reconcile_counters()
+        self.stdout.write(self.style.SUCCESS('Task counters reconciled.'))
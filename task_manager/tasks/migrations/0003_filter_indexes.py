@@ -0,0 +1,48 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:17
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0001_initial'),
+        ('statuses', '0001_initial'),
+        ('tasks', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['timestamp', 'id'], name='task_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'timestamp', 'id'], name='task_status_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', 'timestamp', 'id'], name='task_author_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['author', 'status', 'timestamp', 'id'], name='task_author_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', 'timestamp', 'id'], name='task_executor_timestamp_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['executor', 'status', 'timestamp', 'id'], name='task_executor_status_idx'),
+        ),
+        # The auto-created through table only has (task_id, label_id):
+        # the label filter walks it from the label side.
+        migrations.RunSQL(
+            'CREATE INDEX task_labels_label_task_idx '
+            'ON tasks_task_labels (label_id, task_id);',
+            reverse_sql='DROP INDEX task_labels_label_task_idx;',
+        ),
+    ]
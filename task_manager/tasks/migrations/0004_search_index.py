@@ -0,0 +1,49 @@
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(
+            'CREATE TABLE tasks_task_search ('
+            'task_id bigint PRIMARY KEY '
+            'REFERENCES tasks_task (id) ON DELETE CASCADE, '
+            'document tsvector NOT NULL);'
+        )
+        schema_editor.execute(
+            'CREATE INDEX tasks_task_search_document_idx '
+            'ON tasks_task_search USING GIN (document);'
+        )
+        schema_editor.execute(
+            'INSERT INTO tasks_task_search (task_id, document) '
+            "SELECT id, to_tsvector('simple', name || ' ' || description) "
+            'FROM tasks_task;'
+        )
+    elif vendor == 'sqlite':
+        schema_editor.execute(
+            'CREATE VIRTUAL TABLE tasks_task_fts '
+            'USING fts5(name, description);'
+        )
+        schema_editor.execute(
+            'INSERT INTO tasks_task_fts (rowid, name, description) '
+            'SELECT id, name, description FROM tasks_task;'
+        )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP TABLE tasks_task_search;')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE tasks_task_fts;')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0003_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
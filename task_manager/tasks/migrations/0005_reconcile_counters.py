@@ -0,0 +1,21 @@
+from django.db import migrations
+
+from task_manager.tasks.counters import reconcile_counters
+
+
+def reconcile(apps, schema_editor):
+    reconcile_counters(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_search_index'),
+        ('statuses', '0002_task_counters'),
+        ('labels', '0003_task_counters'),
+        ('users', '0003_task_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(reconcile, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_reconcile_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='task',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, default=django.utils.timezone.now, verbose_name='Date of change'),
+            preserve_default=False,
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:33
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0004_updated_at'),
+        ('statuses', '0003_updated_at'),
+        ('tasks', '0006_task_updated_at'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['updated_at'], name='task_updated_at_idx'),
+        ),
+    ]
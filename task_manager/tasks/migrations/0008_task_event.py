@@ -0,0 +1,64 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:06
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+# The primary key of a partitioned table has to hold the partition key.
+POSTGRES_TABLE = [
+    'CREATE TABLE tasks_taskevent ('
+    'id bigint GENERATED BY DEFAULT AS IDENTITY, '
+    'kind smallint NOT NULL CHECK (kind >= 0), '
+    'changes jsonb NOT NULL, '
+    'created_at timestamp with time zone NOT NULL, '
+    'actor_id bigint NULL, '
+    'task_id bigint NOT NULL, '
+    'PRIMARY KEY (id, created_at)'
+    ') PARTITION BY RANGE (created_at);',
+    'CREATE TABLE tasks_taskevent_default '
+    'PARTITION OF tasks_taskevent DEFAULT;',
+    'CREATE INDEX task_event_timeline_idx '
+    'ON tasks_taskevent (task_id, created_at, id);',
+]
+
+
+def create_event_table(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for statement in POSTGRES_TABLE:
+            schema_editor.execute(statement)
+    else:
+        schema_editor.create_model(apps.get_model('tasks', 'TaskEvent'))
+
+
+def drop_event_table(apps, schema_editor):
+    schema_editor.delete_model(apps.get_model('tasks', 'TaskEvent'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0007_updated_at_index'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(state_operations=[
+            migrations.CreateModel(
+                name='TaskEvent',
+                fields=[
+                    ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                    ('kind', models.PositiveSmallIntegerField(choices=[(1, 'Created'), (2, 'Changed'), (3, 'Deleted')], verbose_name='Event')),
+                    ('changes', models.JSONField(default=dict, verbose_name='Changes')),
+                    ('created_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='Date of change')),
+                    ('actor', models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL, verbose_name='Author')),
+                    ('task', models.ForeignKey(db_constraint=False, db_index=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='events', to='tasks.task', verbose_name='Task')),
+                ],
+                options={
+                    'indexes': [models.Index(fields=['task', 'created_at', 'id'], name='task_event_timeline_idx')],
+                },
+            ),
+        ]),
+        migrations.RunPython(create_event_table, drop_event_table),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+from task_manager.tasks.counters import reconcile_days
+
+
+def reconcile(apps, schema_editor):
+    reconcile_days(apps)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_task_event'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskDay',
+            fields=[
+                ('day', models.DateField(primary_key=True, serialize=False, verbose_name='Day')),
+                ('tasks_count', models.IntegerField(default=0, verbose_name='Tasks')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='Date of change')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['updated_at'], name='task_day_updated_at_idx')],
+            },
+        ),
+        migrations.RunPython(reconcile, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:17
+
+import django.db.models.functions.text
+from django.conf import settings
+from django.db import migrations, models
+
+from task_manager.names import rename_duplicates_of
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('labels', '0005_name_ci_unique'),
+        ('statuses', '0004_name_ci_unique'),
+        ('tasks', '0009_task_days'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='task',
+            name='name',
+            field=models.CharField(max_length=200, verbose_name='Name'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['name', 'id'], name='task_name_idx'),
+        ),
+        # Rows whose names differ only in case would fail the constraint.
+        migrations.RunPython(rename_duplicates_of('tasks', 'Task'),
+                             migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='task',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('name'), name='task_name_ci_unique'),
+        ),
+    ]
@@ -0,0 +1,21 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:39
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0010_name_ci_unique'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='task',
+            name='task_updated_at_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='taskday',
+            name='task_day_updated_at_idx',
+        ),
+    ]
@@ -1,13 +1,38 @@
 from django.db import models
+from django.db.models.functions import Lower
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 from ..statuses.models import Status
 from ..labels.models import Label
 
 from django.utils.translation import gettext_lazy as _
 
 
+class TaskQuerySet(models.QuerySet):
+    LIST_FIELDS = ('id', 'name', 'timestamp', 'updated_at',
+                   'status', 'status__name',
+                   'author', 'author__first_name', 'author__last_name',
+                   'executor', 'executor__first_name',
+                   'executor__last_name')
+
+    def for_list(self):
+        """Rows of the task table: one query with joined relations."""
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).only(*self.LIST_FIELDS)
+
+    def for_detail(self):
+        """A single task page: joined relations and prefetched labels."""
+        return self.select_related(
+            'status', 'author', 'executor'
+        ).prefetch_related(
+            models.Prefetch('labels',
+                            queryset=Label.objects.only('id', 'name'))
+        )
+
+
 class Task(models.Model):
-    name = models.CharField(max_length=200, unique=True, verbose_name=_('Name'))
+    name = models.CharField(max_length=200, verbose_name=_('Name'))
     description = models.TextField(blank=True, verbose_name=_('Description'))
     status = models.ForeignKey(Status,
                                on_delete=models.PROTECT,
@@ -26,6 +51,83 @@ class Task(models.Model):
                                     verbose_name=_('Labels'))
     timestamp = models.DateTimeField(auto_now_add=True,
                                      verbose_name=_('Date of creation'))
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name=_('Date of change'))
+
+    objects = TaskQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Every index ends with (timestamp, id): the keyset ordering
+            # of the task list.
+            models.Index(fields=['timestamp', 'id'],
+                         name='task_timestamp_idx'),
+            models.Index(fields=['status', 'timestamp', 'id'],
+                         name='task_status_timestamp_idx'),
+            models.Index(fields=['author', 'timestamp', 'id'],
+                         name='task_author_timestamp_idx'),
+            models.Index(fields=['author', 'status', 'timestamp', 'id'],
+                         name='task_author_status_idx'),
+            models.Index(fields=['executor', 'timestamp', 'id'],
+                         name='task_executor_timestamp_idx'),
+            models.Index(fields=['executor', 'status', 'timestamp', 'id'],
+                         name='task_executor_status_idx'),
+            # The name ordering of the task list.
+            models.Index(fields=['name', 'id'], name='task_name_idx'),
+        ]
+        constraints = [
+            # Names differ in more than case. Forms leave the check to it.
+            models.UniqueConstraint(Lower('name'),
+                                    name='task_name_ci_unique'),
+        ]
 
     def __str__(self) -> str:
         return self.name
+
+
+class TaskDay(models.Model):
+    """
+    The number of tasks created on a day that still exist, for the
+    dashboard. Maintained by task_manager.tasks.counters.
+    """
+    day = models.DateField(primary_key=True, verbose_name=_('Day'))
+    tasks_count = models.IntegerField(default=0, verbose_name=_('Tasks'))
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name=_('Date of change'))
+
+
+class TaskEvent(models.Model):
+    """
+    One change of a task, appended and never updated: the changed form
+    fields as {field: [old, new]}, ids for relations, and
+    {'labels': [removed ids, added ids]}.
+
+    Events outlive their task and actor, so neither key is a constraint;
+    the timeline index leads with the task.
+    On Postgres the table is partitioned by month of `created_at`.
+    """
+    class Kind(models.IntegerChoices):
+        CREATED = 1, _('Created')
+        CHANGED = 2, _('Changed')
+        DELETED = 3, _('Deleted')
+
+    task = models.ForeignKey(Task, on_delete=models.DO_NOTHING,
+                             db_constraint=False, db_index=False,
+                             related_name='events',
+                             verbose_name=_('Task'))
+    actor = models.ForeignKey(get_user_model(), on_delete=models.DO_NOTHING,
+                              db_constraint=False, db_index=False,
+                              null=True,
+                              related_name='+', verbose_name=_('Author'))
+    kind = models.PositiveSmallIntegerField(choices=Kind.choices,
+                                            verbose_name=_('Event'))
+    changes = models.JSONField(default=dict, verbose_name=_('Changes'))
+    created_at = models.DateTimeField(default=timezone.now,
+                                      verbose_name=_('Date of change'))
+
+    class Meta:
+        indexes = [
+            # The keyset ordering of a task's timeline.
+            models.Index(fields=['task', 'created_at', 'id'],
+                         name='task_event_timeline_idx'),
+        ]
@@ -0,0 +1,140 @@
+"""
+Full-text search over Task.name and Task.description.
+
+The index lives outside the Task table: a tsvector table with a GIN index
+on Postgres, an FTS5 virtual table on SQLite. `get_backend()` picks the
+backend for the default database, or the dotted path in
+settings.TASK_SEARCH_BACKEND.
+"""
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models.expressions import RawSQL
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+
+from .models import Task
+from .signals import task_signals_muted
+
+
+WORD = re.compile(r'\w+')
+
+
+class SearchBackend:
+    def index(self, tasks):
+        """Add or refresh the documents of the given tasks."""
+
+    def remove(self, pks):
+        """Drop the documents of the given task ids."""
+
+    def clear(self):
+        """Drop every document."""
+
+    def filter(self, queryset, query: str):
+        """The tasks of `queryset` with every word of `query`: a LIKE scan."""
+        for word in WORD.findall(query):
+            queryset = queryset.filter(name__icontains=word) \
+                | queryset.filter(description__icontains=word)
+        return queryset
+
+
+class LikeSearchBackend(SearchBackend):
+    """No index: a LIKE scan, for databases without a full-text engine."""
+
+
+class PostgresSearchBackend(SearchBackend):
+    table = 'tasks_task_search'
+    config = 'simple'
+
+    def index(self, tasks):
+        rows = [(task.pk, f'{task.name} {task.description}')
+                for task in tasks]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT INTO {self.table} (task_id, document) '
+                f"VALUES (%s, to_tsvector('{self.config}', %s)) "
+                'ON CONFLICT (task_id) '
+                'DO UPDATE SET document = EXCLUDED.document',
+                rows,
+            )
+
+    def remove(self, pks):
+        # Rows go away with the task (ON DELETE CASCADE).
+        pass
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'TRUNCATE {self.table}')
+
+    def filter(self, queryset, query: str):
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT task_id FROM {self.table} '
+            f"WHERE document @@ plainto_tsquery('{self.config}', %s)",
+            [query],
+        ))
+
+
+class SQLiteSearchBackend(SearchBackend):
+    table = 'tasks_task_fts'
+
+    def index(self, tasks):
+        rows = [(task.pk, task.name, task.description) for task in tasks]
+        if not rows:
+            return
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'INSERT OR REPLACE INTO {self.table} '
+                '(rowid, name, description) VALUES (%s, %s, %s)',
+                rows,
+            )
+
+    def remove(self, pks):
+        with connection.cursor() as cursor:
+            cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s',
+                               [(pk,) for pk in pks])
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def filter(self, queryset, query: str):
+        # Quote every word: user input must not reach the MATCH syntax.
+        words = WORD.findall(query)
+        if not words:
+            return queryset
+        match = ' '.join(f'"{word}"' for word in words)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s',
+            [match],
+        ))
+
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+
+def get_backend() -> SearchBackend:
+    path = getattr(settings, 'TASK_SEARCH_BACKEND', None)
+    if path:
+        return import_string(path)()
+    return BACKENDS.get(connection.vendor, LikeSearchBackend)()
+
+
+@receiver(post_save, sender=Task)
+def index_task(sender, instance, **kwargs):
+    if task_signals_muted():
+        return
+    get_backend().index([instance])
+
+
+@receiver(post_delete, sender=Task)
+def remove_task(sender, instance, **kwargs):
+    if task_signals_muted():
+        return
+    get_backend().remove([instance.pk])
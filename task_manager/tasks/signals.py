@@ -0,0 +1,25 @@
+import threading
+from contextlib import contextmanager
+
+
+_state = threading.local()
+
+
+@contextmanager
+def mute_task_signals():
+    """
+    Turn the Task counter and search receivers into no-ops.
+
+    For bulk operations that maintain counters and the search index
+    themselves in a few set-based queries.
+    """
+    previous = task_signals_muted()
+    _state.muted = True
+    try:
+        yield
+    finally:
+        _state.muted = previous
+
+
+def task_signals_muted() -> bool:
+    return getattr(_state, 'muted', False)
@@ -1,9 +1,40 @@
-from django.test import TestCase, Client
-from django.test.utils import override_settings
+import csv
+import json
+from contextlib import ExitStack
+from datetime import date, datetime, timedelta
+from datetime import timezone as dt_timezone
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock, skipUnless
+
+from django.test import TestCase, Client, AsyncClient
+from django.test.utils import override_settings, CaptureQueriesContext
+from django.db import connection, transaction
+from django.core.cache import cache
+from django.core.management import call_command
+from django.urls import resolve
+from django.utils import translation
 from django.contrib.auth import get_user_model
 from ..statuses.models import Status
 from ..labels.models import Label
-from .models import Task
+from ..mixin import async_views
+from .models import Task, TaskEvent
+from .views import (IndexTasks, AutocompleteUsers, AsyncIndexTasks,
+                    ShowTask)
+from .filters import TasksFilter
+from .search import get_backend
+from . import export, history
+
+
+# The session comes from the cache (SESSION_ENGINE is cached_db).
+# user, the watermark and the task rows: the choices come from the cache
+LIST_QUERIES = 3
+# user, the watermark, the task with its relations, the labels and the
+# history
+DETAIL_QUERIES = 5
+# user and the watermark
+NOT_MODIFIED_QUERIES = 2
 
 
 class TasksTests(TestCase):
@@ -15,6 +46,7 @@ class TasksTests(TestCase):
         return model.objects.get(name=name).id
 
     def setUp(self):
+        cache.clear()
         self.client = Client()
 
         self._override = override_settings(LANGUAGE_CODE='en-us')
@@ -190,6 +222,17 @@ class TasksTests(TestCase):
                                      'labels': label_id_1})
         status_code = response.status_code
         self.assertEqual(status_code, 200)
+# Checking the creation of a task of the same name, in another case.
+        response = self.client.post('/tasks/create/',
+                                    {'name': 'NEW WORK',
+                                     'status': status_update_id,
+                                     'labels': label_id_1})
+        status_code = response.status_code
+        self.assertEqual(status_code, 200)
+        self.assertIn('Task with this Name already exists.',
+                      response.content.decode())
+        self.assertEqual(Task.objects.filter(name__iexact='new work')
+                         .count(), 1)
 
         new_task_id = self.get_model_id_by_name(Task, 'New work')
 # Checking the presence of labels in the task.
@@ -207,6 +250,13 @@ class TasksTests(TestCase):
                       content)
         self.assertIn('Label for delete', content)
         self.assertRedirects(response_redirect, '/labels/', 302, 200)
+# Checks the links, not only the counter, before deleting the label.
+        label = Label.objects.filter(pk=label_id_delete)
+        tasks_count = label.get().tasks_count
+        label.update(tasks_count=0)
+        self.client.post(f'/labels/{label_id_delete}/delete/')
+        self.assertTrue(label.exists())
+        label.update(tasks_count=tasks_count)
 # Checks that the status in use cannot be deleted.
         response_redirect = self.client.post(
             f'/statuses/{status_delete_id}/delete/'
@@ -344,3 +394,870 @@ class TasksTests(TestCase):
         self.assertNotIn('Check', content)
         self.assertNotIn('Update delete', content)
         self.assertNotIn('Executor delete', content)
+
+
+class TasksQueriesTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+        self._override = override_settings(LANGUAGE_CODE='en-us')
+        self._override.enable()
+
+    def tearDown(self):
+        self._override.disable()
+        super().tearDown()
+
+    @classmethod
+    def setUpTestData(cls):
+        user_model = get_user_model()
+        cls.user = user_model.objects.create_user(username='queries_author',
+                                                  password='pass',
+                                                  first_name='Queries',
+                                                  last_name='Author')
+        cls.status = Status.objects.create(name='Status for queries')
+        cls.label = Label.objects.create(name='Label for queries')
+
+    def create_tasks(self, count: int, offset: int = 0):
+        for number in range(offset, offset + count):
+            executor = get_user_model().objects.create_user(
+                username=f'queries_executor_{number}',
+                first_name='Executor',
+                last_name=str(number)
+            )
+            status = Status.objects.create(name=f'Queries status {number}')
+            task = Task.objects.create(name=f'Queries task {number}',
+                                       status=status,
+                                       author=self.user,
+                                       executor=executor)
+            task.labels.add(self.label)
+
+    def test_list_queries_do_not_depend_on_rows(self):
+        self.create_tasks(1)
+        self.client.get('/tasks/')
+        with CaptureQueriesContext(connection) as small:
+            self.client.get('/tasks/')
+
+        self.create_tasks(20, offset=1)
+        self.client.get('/tasks/')
+        with CaptureQueriesContext(connection) as big:
+            response = self.client.get('/tasks/')
+
+        self.assertEqual(len(small), len(big))
+        content = response.content.decode()
+        self.assertIn('Queries task 20', content)
+        self.assertIn('Executor 20', content)
+        self.assertIn('Queries status 20', content)
+
+    def test_list_queries_number(self):
+        self.create_tasks(10)
+        self.client.get('/tasks/')
+        with self.assertNumQueries(LIST_QUERIES):
+            self.client.get('/tasks/')
+
+    def test_choices_cache_invalidation(self):
+        response = self.client.get('/tasks/create/')
+        self.assertNotIn('Fresh status', response.content.decode())
+
+        with self.assertNumQueries(1):
+            self.client.get('/tasks/create/')
+
+        status = Status.objects.create(name='Fresh status')
+        label = Label.objects.create(name='Fresh label')
+        response = self.client.get('/tasks/')
+        content = response.content.decode()
+        self.assertIn('Fresh status', content)
+        self.assertIn('Fresh label', content)
+
+        status.name = 'Renamed status'
+        status.save()
+        label.delete()
+        response = self.client.get('/tasks/')
+        content = response.content.decode()
+        self.assertIn('Renamed status', content)
+        self.assertNotIn('Fresh label', content)
+
+        self.client.force_login(self.user)
+        with self.assertNumQueries(1):
+            self.client.get('/tasks/create/')
+
+    def test_row_fragments(self):
+        self.create_tasks(2)
+        task = Task.objects.get(name='Queries task 0')
+        self.client.get('/tasks/')
+
+        with mock.patch('task_manager.tasks.fragments.render_to_string',
+                        side_effect=AssertionError) as render:
+            response = self.client.get('/tasks/')
+        render.assert_not_called()
+        self.assertIn('Queries task 0', response.content.decode())
+
+        task.name = 'Renamed task'
+        task.save()
+        task.status.name = 'Renamed queries status'
+        task.status.save()
+        content = self.client.get('/tasks/').content.decode()
+        self.assertIn('Renamed task', content)
+        self.assertIn('<td>Renamed queries status</td>', content)
+
+        self.client.post('/tasks/bulk/', {'bulk-action': 'status',
+                                          'bulk-status': self.status.id,
+                                          'bulk-ids': task.id})
+        content = self.client.get('/tasks/').content.decode()
+        self.assertNotIn('<td>Renamed queries status</td>', content)
+
+    def test_conditional_get(self):
+        self.create_tasks(1)
+        task = Task.objects.get(name='Queries task 0')
+        pages = ['/tasks/', f'/tasks/{task.id}/', '/statuses/', '/labels/',
+                 '/users/']
+        etags = {}
+        for url in pages:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            # A date in whole seconds would miss changes within a second.
+            self.assertNotIn('Last-Modified', response)
+            etags[url] = response['ETag']
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            self.assertEqual(response.status_code, 304)
+            self.assertEqual(len(queries), NOT_MODIFIED_QUERIES)
+            # The versions, not a scan of the tables.
+            self.assertFalse([query for query in queries
+                              if 'COUNT(' in query['sql']
+                              or 'MAX(' in query['sql']])
+
+        response = self.client.get('/tasks/?self_tasks=on',
+                                   HTTP_IF_NONE_MATCH=etags['/tasks/'])
+        self.assertEqual(response.status_code, 200)
+
+        label = Label.objects.create(name='Label for conditional get')
+        etags['/labels/'] = self.client.get('/labels/')['ETag']
+        self.client.post('/tasks/bulk/', {'bulk-action': 'add_labels',
+                                          'bulk-labels': label.id,
+                                          'bulk-ids': task.id})
+        # The pending "Tasks changed" message is rendered, not skipped.
+        response = self.client.get('/tasks/',
+                                   HTTP_IF_NONE_MATCH=etags['/tasks/'])
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('Tasks changed', response.content.decode())
+
+        for url in pages:
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+            changed = url not in ('/statuses/', '/users/')
+            self.assertEqual(response.status_code, 200 if changed else 304,
+                             url)
+
+        self.client.post('/tasks/bulk/', {'bulk-action': 'remove_labels',
+                                          'bulk-labels': label.id,
+                                          'bulk-ids': task.id})
+        self.client.get('/tasks/')
+        etag = self.client.get('/labels/')['ETag']
+        Label.objects.filter(pk=label.pk).delete()
+        response = self.client.get('/labels/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        # A change that does not move the latest updated_at, as with a
+        # row that is not the latest one changed in the same instant.
+        etag = self.client.get('/statuses/')['ETag']
+        latest = Status.objects.latest('updated_at').updated_at
+        self.status.name = 'Renamed in the past'
+        with mock.patch('django.utils.timezone.now',
+                        return_value=latest - timedelta(days=1)):
+            self.status.save()
+        response = self.client.get('/statuses/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_detail_queries_number(self):
+        self.create_tasks(1)
+        task_id = Task.objects.get(name='Queries task 0').id
+        with self.assertNumQueries(DETAIL_QUERIES):
+            response = self.client.get(f'/tasks/{task_id}/')
+        self.assertIn('Label for queries', response.content.decode())
+
+    def events(self, task_id) -> list:
+        return list(TaskEvent.objects.filter(task_id=task_id)
+                    .order_by('created_at', 'id')
+                    .values_list('kind', 'changes', 'actor'))
+
+    def test_history_of_forms(self):
+        other = Label.objects.create(name='Other label')
+        self.client.post('/tasks/create/', {
+            'name': 'History task', 'status': self.status.id,
+            'labels': [self.label.id],
+        })
+        task = Task.objects.get(name='History task')
+        done = Status.objects.create(name='History done')
+        self.client.post(f'/tasks/{task.id}/update/', {
+            'name': 'History task', 'description': 'Details',
+            'status': done.id, 'labels': [other.id],
+        })
+        self.assertEqual(self.events(task.id), [
+            (TaskEvent.Kind.CREATED,
+             {'name': [None, 'History task'],
+              'status': [None, self.status.id],
+              'labels': [[], [self.label.id]]}, self.user.id),
+            (TaskEvent.Kind.CHANGED,
+             {'description': ['', 'Details'],
+              'status': [self.status.id, done.id],
+              'labels': [[self.label.id], [other.id]]}, self.user.id),
+        ])
+
+        response = self.client.get(f'/tasks/{task.id}/')
+        self.assertContains(response, 'Status: Status for queries '
+                                      '&rarr; History done')
+        self.assertContains(response, 'Labels: Label for queries '
+                                      '&rarr; Other label')
+
+        self.client.post(f'/tasks/{task.id}/delete/')
+        self.assertEqual(self.events(task.id)[-1],
+                         (TaskEvent.Kind.DELETED,
+                          {'name': ['History task', None]}, self.user.id))
+
+    def test_history_of_bulk_actions(self):
+        self.create_tasks(2)
+        first, second = Task.objects.order_by('pk')
+        Task.objects.filter(pk=second.pk).update(status=self.status)
+
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'status', 'bulk-status': self.status.id,
+            'bulk-select_all': 'on',
+        })
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'remove_labels', 'bulk-labels': [self.label.id],
+            'bulk-ids': [first.id],
+        })
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'add_labels', 'bulk-labels': [self.label.id],
+            'bulk-ids': [first.id, second.id],
+        })
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'delete', 'bulk-ids': [second.id],
+        })
+        changes = [changes for _kind, changes, _actor
+                   in self.events(first.id)]
+        self.assertEqual(changes, [
+            {'status': [first.status_id, self.status.id]},
+            {'labels': [[self.label.id], []]},
+            {'labels': [[], [self.label.id]]},
+        ])
+        self.assertEqual(self.events(second.id), [
+            (TaskEvent.Kind.DELETED, {'name': ['Queries task 1', None]},
+             self.user.id),
+        ])
+
+    def test_history_pages(self):
+        self.create_tasks(1)
+        task = Task.objects.get()
+        for number in range(5):
+            self.client.post(f'/tasks/{task.id}/update/', {
+                'name': f'Renamed {number}', 'status': self.status.id,
+            })
+
+        with mock.patch.object(ShowTask, 'paginate_by', 2):
+            # Once the choices that name the relations are cached
+            self.client.get(f'/tasks/{task.id}/')
+            with self.assertNumQueries(DETAIL_QUERIES):
+                response = self.client.get(f'/tasks/{task.id}/')
+            names = [changes[0][2] for _event, changes
+                     in response.context['events']]
+            self.assertEqual(names, ['Renamed 0', 'Renamed 1'])
+
+            page = response.context['events_page']
+            response = self.client.get(f'/tasks/{task.id}/'
+                                       f'?{page.next_query()}')
+            names = [changes[0][2] for _event, changes
+                     in response.context['events']]
+            self.assertEqual(names, ['Renamed 2', 'Renamed 3'])
+
+        response = self.client.get(f'/tasks/{task.id}/?events=broken')
+        self.assertEqual(response.status_code, 404)
+
+    @skipUnless(connection.vendor == 'postgresql',
+                'The task history is partitioned on Postgres only.')
+    def test_partitions_skip_months_in_default(self):
+        TaskEvent.objects.create(
+            task_id=1, kind=TaskEvent.Kind.CREATED,
+            created_at=datetime(2099, 1, 15, tzinfo=dt_timezone.utc),
+        )
+        with self.assertLogs('task_manager.tasks.history', 'WARNING'):
+            names = history.create_partitions(date(2099, 1, 1), 2)
+        self.assertEqual(names, [history.partition_name(date(2099, 2, 1))])
+
+    def test_keyset_pagination(self):
+        self.create_tasks(5)
+        done = Status.objects.create(name='Queries done')
+        for number in range(5):
+            Task.objects.create(name=f'Done task {number}',
+                                status=done,
+                                author=self.user)
+
+        with mock.patch.object(IndexTasks, 'paginate_by', 2):
+            response = self.client.get('/tasks/', {'status': done.id})
+            page = response.context['page_obj']
+            self.assertEqual([task.name for task in page],
+                             ['Done task 0', 'Done task 1'])
+            self.assertFalse(page.has_previous())
+
+            response = self.client.get(f'/tasks/?{page.next_query()}')
+            page = response.context['page_obj']
+            self.assertEqual([task.name for task in page],
+                             ['Done task 2', 'Done task 3'])
+            self.assertTrue(page.has_previous())
+            self.assertTrue(page.has_next())
+
+            response = self.client.get(f'/tasks/?{page.next_query()}')
+            last_page = response.context['page_obj']
+            self.assertEqual([task.name for task in last_page],
+                             ['Done task 4'])
+            self.assertFalse(last_page.has_next())
+
+            response = self.client.get(f'/tasks/?{last_page.previous_query()}')
+            page = response.context['page_obj']
+            self.assertEqual([task.name for task in page],
+                             ['Done task 2', 'Done task 3'])
+
+        response = self.client.get('/tasks/', {'cursor': 'broken'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_explain_filters(self):
+        out = StringIO()
+        fail_on_scan = connection.vendor == 'sqlite'
+        call_command('explain_filters', fail_on_scan=fail_on_scan,
+                     fail_on_sort=fail_on_scan, stdout=out)
+        content = out.getvalue()
+        self.assertIn('no filters', content)
+        self.assertIn('status, executor, label, self_tasks', content)
+        for value in ('timestamp', 'name', 'status', 'executor', 'author'):
+            self.assertIn(f'ordering={value}, first page', content)
+            self.assertIn(f'ordering=-{value}, first page', content)
+
+    def test_ordering(self):
+        self.create_tasks(4)
+        other = get_user_model().objects.create_user(username='other')
+        Task.objects.filter(name='Queries task 1').update(executor=None,
+                                                          author=other)
+        Task.objects.filter(name='Queries task 2').update(executor=None)
+        tasks = list(Task.objects.all())
+        nulls_largest = connection.features.nulls_order_largest
+
+        def key(column):
+            def task_key(task):
+                value = getattr(task, column)
+                if value is None:
+                    return (nulls_largest, 0), task.timestamp, task.pk
+                return (not nulls_largest, value), task.timestamp, task.pk
+            return task_key
+
+        with mock.patch.object(IndexTasks, 'paginate_by', 3):
+            for value, column in (('timestamp', 'timestamp'),
+                                  ('name', 'name'),
+                                  ('status', 'status_id'),
+                                  ('executor', 'executor_id'),
+                                  ('author', 'author_id')):
+                expected = [task.name for task
+                            in sorted(tasks, key=key(column))]
+                self.assertEqual(self.all_pages(value), expected, value)
+                self.assertEqual(self.all_pages(f'-{value}'),
+                                 expected[::-1], value)
+
+        response = self.client.get('/tasks/', {'ordering': 'description'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(list(response.context['tasks']), [])
+
+    def test_ordering_labels(self):
+        choices = dict(TasksFilter.base_filters['ordering'].extra['choices'])
+        for language, descending in (('en', 'Name (descending)'),
+                                     ('ru', 'Имя (по убыванию)')):
+            with translation.override(language):
+                self.assertEqual(str(choices['-name']), descending)
+
+    def all_pages(self, ordering) -> list:
+        """The task names of every page, and back from the last one."""
+        names, url = [], f'/tasks/?ordering={ordering}'
+        while True:
+            page = self.client.get(url).context['page_obj']
+            names += [task.name for task in page]
+            if not page.has_next():
+                break
+            url = f'/tasks/?{page.next_query()}'
+        backwards = [task.name for task in page]
+        while page.has_previous():
+            url = f'/tasks/?{page.previous_query()}'
+            page = self.client.get(url).context['page_obj']
+            backwards = [task.name for task in page] + backwards
+        self.assertEqual(backwards, names)
+        return names
+
+    def test_autocomplete(self):
+        self.create_tasks(3)
+        Label.objects.create(name='Another label')
+
+        response = self.client.get('/tasks/autocomplete/users/',
+                                   {'q': 'queries_exec'})
+        results = response.json()['results']
+        self.assertEqual(len(results), 3)
+        self.assertIn('Executor 0', [item['text'] for item in results])
+
+        response = self.client.get('/tasks/autocomplete/users/',
+                                   {'q': 'EXECUTOR'})
+        self.assertEqual(len(response.json()['results']), 3)
+
+        with mock.patch.object(AutocompleteUsers, 'limit', 2):
+            response = self.client.get('/tasks/autocomplete/users/',
+                                       {'q': 'queries_exec'})
+        self.assertEqual(len(response.json()['results']), 2)
+
+        response = self.client.get('/tasks/autocomplete/labels/',
+                                   {'q': 'label for'})
+        self.assertEqual(response.json()['results'],
+                         [{'id': self.label.id, 'text': 'Label for queries'}])
+
+        response = self.client.get('/tasks/autocomplete/labels/')
+        self.assertEqual(response.json()['results'], [])
+
+        self.client.logout()
+        response = self.client.get('/tasks/autocomplete/labels/',
+                                   {'q': 'label'})
+        self.assertEqual(response.status_code, 302)
+
+    def test_task_form_renders_only_selected(self):
+        self.create_tasks(3)
+        task = Task.objects.get(name='Queries task 1')
+
+        response = self.client.get('/tasks/create/')
+        content = response.content.decode()
+        self.assertNotIn('Executor 1', content)
+        self.assertNotIn('Label for queries', content)
+        self.assertIn('/tasks/autocomplete/users/', content)
+
+        response = self.client.get(f'/tasks/{task.id}/update/')
+        content = response.content.decode()
+        self.assertIn('Executor 1', content)
+        self.assertNotIn('Executor 2', content)
+        self.assertIn('Label for queries', content)
+
+    def test_search(self):
+        self.create_tasks(3)
+        task = Task.objects.get(name='Queries task 1')
+        task.description = 'Fix the broken elevator'
+        task.save()
+
+        response = self.client.get('/tasks/', {'q': 'elevator'})
+        tasks = list(response.context['tasks'])
+        self.assertEqual(tasks, [task])
+
+        response = self.client.get('/tasks/', {'q': 'queries TASK'})
+        self.assertEqual(len(response.context['tasks']), 3)
+
+        response = self.client.get('/tasks/', {'q': '"elevator* ('})
+        self.assertEqual(list(response.context['tasks']), [task])
+
+        task.delete()
+        response = self.client.get('/tasks/', {'q': 'elevator'})
+        self.assertEqual(list(response.context['tasks']), [])
+
+    def test_rebuild_search_index(self):
+        self.create_tasks(3)
+        backend = get_backend()
+        backend.clear()
+        self.assertFalse(backend.filter(Task.objects.all(), 'queries')
+                         .exists())
+
+        out = StringIO()
+        call_command('rebuild_search_index', batch_size=2, stdout=out)
+        self.assertIn('Indexed 3 tasks', out.getvalue())
+        self.assertEqual(
+            backend.filter(Task.objects.all(), 'queries').count(), 3
+        )
+
+    def assertCounters(self, status, label, author, executor):
+        self.status.refresh_from_db()
+        self.label.refresh_from_db()
+        self.user.refresh_from_db()
+        executor_user = get_user_model().objects.get(
+            username='queries_executor_0'
+        )
+        self.assertEqual(self.status.tasks_count, status)
+        self.assertEqual(self.label.tasks_count, label)
+        self.assertEqual(self.user.authored_tasks_count, author)
+        self.assertEqual(executor_user.assigned_tasks_count, executor)
+
+    def test_counters(self):
+        self.create_tasks(1)
+        self.assertCounters(status=0, label=1, author=1, executor=1)
+
+        task = Task.objects.get(name='Queries task 0')
+        task.status = self.status
+        task.executor = None
+        task.save()
+        self.assertCounters(status=1, label=1, author=1, executor=0)
+
+        task.labels.remove(self.label, Label.objects.create(name='Unused'))
+        self.assertCounters(status=1, label=0, author=1, executor=0)
+        self.label.labels.add(task)
+        self.assertCounters(status=1, label=1, author=1, executor=0)
+
+        Status.objects.update(tasks_count=10)
+        out = StringIO()
+        call_command('reconcile_counters', stdout=out)
+        self.assertCounters(status=1, label=1, author=1, executor=0)
+
+        response = self.client.post(f'/labels/{self.label.id}/delete/')
+        self.assertTrue(Label.objects.filter(pk=self.label.pk).exists())
+        response = self.client.post(f'/statuses/{self.status.id}/delete/')
+        self.assertRedirects(response, '/statuses/', 302, 200)
+        self.assertTrue(Status.objects.filter(pk=self.status.pk).exists())
+
+        task.delete()
+        self.assertCounters(status=0, label=0, author=0, executor=0)
+
+        response = self.client.get('/statuses/')
+        self.assertEqual(response.context['statuses'][0].tasks_count, 0)
+
+    def test_saves_keep_counters(self):
+        label = Label.objects.get(pk=self.label.pk)
+        user = get_user_model().objects.get(pk=self.user.pk)
+        self.create_tasks(1)
+
+        label.name = 'Renamed label'
+        label.save()
+        user.first_name = 'Renamed'
+        user.save()
+        self.assertCounters(status=0, label=1, author=1, executor=1)
+        self.assertEqual(self.label.name, 'Renamed label')
+        self.assertEqual(self.user.first_name, 'Renamed')
+
+        task = Task.objects.get(name='Queries task 0')
+        author, executor = task.author, task.executor
+        with transaction.atomic():
+            Task.objects.create(name='Swapped task', status=self.status,
+                                author=executor, executor=author)
+        self.assertCounters(status=1, label=1, author=1, executor=1)
+        executor.refresh_from_db()
+        self.assertEqual(executor.authored_tasks_count, 1)
+
+    def test_bulk_actions(self):
+        self.create_tasks(3)
+        other = Status.objects.create(name='Bulk status')
+        tasks = list(Task.objects.filter(name__startswith='Queries task'))
+        ids = [task.id for task in tasks]
+
+        response = self.client.post('/tasks/bulk/', {
+            'bulk-action': 'status',
+            'bulk-status': other.id,
+            'bulk-ids': ids[:2],
+        })
+        self.assertRedirects(response, '/tasks/?', 302, 200)
+        self.assertEqual(Task.objects.filter(status=other).count(), 2)
+        other.refresh_from_db()
+        self.assertEqual(other.tasks_count, 2)
+
+        response = self.client.post(f'/tasks/bulk/?status={other.id}', {
+            'bulk-action': 'remove_labels',
+            'bulk-labels': [self.label.id],
+            'bulk-select_all': 'on',
+        })
+        self.assertRedirects(response, f'/tasks/?status={other.id}', 302,
+                             200)
+        self.label.refresh_from_db()
+        self.assertEqual(self.label.tasks_count, 1)
+        self.assertEqual(self.label.labels.get(), tasks[2])
+
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'add_labels',
+            'bulk-labels': [self.label.id],
+            'bulk-ids': ids,
+        })
+        self.label.refresh_from_db()
+        self.assertEqual(self.label.tasks_count, 3)
+        self.assertEqual(self.label.labels.count(), 3)
+
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'executor',
+            'bulk-executor': '',
+            'bulk-ids': ids,
+        })
+        self.assertFalse(Task.objects.filter(executor__isnull=False)
+                         .exists())
+
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'status',
+            'bulk-select_all': '',
+        })
+        content = self.client.get('/tasks/').content.decode()
+        self.assertIn('Select tasks for the action.', content)
+
+        # A deleted status in the filter must not select every task.
+        gone = Status.objects.create(name='Gone status')
+        gone_id = gone.id
+        gone.delete()
+        for query in (f'status={gone_id}', 'executor=x'):
+            self.client.post(f'/tasks/bulk/?{query}', {
+                'bulk-action': 'status',
+                'bulk-status': self.status.id,
+                'bulk-select_all': 'on',
+            })
+            content = self.client.get('/tasks/').content.decode()
+            self.assertIn('The filter is invalid, no tasks were changed.',
+                          content)
+        self.assertFalse(Task.objects.filter(status=self.status).exists())
+
+    def test_bulk_delete(self):
+        self.create_tasks(2)
+        ids = list(Task.objects.values_list('id', flat=True))
+        stranger = get_user_model().objects.create_user(username='stranger')
+        foreign = Task.objects.create(name='Foreign task',
+                                      status=self.status,
+                                      author=stranger)
+
+        self.client.post('/tasks/bulk/', {
+            'bulk-action': 'delete',
+            'bulk-ids': ids + [foreign.id],
+        })
+        self.assertEqual(Task.objects.count(), 3)
+        content = self.client.get('/tasks/').content.decode()
+        self.assertIn('Only its author can delete a task', content)
+
+        self.client.post('/tasks/bulk/?self_tasks=on', {
+            'bulk-action': 'delete',
+            'bulk-select_all': 'on',
+        })
+        self.assertEqual(list(Task.objects.all()), [foreign])
+        self.assertFalse(Task.labels.through.objects.exists())
+        self.user.refresh_from_db()
+        self.label.refresh_from_db()
+        self.assertEqual(self.user.authored_tasks_count, 0)
+        self.assertEqual(self.label.tasks_count, 0)
+        self.assertFalse(get_backend().filter(Task.objects.all(),
+                                              'queries').exists())
+
+    def test_bulk_queries_do_not_depend_on_rows(self):
+        self.create_tasks(2)
+        with CaptureQueriesContext(connection) as small:
+            self.client.post('/tasks/bulk/', {
+                'bulk-action': 'status',
+                'bulk-status': self.status.id,
+                'bulk-select_all': 'on',
+            })
+        self.create_tasks(20, offset=2)
+        with CaptureQueriesContext(connection) as big:
+            self.client.post('/tasks/bulk/', {
+                'bulk-action': 'status',
+                'bulk-status': self.status.id,
+                'bulk-select_all': 'on',
+            })
+        self.assertEqual(len(small), len(big))
+        self.status.refresh_from_db()
+        self.assertEqual(self.status.tasks_count, 22)
+
+    def test_bulk_delete_queries_do_not_depend_on_rows(self):
+        # Filtered by label: the links are deleted before the tasks.
+        url = f'/tasks/bulk/?label={self.label.id}'
+        data = {'bulk-action': 'delete', 'bulk-select_all': 'on'}
+        self.create_tasks(2)
+        self.client.get('/tasks/')
+        with CaptureQueriesContext(connection) as small:
+            self.client.post(url, data)
+        self.create_tasks(20, offset=2)
+        self.client.get('/tasks/')
+        with CaptureQueriesContext(connection) as big:
+            self.client.post(url, data)
+        self.assertEqual(len(small), len(big))
+        self.assertFalse(Task.objects.exists())
+        self.assertFalse(Task.labels.through.objects.exists())
+        self.label.refresh_from_db()
+        self.assertEqual(self.label.tasks_count, 0)
+
+    def test_export(self):
+        self.create_tasks(3)
+        task = Task.objects.get(name='Queries task 1')
+        task.labels.add(Label.objects.create(name='Second, label'))
+
+        response = self.client.get('/tasks/', {'export': 'csv'})
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(
+            line.decode() for line in response.streaming_content
+        ))
+        self.assertEqual(rows[0], list(export.COLUMNS))
+        self.assertEqual(len(rows), 4)
+        self.assertEqual(rows[2][1:7], [
+            'Queries task 1', '', 'Queries status 1', 'Queries Author',
+            'Executor 1', 'Label for queries,"Second, label"',
+        ])
+
+        response = self.client.get('/tasks/', {'export': 'csv',
+                                               'ordering': '-name'})
+        names = [row[1] for row in csv.reader(
+            line.decode() for line in response.streaming_content
+        )][1:]
+        self.assertEqual(names, ['Queries task 2', 'Queries task 1',
+                                 'Queries task 0'])
+
+        status = Status.objects.get(name='Queries status 1')
+        response = self.client.get('/tasks/', {'export': 'jsonl',
+                                               'status': status.id})
+        rows = [json.loads(line) for line in
+                b''.join(response.streaming_content).splitlines()]
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], task.id)
+        self.assertEqual(sorted(rows[0]['labels']),
+                         ['Label for queries', 'Second, label'])
+
+    def test_export_import_round_trip(self):
+        self.create_tasks(1)
+        task = Task.objects.get()
+        task.labels.add(Label.objects.create(name='Second, label'))
+        response = self.client.get('/tasks/', {'export': 'csv'})
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'tasks.csv'
+            path.write_bytes(b''.join(response.streaming_content))
+            task.delete()
+            call_command('import_tasks', str(path), author='queries_author',
+                         stdout=StringIO())
+
+        task = Task.objects.get(name='Queries task 0')
+        self.assertEqual(sorted(label.name for label in task.labels.all()),
+                         ['Label for queries', 'Second, label'])
+        self.assertEqual(Label.objects.count(), 2)
+
+    def test_export_queries_do_not_depend_on_rows(self):
+        self.create_tasks(2)
+        with CaptureQueriesContext(connection) as small:
+            b''.join(self.client.get('/tasks/', {'export': 'jsonl'})
+                     .streaming_content)
+        self.create_tasks(20, offset=2)
+        with CaptureQueriesContext(connection) as big:
+            b''.join(self.client.get('/tasks/', {'export': 'jsonl'})
+                     .streaming_content)
+        self.assertEqual(len(small), len(big))
+
+    def test_import_tasks(self):
+        Task.objects.create(name='Existing task', status=self.status,
+                            author=self.user)
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'tasks.csv'
+            with path.open('w', newline='') as file:
+                writer = csv.writer(file)
+                writer.writerow(['name', 'description', 'status', 'author',
+                                 'executor', 'labels'])
+                writer.writerow(['Imported 1', 'First', 'Imported status',
+                                 'queries_author', '', 'Label for queries'])
+                writer.writerow(['Imported 2', '', 'Status for queries',
+                                 'nobody', 'queries_author',
+                                 'New label, label for queries'])
+                writer.writerow(['Existing task', '', 'Status for queries',
+                                 'queries_author', '', ''])
+                writer.writerow(['Imported 1', '', 'Status for queries',
+                                 'queries_author', '', ''])
+                writer.writerow(['EXISTING TASK', '', 'Status for queries',
+                                 'queries_author', '', ''])
+                writer.writerow(['imported 1', '', 'status for queries',
+                                 'queries_author', '', ''])
+            checkpoint = Path(directory) / 'checkpoint'
+
+            out = StringIO()
+            call_command('import_tasks', str(path), batch_size=2,
+                         checkpoint=checkpoint, stdout=out)
+            self.assertIn('Created 1 tasks, skipped 5.', out.getvalue())
+            self.assertEqual(checkpoint.read_text(), '6')
+
+            call_command('import_tasks', str(path), author='queries_author',
+                         stdout=out)
+            self.assertIn('Created 1 tasks, skipped 5.', out.getvalue())
+
+        task = Task.objects.get(name='Imported 2')
+        self.assertEqual(task.author, self.user)
+        self.assertEqual(task.executor, self.user)
+        self.assertEqual(sorted(label.name for label in task.labels.all()),
+                         ['Label for queries', 'New label'])
+        self.assertEqual(Status.objects.get(name='Imported status')
+                         .tasks_count, 1)
+        self.label.refresh_from_db()
+        self.assertEqual(self.label.tasks_count, 2)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.authored_tasks_count, 3)
+        self.assertEqual(self.user.assigned_tasks_count, 1)
+        self.assertEqual(
+            list(get_backend().filter(Task.objects.all(), 'first')),
+            [Task.objects.get(name='Imported 1')]
+        )
+
+    def test_import_tasks_jsonl_resume(self):
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'tasks.jsonl'
+            path.write_text(''.join(
+                json.dumps({'name': f'Json task {number}',
+                            'status': 'Status for queries',
+                            'author': 'queries_author',
+                            'labels': ['Label for queries']}) + '\n'
+                for number in range(5)
+            ))
+            checkpoint = Path(directory) / 'checkpoint'
+            checkpoint.write_text('3')
+            call_command('import_tasks', str(path), checkpoint=checkpoint,
+                         stdout=StringIO())
+        self.assertEqual(
+            sorted(Task.objects.values_list('name', flat=True)),
+            ['Json task 3', 'Json task 4']
+        )
+
+
+@override_settings(LANGUAGE_CODE='en-us')
+class AsyncViewsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        stack = ExitStack()
+        stack.enter_context(async_views())
+        self.addCleanup(stack.close)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='async',
+                                                        first_name='Async',
+                                                        last_name='User')
+        status = Status.objects.create(name='Async status')
+        label = Label.objects.create(name='Async label')
+        cls.task = Task.objects.create(name='Async task', status=status,
+                                       author=cls.user, executor=cls.user)
+        cls.task.labels.add(label)
+
+    async def test_async_views(self):
+        self.assertIs(resolve('/tasks/').func.view_class, AsyncIndexTasks)
+        await self.async_client.aforce_login(self.user)
+        pages = {
+            '/tasks/': 'Async task',
+            f'/tasks/?status={self.task.status_id}&self_tasks=on':
+                'Async task',
+            f'/tasks/{self.task.id}/': 'Async label',
+            '/statuses/': 'Async status',
+            '/labels/': 'Async label',
+            '/users/': 'Async User',
+        }
+        for url, text in pages.items():
+            response = await self.async_client.get(url)
+            self.assertContains(response, text)
+            response = await self.async_client.get(
+                url, headers={'If-None-Match': response['ETag']}
+            )
+            self.assertEqual(response.status_code, 304, url)
+
+        response = await self.async_client.get('/tasks/0/')
+        self.assertEqual(response.status_code, 404)
+
+        response = await self.async_client.get('/tasks/?export=csv')
+        content = b''.join([chunk async for chunk
+                            in response.streaming_content]).decode()
+        self.assertIn('Async task,', content)
+        self.assertIn('Async label', content)
+
+    async def test_async_views_anonymous(self):
+        client = AsyncClient()
+        response = await client.get('/users/')
+        self.assertContains(response, 'Async User')
+        response = await client.get('/tasks/')
+        self.assertRedirects(response, '/login/', 302,
+                             fetch_redirect_response=False)
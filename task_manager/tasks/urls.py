@@ -1,11 +1,23 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
 
+if settings.ASYNC_VIEWS:
+    Index, Show = views.AsyncIndexTasks, views.AsyncShowTask
+else:
+    Index, Show = views.IndexTasks, views.ShowTask
+
+
 urlpatterns = [
-    path('', views.IndexTasks.as_view(), name='index_tasks'),
+    path('', Index.as_view(), name='index_tasks'),
     path('create/', views.CreateTask.as_view(), name='create_task'),
+    path('bulk/', views.BulkTasks.as_view(), name='bulk_tasks'),
     path('<int:pk>/update/', views.UpdateTask.as_view(), name='update_task'),
     path('<int:pk>/delete/', views.DeleteTask.as_view(), name='delete_task'),
-    path('<int:pk>/', views.ShowTask.as_view(), name='show_task'),
+    path('<int:pk>/', Show.as_view(), name='show_task'),
+    path('autocomplete/users/', views.AutocompleteUsers.as_view(),
+         name='autocomplete_users'),
+    path('autocomplete/labels/', views.AutocompleteLabels.as_view(),
+         name='autocomplete_labels'),
 ]
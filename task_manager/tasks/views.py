@@ -1,22 +1,37 @@
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction
+from django.db.models import Q
 from django.forms.forms import BaseForm
+from django.http import HttpResponse, JsonResponse
+from django.shortcuts import redirect
 
 from django.contrib import messages
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib.auth.mixins import UserPassesTestMixin
 
+from django.contrib.auth import get_user_model
+
+from django.views import View
 from django.views.generic import CreateView, UpdateView, DeleteView
 from django.views.generic.detail import DetailView
 
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from django.utils.translation import gettext_lazy as _
 
 from django_filters.views import FilterView
 
-from .models import Task
-from .forms import TaskForm
+from .models import Task, TaskEvent
+from ..labels.models import Label
+from ..statuses.models import Status
+from .forms import TaskForm, BulkTaskForm
+from . import bulk, export, fragments, history
 from .filters import TasksFilter
 
-from task_manager.mixin import NoAuthMixin, NoPermissionMixin
+from task_manager.mixin import (NoAuthMixin, NoPermissionMixin,
+                                ConditionalGetMixin, KeysetPaginationMixin,
+                                AsyncListMixin, AsyncDetailMixin,
+                                SaveUniqueMixin)
 
 
 class IsAuthorTask(UserPassesTestMixin):
@@ -28,25 +43,154 @@ class IsAuthorTask(UserPassesTestMixin):
         return self.request.user == task.author
 
 
-class IndexTasks(NoPermissionMixin, NoAuthMixin, FilterView):
+class IndexTasks(NoPermissionMixin, NoAuthMixin, ConditionalGetMixin,
+                 KeysetPaginationMixin, FilterView):
     model = Task
     template_name = 'tasks/index_tasks.html'
+    context_object_name = 'tasks'
     filterset_class = TasksFilter
+    watermark_models = (Task, Status, Label, get_user_model())
+    # session, user, versions, the rows and three cold choices caches
+    query_budget = 7
+    use_replica = True
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('export')
+        if export_format in export.FORMATS:
+            return export.export_response(self.get_export_queryset(),
+                                          export_format)
+        return super().get(request, *args, **kwargs)
+
+    def get_keyset(self) -> tuple:
+        return self.filterset.get_keyset()
+
+    def get_export_queryset(self):
+        filterset = self.get_filterset(self.get_filterset_class())
+        if not filterset.is_valid():
+            return filterset.queryset.none()
+        return filterset.qs.order_by(*filterset.get_ordering())
+
+    def get_queryset(self):
+        return Task.objects.for_list()
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         context['messages'] = messages.get_messages(self.request)
+        context['bulk_form'] = BulkTaskForm()
+        context['task_rows'] = fragments.render_rows(context['tasks'])
 
         return context
 
 
-class CreateTask(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
-                 CreateView):
+class AsyncIndexTasks(AsyncListMixin, IndexTasks):
+    async def get(self, request, *args, **kwargs):
+        export_format = request.GET.get('export')
+        if export_format in export.FORMATS:
+            tasks = await sync_to_async(self.get_export_queryset)()
+            return export.export_response(tasks, export_format,
+                                          asynchronous=True)
+        return await super().get(request, *args, **kwargs)
+
+    def get_object_list(self):
+        self.filterset = self.get_filterset(self.get_filterset_class())
+        if not self.filterset.is_bound or self.filterset.is_valid() \
+                or not self.get_strict():
+            return self.filterset.qs
+        return self.filterset.queryset.none()
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(filter=self.filterset, **kwargs)
+
+
+class BulkTasks(NoPermissionMixin, NoAuthMixin, View):
+    """
+    Apply one change to many tasks: the posted ids or, with `select_all`,
+    everything the TasksFilter in the query string selects.
+    """
+    http_method_names = ['post']
+
+    def post(self, request, *args, **kwargs):
+        form = BulkTaskForm(request.POST)
+        if not form.is_valid():
+            for errors in form.errors.values():
+                messages.error(request, errors[0])
+            return self.back()
+
+        data = form.cleaned_data
+        if data['select_all']:
+            # An invalid value would be dropped, selecting every task.
+            filterset = TasksFilter(request.GET, request=request)
+            if not filterset.is_valid():
+                messages.error(request, _('The filter is invalid, no tasks '
+                                          'were changed.'))
+                return self.back()
+            tasks = filterset.qs
+        else:
+            tasks = Task.objects.filter(pk__in=data['ids'])
+
+        getattr(self, f"do_{data['action']}")(tasks, data)
+        return self.back()
+
+    def do_status(self, tasks, data):
+        count = bulk.set_relation(tasks, 'status_id', data['status'].pk,
+                                  actor=self.request.user)
+        self.changed(count)
+
+    def do_executor(self, tasks, data):
+        executor = data['executor']
+        count = bulk.set_relation(tasks, 'executor_id',
+                                  executor.pk if executor else None,
+                                  actor=self.request.user)
+        self.changed(count)
+
+    def do_add_labels(self, tasks, data):
+        count = tasks.count()
+        bulk.add_labels(tasks, data['labels'], actor=self.request.user)
+        self.changed(count)
+
+    def do_remove_labels(self, tasks, data):
+        count = tasks.count()
+        bulk.remove_labels(tasks, data['labels'], actor=self.request.user)
+        self.changed(count)
+
+    def do_delete(self, tasks, data):
+        if tasks.exclude(author=self.request.user).exists():
+            messages.error(self.request, IsAuthorTask.error_message)
+            return
+        count = bulk.delete_tasks(tasks, actor=self.request.user)
+        messages.success(self.request, _('Tasks deleted: %(count)s') %
+                         {'count': count})
+
+    def changed(self, count: int):
+        messages.success(self.request, _('Tasks changed: %(count)s') %
+                         {'count': count})
+
+    def back(self) -> HttpResponse:
+        query = self.request.GET.urlencode()
+        return redirect(f"{reverse('index_tasks')}?{query}")
+
+
+class RecordHistoryMixin:
+    """Append the changes of the saved form to the task history."""
+    event_kind = TaskEvent.Kind.CHANGED
+
+    def form_valid(self, form: BaseForm):
+        with transaction.atomic():
+            response = super().form_valid(form)
+            history.record(self.event_kind,
+                           [(self.object.pk, history.form_changes(form))],
+                           actor=self.request.user)
+        return response
+
+
+class CreateTask(NoPermissionMixin, NoAuthMixin, SaveUniqueMixin,
+                 RecordHistoryMixin, SuccessMessageMixin, CreateView):
     model = Task
     form_class = TaskForm
     template_name = 'tasks/create_task.html'
     success_url = reverse_lazy('index_tasks')
     success_message = _('Task successfully created')
+    event_kind = TaskEvent.Kind.CREATED
 
     def form_valid(self, form: BaseForm):
         form.instance.author = self.request.user
@@ -54,8 +198,8 @@ class CreateTask(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
         return super().form_valid(form)
 
 
-class UpdateTask(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
-                 UpdateView):
+class UpdateTask(NoPermissionMixin, NoAuthMixin, SaveUniqueMixin,
+                 RecordHistoryMixin, SuccessMessageMixin, UpdateView):
     model = Task
     form_class = TaskForm
     template_name = 'tasks/update_task.html'
@@ -70,8 +214,105 @@ class DeleteTask(NoPermissionMixin, NoAuthMixin, IsAuthorTask,
     success_url = reverse_lazy('index_tasks')
     success_message = _('Task deleted successfully')
 
+    def form_valid(self, form: BaseForm):
+        with transaction.atomic():
+            history.record(TaskEvent.Kind.DELETED,
+                           [(self.object.pk,
+                             history.deleted(self.object.name))],
+                           actor=self.request.user)
+            return super().form_valid(form)
+
 
-class ShowTask(NoPermissionMixin, NoAuthMixin, DetailView):
+class ShowTask(NoPermissionMixin, NoAuthMixin, ConditionalGetMixin,
+               KeysetPaginationMixin, DetailView):
+    """A task and a page of its history, paginated by `events`."""
     model = Task
     template_name = 'tasks/show_task.html'
     context_object_name = 'task'
+    watermark_models = (Task, Status, Label, get_user_model())
+    # session, user, versions, the task, its labels, the events and
+    # three cold choices caches
+    query_budget = 9
+    use_replica = True
+    paginate_by = 20
+    keyset_field = 'created_at'
+    cursor_kwarg = 'events'
+
+    def get_queryset(self):
+        return Task.objects.for_detail()
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        query, cut = self.keyset_query(history.timeline(self.object),
+                                       self.paginate_by)
+        _paginator, page, events, _is_paginated = cut(list(query))
+        context['events_page'] = page
+        context['events'] = history.describe(events)
+        return context
+
+
+class AsyncShowTask(AsyncDetailMixin, ShowTask):
+    pass
+
+
+class AutocompleteView(NoPermissionMixin, NoAuthMixin, View):
+    """
+    JSON prefix search for select widgets: {"results": [{id, text}]}.
+
+    Rows are matched with `istartswith` on indexed columns and cut by
+    `limit` without ORDER BY, so the database stops at the first matches.
+    On Postgres the query is bounded by AUTOCOMPLETE_TIMEOUT_MS.
+    """
+    model = None
+    search_fields = ()
+    limit = 20
+    # session, user, the search and the Postgres statement timeout
+    query_budget = 4
+    max_length = 150
+
+    def get_queryset(self):
+        """The `model` rows, with just the columns searched."""
+        return self.model._default_manager.only('id', *self.search_fields)
+
+    def get_text(self, obj) -> str:
+        return str(obj)
+
+    def search(self, term: str):
+        condition = Q()
+        for field in self.search_fields:
+            condition |= Q(**{f'{field}__istartswith': term})
+        queryset = self.get_queryset().filter(condition)[:self.limit]
+
+        if connection.vendor != 'postgresql':
+            return list(queryset)
+        timeout = getattr(settings, 'AUTOCOMPLETE_TIMEOUT_MS', 200)
+        try:
+            with transaction.atomic():
+                with connection.cursor() as cursor:
+                    cursor.execute('SET LOCAL statement_timeout = %s',
+                                   [timeout])
+                return list(queryset)
+        except DatabaseError:
+            return []
+
+    def get(self, request, *args, **kwargs):
+        term = request.GET.get('q', '').strip()[:self.max_length]
+        rows = self.search(term) if term else []
+        results = sorted(
+            ({'id': obj.pk, 'text': self.get_text(obj)} for obj in rows),
+            key=lambda item: item['text'].lower(),
+        )
+        return JsonResponse({'results': results})
+
+
+class AutocompleteUsers(AutocompleteView):
+    model = get_user_model()
+    search_fields = ('username', 'first_name', 'last_name')
+
+    def get_text(self, obj) -> str:
+        return str(obj) or obj.username
+
+
+class AutocompleteLabels(AutocompleteView):
+    model = Label
+    search_fields = ('name',)
@@ -1,6 +1,27 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connections
 from django.test import TestCase, Client
 from django.test.utils import override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.sessions.models import Session
+from task_manager import metrics, routers
+from task_manager.choices import get_choices
+from task_manager.benchmark.runner import compare
+from task_manager.labels.models import Label
+from task_manager.statuses.models import Status
+from task_manager.tasks import bulk
+from task_manager.tasks.models import Task, TaskDay
+from task_manager.statuses.views import IndexStatuses
+from task_manager.views import IndexView
 
 
 class InitialTests(TestCase):
@@ -30,6 +51,51 @@ class InitialTests(TestCase):
         self.assertIn('Log In', content)
         self.assertIn('Sign up', content)
 
+    def test_dashboard(self):
+        status = Status.objects.create(name='Dashboard status')
+        label = Label.objects.create(name='Dashboard label')
+        for number in range(3):
+            task = Task.objects.create(name=f'Dashboard {number}',
+                                       status=status, author=self.user,
+                                       executor=self.user)
+            task.labels.add(label)
+        Task.objects.get(name='Dashboard 1').labels.add(
+            Label.objects.create(name='Second label')
+        )
+        Label.objects.create(name='Unused label')
+        Task.objects.get(name='Dashboard 0').delete()
+
+        self.client.force_login(self.user)
+        # user, watermark, statuses, labels, executors and days
+        with self.assertNumQueries(6):
+            response = self.client.get('/')
+        context = response.context
+        self.assertEqual([(row.name, row.tasks_count)
+                          for row in context['statuses']],
+                         [('Dashboard status', 2)])
+        self.assertEqual([(row.name, row.tasks_count)
+                          for row in context['labels']],
+                         [('Dashboard label', 2), ('Second label', 1)])
+        with mock.patch.object(IndexView, 'top_labels', 1):
+            self.assertEqual(len(self.client.get('/').context['labels']), 1)
+        self.assertEqual([row.assigned_tasks_count
+                          for row in context['executors']], [2])
+        self.assertEqual([row.tasks_count for row in context['days']], [2])
+
+        response = self.client.get('/', headers={
+            'If-None-Match': response['ETag'],
+        })
+        self.assertEqual(response.status_code, 304)
+
+        bulk.delete_tasks(Task.objects.filter(name='Dashboard 1'))
+        self.assertEqual(TaskDay.objects.get().tasks_count, 1)
+        TaskDay.objects.update(tasks_count=10)
+        call_command('rebuild_stats', stdout=StringIO())
+        self.assertEqual(TaskDay.objects.get().tasks_count, 1)
+
+        self.client.logout()
+        self.assertNotIn('statuses', self.client.get('/').context)
+
     def test_login(self):
         response = self.client.get('/login/')
         status_code = response.status_code
@@ -73,3 +139,214 @@ class InitialTests(TestCase):
         self.assertEqual(status_code, 200)
         content = response.content.decode()
         self.assertIn('Please enter a correct username and password.', content)
+
+
+@override_settings(METRICS_TOKEN='secret')
+class MetricsTests(TestCase):
+
+    def setUp(self):
+        metrics.reset()
+        self.client = Client(headers={'Authorization': 'Bearer secret'})
+        self.client.force_login(self.user)
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='metrics')
+
+    def test_server_timing(self):
+        response = self.client.get('/statuses/')
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="\d+ queries", '
+                                 r'render;dur=[\d.]+, total;dur=[\d.]+$')
+
+    def test_metrics(self):
+        self.client.get('/statuses/')
+        self.client.get('/statuses/')
+        self.client.get('/labels/')
+        totals = metrics.snapshot()
+        self.assertEqual(totals['index_statuses']['requests'], 2)
+        self.assertGreater(totals['index_statuses']['queries'], 0)
+        self.assertGreater(totals['index_labels']['render_seconds'], 0)
+
+        response = self.client.get('/metrics')
+        self.assertEqual(response['Content-Type'],
+                         'text/plain; version=0.0.4')
+        content = response.content.decode()
+        self.assertIn('# TYPE task_manager_queries_total counter', content)
+        self.assertIn('task_manager_requests_total{view="index_statuses"} 2',
+                      content)
+
+        self.assertEqual(Client().get('/metrics').status_code, 404)
+        self.assertEqual(self.client.get(
+            '/metrics', headers={'Authorization': 'Bearer wrong'}
+        ).status_code, 404)
+        with override_settings(METRICS_TOKEN=''):
+            self.assertEqual(Client().get('/metrics').status_code, 404)
+            with override_settings(DEBUG=True):
+                self.assertEqual(Client().get('/metrics').status_code, 200)
+
+    def test_pool_metrics(self):
+        content = self.client.get('/metrics').content.decode()
+        self.assertNotIn('task_manager_db_pool_', content)
+
+        stats = {'default': {'pool_max': 4, 'pool_size': 3}}
+        with mock.patch.object(metrics, 'pool_stats', return_value=stats):
+            content = self.client.get('/metrics').content.decode()
+        self.assertIn('# TYPE task_manager_db_pool_size gauge', content)
+        self.assertIn('task_manager_db_pool_size{database="default"} 3',
+                      content)
+        self.assertIn('task_manager_db_pool_requests_queued_total'
+                      '{database="default"} 0', content)
+
+    def test_query_budget(self):
+        self.client.get('/statuses/')
+        with mock.patch.object(IndexStatuses, 'query_budget', 1):
+            with self.assertRaisesMessage(
+                metrics.QueryBudgetExceeded, 'its budget is 1'
+            ):
+                self.client.get('/statuses/')
+
+            with override_settings(QUERY_BUDGET_ENFORCE=False), \
+                    self.assertLogs('task_manager.metrics', 'WARNING'):
+                response = self.client.get('/statuses/')
+            self.assertEqual(response.status_code, 200)
+
+
+@skipUnless('default' in metrics.pooled_aliases(),
+            'needs a Postgres DATABASE_URL and DB_POOL=1')
+class PoolTests(TestCase):
+
+    def test_concurrent_queries_share_the_pool(self):
+        max_size = settings.DB_POOL_OPTIONS['max_size']
+
+        def query(_number):
+            try:
+                with connections['default'].cursor() as cursor:
+                    cursor.execute('SELECT pg_sleep(0.05)')
+            finally:
+                # Gives the connection back to the pool.
+                connections.close_all()
+
+        with ThreadPoolExecutor(max_workers=max_size * 3) as executor:
+            list(executor.map(query, range(max_size * 6)))
+
+        stats = metrics.pool_stats()['default']
+        self.assertLessEqual(stats['pool_size'], max_size)
+        self.assertGreater(stats.get('requests_queued', 0), 0)
+        self.assertEqual(stats.get('requests_errors', 0), 0)
+
+    @skipUnless(settings.CONN_HEALTH_CHECKS, 'needs CONN_HEALTH_CHECKS')
+    def test_pool_checks_connections(self):
+        from psycopg_pool import ConnectionPool
+
+        pool = settings.DATABASES['default']['OPTIONS']['pool']
+        self.assertIs(pool['check'], ConnectionPool.check_connection)
+
+
+class BenchmarkTests(TestCase):
+    SIZES = ['--users', '20', '--statuses', '3', '--labels', '10',
+             '--tasks', '60']
+
+    def seed(self, *args):
+        call_command('seed_benchmark', *self.SIZES, *args, stdout=StringIO())
+        return list(Task.objects.order_by('pk').values_list(
+            'name', 'status__name', 'author__username', 'labels__name'
+        ))
+
+    def test_seed_is_reproducible(self):
+        first = self.seed()
+        self.assertEqual(Task.objects.count(), 60)
+        self.assertEqual(get_user_model().objects.count(), 20)
+        self.assertEqual(first, self.seed('--flush'))
+        self.assertNotEqual(first, self.seed('--flush', '--seed', '1'))
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_run_benchmark(self):
+        self.seed()
+        with TemporaryDirectory() as directory:
+            path = Path(directory) / 'results.json'
+            call_command('run_benchmark', '--iterations', '2',
+                         '--warmup', '0', '--output', str(path),
+                         stderr=StringIO())
+            results = json.loads(path.read_text())
+
+        self.assertEqual(results['meta']['rows']['tasks'], 60)
+        urls = results['urls']
+        for url in ('/tasks/', '/tasks/?export=csv', '/users/', '/labels/',
+                    '/statuses/', '/metrics'):
+            self.assertEqual(urls[url]['status'], 200, url)
+        self.assertNotIn('/tasks/bulk/', urls)
+        task_url = next(url for url, result in urls.items()
+                        if result['name'] == 'show_task')
+        self.assertEqual(urls[task_url]['status'], 200)
+        self.assertGreater(urls['/tasks/']['queries'], 0)
+        self.assertLessEqual(urls['/tasks/']['p50_ms'],
+                             urls['/tasks/']['p99_ms'])
+
+        slower = json.loads(json.dumps(results))
+        slower['urls']['/tasks/']['queries'] += 1
+        slower['urls']['/users/']['p95_ms'] += 1000
+        regressions = compare(results, slower, tolerance=0.2)
+        self.assertEqual(len(regressions), 2)
+        self.assertEqual(compare(results, results, tolerance=0.2), [])
+
+
+@override_settings(DATABASE_REPLICAS=['default'], REPLICA_PIN_SECONDS=60)
+class ReplicaTests(TestCase):
+    # The test database stands in for the replica: the router's choice is
+    # what is checked.
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = get_user_model().objects.create_user(username='replica')
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def replica_reads(self, method, url, **kwargs) -> bool:
+        """Whether the request read from a replica."""
+        with mock.patch.object(routers, 'choice',
+                               return_value='default') as choice:
+            getattr(self.client, method)(url, **kwargs)
+        return choice.called
+
+    def test_read_views_use_replica(self):
+        for url in ('/tasks/', '/statuses/', '/labels/', '/users/'):
+            self.assertTrue(self.replica_reads('get', url), url)
+        self.assertFalse(self.replica_reads('get', '/tasks/create/'))
+
+    def test_pinned_after_write(self):
+        self.assertFalse(self.replica_reads(
+            'post', '/statuses/create/', data={'name': 'Pinned'}
+        ))
+        self.assertFalse(self.replica_reads('get', '/statuses/'))
+
+        with override_settings(REPLICA_PIN_SECONDS=0):
+            self.client.post('/statuses/create/', data={'name': 'Unpinned'})
+        self.assertTrue(self.replica_reads('get', '/statuses/'))
+
+    def test_router(self):
+        router = routers.ReplicaRouter()
+        self.assertIsNone(router.db_for_read(Task))
+        with routers.request_state():
+            routers.use_replica()
+            self.assertEqual(router.db_for_read(Task), 'default')
+            self.assertIsNone(router.db_for_read(Session))
+            self.assertEqual(router.db_for_write(Task), 'default')
+        self.assertIsNone(router.db_for_read(Task))
+        self.assertFalse(router.allow_migrate('default', 'tasks'))
+
+    @override_settings(DATABASE_REPLICAS=['missing'])
+    def test_choices_read_primary(self):
+        cache.clear()
+        with routers.request_state():
+            routers.use_replica()
+            self.assertEqual(routers.current_replica(), 'missing')
+            self.assertIn((self.user.pk, str(self.user)),
+                          get_choices('users'))
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_no_replicas(self):
+        self.assertFalse(self.replica_reads('get', '/tasks/'))
+        self.client.post('/statuses/create/', data={'name': 'Primary'})
+        self.assertNotIn(routers.PIN_SESSION_KEY, self.client.session)
@@ -17,6 +17,7 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 from task_manager import views
+from task_manager.metrics import metrics_view
 
 
 urlpatterns = [
@@ -28,4 +29,6 @@ urlpatterns = [
     path('statuses/', include('task_manager.statuses.urls')),
     path('tasks/', include('task_manager.tasks.urls')),
     path('labels/', include('task_manager.labels.urls')),
+    path('api/', include('task_manager.api.urls')),
+    path('metrics', metrics_view, name='metrics'),
 ]
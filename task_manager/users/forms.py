@@ -1,27 +1,58 @@
 from django import forms
 from django.contrib.auth import get_user_model
-from django.contrib.auth.forms import UserCreationForm
-
-from string import ascii_lowercase, ascii_uppercase, digits
+from django.contrib.auth.forms import SetPasswordMixin, UserCreationForm
 
 from django.utils.translation import gettext_lazy as _
 
+from .validators import validate_username
 
-class CreateUserForm(UserCreationForm):
 
-    class Meta:
-        model = get_user_model()
-        fields = ('first_name', 'last_name',
-                  'username', 'password1', 'password2')
+FIELDS = ('first_name', 'last_name', 'username', 'password1', 'password2')
 
-    def clean_username(self):
-        good_symbols = '@.+-_' + ascii_lowercase + \
-                       ascii_uppercase + digits
 
+class UsernameMixin:
+
+    def clean_username(self):
         username = self.cleaned_data['username']
-        for symbol in username:
-            if symbol not in good_symbols:
-                raise forms.ValidationError(
-                    _('''The username must contain only letters,
-                    numbers and the symbols @/./+/-/_.'''))
+        validate_username(username)
         return username
+
+
+class CreateUserForm(UsernameMixin, UserCreationForm):
+
+    class Meta:
+        model = get_user_model()
+        fields = FIELDS
+
+
+class UpdateUserForm(UsernameMixin, SetPasswordMixin, forms.ModelForm):
+    """The profile form: the password is hashed only if a new one is given."""
+    password1, password2 = SetPasswordMixin.create_password_fields()
+    password1.required = password2.required = False
+    password1.help_text = _('Leave both passwords empty to keep the '
+                            'current one.')
+
+    class Meta:
+        model = get_user_model()
+        fields = FIELDS
+
+    def clean(self):
+        password1 = self.cleaned_data.get('password1')
+        password2 = self.cleaned_data.get('password2')
+        if (password1 or password2) and password1 != password2:
+            self.add_error('password2', self.error_messages[
+                'password_mismatch'
+            ])
+        return super().clean()
+
+    def _post_clean(self):
+        super()._post_clean()
+        self.validate_password_for_user(self.instance)
+
+    def save(self, commit=True):
+        user = super().save(commit=False)
+        if self.cleaned_data.get('password1'):
+            return self.set_password_and_save(user, commit=commit)
+        if commit:
+            user.save()
+        return user
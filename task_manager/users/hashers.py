@@ -0,0 +1,13 @@
+from django.conf import settings
+from django.contrib.auth import hashers
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """
+    Django's PBKDF2 hasher with settings.PBKDF2_ITERATIONS rounds. Hashes
+    of another count are rehashed at the next login.
+    """
+
+    @property
+    def iterations(self) -> int:
+        return settings.PBKDF2_ITERATIONS or super().iterations
@@ -0,0 +1,57 @@
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+
+
+class Command(BaseCommand):
+    help = ('Time registrations through the sign-up form with the '
+            'configured password hasher; the users are rolled back.')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--count', type=int, default=20)
+        parser.add_argument(
+            '--iterations', type=int, nargs='+',
+            help='PBKDF2 rounds to compare (default: PBKDF2_ITERATIONS).',
+        )
+
+    def handle(self, *args, **options):
+        self.client = Client()
+        self.url = reverse('create_user')
+        hosts = [*settings.ALLOWED_HOSTS, 'testserver']
+        rounds = options['iterations'] or [settings.PBKDF2_ITERATIONS]
+        for iterations in rounds:
+            with override_settings(PBKDF2_ITERATIONS=iterations,
+                                   ALLOWED_HOSTS=hosts):
+                rate = self.run(options['count'])
+                self.stdout.write('{}: {:.1f} registrations/s over {}'.format(
+                    self.hasher_name(), rate, options['count']))
+
+    @staticmethod
+    def hasher_name() -> str:
+        hasher = get_hasher()
+        if hasattr(hasher, 'iterations'):
+            return f'{hasher.algorithm} {hasher.iterations}'
+        return hasher.algorithm
+
+    def run(self, count: int) -> float:
+        """Registrations a second, in a transaction that is rolled back."""
+        with transaction.atomic():
+            start = perf_counter()
+            for number in range(count):
+                response = self.client.post(self.url, {
+                    'username': f'bench_registration_{number}',
+                    'password1': 'bench', 'password2': 'bench',
+                })
+                if response.status_code != 302:
+                    raise CommandError(
+                        f'{self.url} returned {response.status_code}.'
+                    )
+            elapsed = perf_counter() - start
+            transaction.set_rollback(True)
+        return count / elapsed
@@ -0,0 +1,41 @@
+from django.db import migrations
+
+import task_manager.indexes
+
+
+INDEXES = [
+    task_manager.indexes.PrefixIndex(fields=[column],
+                                     name=f'user_{column}_prefix_idx')
+    for column in ('username', 'first_name', 'last_name')
+]
+
+
+def create_indexes(apps, schema_editor):
+    model = apps.get_model('users', 'User')
+    for index in INDEXES:
+        schema_editor.add_index(model, index)
+
+
+def drop_indexes(apps, schema_editor):
+    # SQLite table rebuilds of older migration states dropped them.
+    for index in INDEXES:
+        schema_editor.execute(f'DROP INDEX IF EXISTS {index.name};')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.RunPython(create_indexes, drop_indexes),
+            ],
+            state_operations=[
+                migrations.AddIndex(model_name='user', index=index)
+                for index in INDEXES
+            ],
+        ),
+    ]
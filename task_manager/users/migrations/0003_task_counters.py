@@ -0,0 +1,23 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_prefix_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='assigned_tasks_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Assigned tasks'),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='authored_tasks_count',
+            field=models.IntegerField(default=0, editable=False, verbose_name='Authored tasks'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 18:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0003_task_counters'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='Date of change'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.15 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('users', '0004_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['-assigned_tasks_count'], name='user_assigned_tasks_idx'),
+        ),
+    ]
@@ -1,7 +1,35 @@
 from django.contrib.auth.models import AbstractUser
+from django.db import models
+from django.utils.translation import gettext_lazy as _
 
+from task_manager.indexes import PrefixIndex
+from task_manager.models import CountersMixin
 
-class User(AbstractUser):
+
+class User(CountersMixin, AbstractUser):
+    updated_at = models.DateTimeField(auto_now=True,
+                                      verbose_name=_('Date of change'))
+    # Maintained by task_manager.tasks.counters.
+    counter_fields = ('authored_tasks_count', 'assigned_tasks_count')
+    authored_tasks_count = models.IntegerField(
+        default=0, editable=False, verbose_name=_('Authored tasks')
+    )
+    assigned_tasks_count = models.IntegerField(
+        default=0, editable=False, verbose_name=_('Assigned tasks')
+    )
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # The user autocomplete.
+            PrefixIndex(fields=['username'], name='user_username_prefix_idx'),
+            PrefixIndex(fields=['first_name'],
+                        name='user_first_name_prefix_idx'),
+            PrefixIndex(fields=['last_name'],
+                        name='user_last_name_prefix_idx'),
+            # The busiest executors of the dashboard.
+            models.Index(fields=['-assigned_tasks_count'],
+                         name='user_assigned_tasks_idx'),
+        ]
 
     def __str__(self):
         return self.get_full_name()
@@ -1,6 +1,15 @@
+from io import StringIO
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.test import TestCase, Client
 from django.test.utils import override_settings
 from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+
+from .validators import validate_username
+from .views import IndexIndex
 
 
 class UsersTests(TestCase):
@@ -123,3 +132,70 @@ class UsersTests(TestCase):
         self.assertNotIn('utest1', content)
         self.assertIn('Log In', content)
         self.assertRedirects(response_redirect, '/users/', 302, 200)
+
+    def test_users_pagination(self):
+        with mock.patch.object(IndexIndex, 'paginate_by', 1):
+            response = self.client.get('/users/')
+            content = response.content.decode()
+            self.assertIn('utest1', content)
+            self.assertNotIn('utest2', content)
+
+            page = response.context['page_obj']
+            response = self.client.get(f'/users/?{page.next_query()}')
+            content = response.content.decode()
+            self.assertNotIn('utest1', content)
+            self.assertIn('utest2', content)
+            self.assertIn('Previous', content)
+
+    def test_update_user_without_password(self):
+        self.client.login(username="utest2", password="ptest")
+        user_id = get_user_model().objects.get(username='utest2').id
+        with mock.patch.object(get_user_model(), 'set_password') as hashing:
+            response_redirect = self.client.post(f'/users/{user_id}/update/',
+                                                 {"username": "utest20",
+                                                  "first_name": "Renamed"})
+        hashing.assert_not_called()
+        self.assertRedirects(response_redirect, '/users/', 302, 200)
+        user = get_user_model().objects.get(id=user_id)
+        self.assertEqual(user.first_name, 'Renamed')
+        self.assertTrue(user.check_password('ptest'))
+        # The session survives, the password did not change.
+        response = self.client.get(f'/users/{user_id}/update/')
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.post(f'/users/{user_id}/update/',
+                                    {"username": "utest20",
+                                     "password1": "pnew"})
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('The two password fields didn', response.content
+                      .decode())
+        self.assertTrue(get_user_model().objects.get(id=user_id)
+                        .check_password('ptest'))
+
+    def test_username_validator(self):
+        for username in ('user', 'a.b@c+d-e_f', 'User_42'):
+            validate_username(username)
+        for username in ('user#', 'user name', 'usér', 'user\n', ''):
+            with self.assertRaises(ValidationError, msg=username):
+                validate_username(username)
+
+    def test_pbkdf2_iterations(self):
+        with override_settings(PBKDF2_ITERATIONS=1000):
+            encoded = make_password('ptest')
+        self.assertTrue(encoded.startswith('pbkdf2_sha256$1000$'))
+
+        # A hash of another count still checks and is upgraded.
+        with override_settings(PBKDF2_ITERATIONS=2000):
+            setter = mock.Mock()
+            self.assertTrue(check_password('ptest', encoded, setter))
+        setter.assert_called_once_with('ptest')
+
+    def test_bench_registration(self):
+        out = StringIO()
+        call_command('bench_registration', '--count', '2',
+                     '--iterations', '1000', '2000', stdout=out)
+        lines = out.getvalue().splitlines()
+        self.assertEqual(len(lines), 2)
+        self.assertTrue(lines[0].startswith('pbkdf2_sha256 1000: '))
+        self.assertIn('registrations/s over 2', lines[1])
+        self.assertEqual(get_user_model().objects.count(), 2)
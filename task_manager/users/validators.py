@@ -0,0 +1,17 @@
+import re
+
+from django.core.validators import RegexValidator
+from django.utils.deconstruct import deconstructible
+from django.utils.translation import gettext_lazy as _
+
+
+@deconstructible
+class UsernameValidator(RegexValidator):
+    """ASCII letters, digits and @/./+/-/_, checked by one compiled regex."""
+    regex = r'^[\w.@+-]+\Z'
+    flags = re.ASCII
+    message = _('The username must contain only letters, numbers and the '
+                'symbols @/./+/-/_.')
+
+
+validate_username = UsernameValidator()
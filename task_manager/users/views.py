@@ -13,16 +13,23 @@ from django.views.generic.list import ListView
 from django.utils.translation import gettext_lazy as _
 from django.urls import reverse_lazy
 
-from .forms import CreateUserForm
+from .forms import CreateUserForm, UpdateUserForm
 
-from task_manager.mixin import NoAuthMixin, NoPermissionMixin
+from task_manager.mixin import (NoAuthMixin, NoPermissionMixin,
+                                ConditionalGetMixin, KeysetPaginationMixin,
+                                AsyncListMixin)
 
 
 MESS_PERMISSION = _("You do not have permission to modify another user.")
 
 
-class IndexIndex(ListView):
+class IndexIndex(ConditionalGetMixin, KeysetPaginationMixin, ListView):
     model = get_user_model()
+    watermark_models = (get_user_model(),)
+    # session, user, versions and the rows
+    query_budget = 4
+    use_replica = True
+    keyset_field = 'date_joined'
     template_name = 'users/index.html'
     context_object_name = 'users'
 
@@ -32,6 +39,10 @@ class IndexIndex(ListView):
         return context
 
 
+class AsyncIndexIndex(AsyncListMixin, IndexIndex):
+    login_required = False
+
+
 class CreateUser(SuccessMessageMixin, CreateView):
     form_class = CreateUserForm
     template_name = 'users/create_user.html'
@@ -41,7 +52,7 @@ class CreateUser(SuccessMessageMixin, CreateView):
 
 class UpdateUser(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
                  UpdateView):
-    form_class = CreateUserForm
+    form_class = UpdateUserForm
     template_name = 'users/update_user.html'
     success_url = reverse_lazy('index_users')
     success_message = _('User successfully changed')
@@ -61,12 +72,6 @@ class UpdateUser(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
         user = self.request.user
         return user
 
-    def form_valid(self, form):
-        password = form.cleaned_data.get('password1')
-        if password:
-            self.object.set_password(password)
-        return super().form_valid(form)
-
 
 class DeleteUser(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
                  DeleteView):
@@ -89,15 +94,18 @@ class DeleteUser(NoPermissionMixin, NoAuthMixin, SuccessMessageMixin,
         user = self.request.user
         return user
 
-    def post(self,
-             request: HttpRequest,
-             *args: str,
-             **kwargs: Any) -> HttpResponse:
+    def form_valid(self, form):
+        user = self.object
+        if user.authored_tasks_count or user.assigned_tasks_count:
+            return self.in_use()
         try:
-            return super().post(request, *args, **kwargs)
+            return super().form_valid(form)
         except ProtectedError:
-            messages.add_message(
-                request, messages.ERROR,
-                _("The user cannot be deleted because it is in use.")
-            )
-            return redirect(reverse_lazy('index_users'))
+            return self.in_use()
+
+    def in_use(self) -> HttpResponse:
+        messages.add_message(
+            self.request, messages.ERROR,
+            _("The user cannot be deleted because it is in use.")
+        )
+        return redirect(reverse_lazy('index_users'))
@@ -0,0 +1,60 @@
+"""
+A version number per model, moved by every write to its table.
+
+Conditional GETs hash the versions of the models a page shows into its
+ETag: a primary key lookup whatever the size of the tables. Saves and
+deletes move them through signals; writes that skip those (queryset
+updates, bulk_create, muted task signals) call `bump` themselves, the
+way they keep the counters.
+"""
+from django.conf import settings
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+
+from .models import Version
+
+
+VERSIONED = ('tasks.Task', 'tasks.TaskDay', 'statuses.Status',
+             'labels.Label', settings.AUTH_USER_MODEL)
+
+
+def key(model) -> str:
+    return model._meta.label_lower
+
+
+def bump(*models):
+    """Move the versions of `models`, adding the rows first seen."""
+    keys = {key(model) for model in models}
+    rows = Version.objects.filter(pk__in=keys)
+    if rows.update(version=F('version') + 1) < len(keys):
+        Version.objects.bulk_create([Version(pk=name) for name in keys],
+                                    ignore_conflicts=True)
+        rows.update(version=F('version') + 1)
+
+
+def versions_query(models):
+    """(table, version) rows of `models`, for the sync and async ORM."""
+    return Version.objects.filter(pk__in=[key(model) for model in models]) \
+        .values_list('table', 'version')
+
+
+def versions(models) -> list:
+    return sorted(versions_query(models))
+
+
+def bump_sender(sender, **kwargs):
+    bump(sender)
+
+
+def bump_tasks(sender, action, **kwargs):
+    if action.startswith('post_'):
+        bump(sender.task.field.related_model)
+
+
+for model in VERSIONED:
+    post_save.connect(bump_sender, sender=model,
+                      dispatch_uid=f'versions_save_{model}')
+    post_delete.connect(bump_sender, sender=model,
+                        dispatch_uid=f'versions_delete_{model}')
+m2m_changed.connect(bump_tasks, sender='tasks.Task_labels',
+                    dispatch_uid='versions_task_labels')
@@ -1,25 +1,61 @@
-from django.shortcuts import render
-from django.views import View
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
+from django.views.generic import TemplateView
 from django.contrib import messages
 
 from django.contrib.auth.views import LoginView, LogoutView
 from django.contrib.messages.views import SuccessMessageMixin
 
 from .forms import LoginUserForm
+from .labels.models import Label
+from .mixin import ConditionalGetMixin
+from .statuses.models import Status
+from .tasks.models import TaskDay
+
+
+class IndexView(ConditionalGetMixin, TemplateView):
+    """
+    The home page, with a dashboard of the tasks for signed in users.
 
+    The numbers are the maintained counters and TaskDay rows, so the page
+    reads a row per status, top label, top executor and day, whatever the
+    number of tasks or labels.
+    """
+    template_name = 'index.html'
+    watermark_models = (Status, Label, get_user_model(), TaskDay)
+    # session, user, versions and the four dashboard tables
+    query_budget = 7
+    use_replica = True
+    top_labels = 10
+    top_executors = 10
+    days = 30
 
-class IndexView(View):
-    def get(self, request, *args, **kwargs):
-        messages_ = messages.get_messages(request)
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['messages'] = messages.get_messages(self.request)
+        if self.request.user.is_authenticated:
+            context.update(self.get_dashboard())
+        return context
 
-        return render(
-            request,
-            'index.html',
-            context={
-                'messages': messages_
-            }
-        )
+    def get_dashboard(self) -> dict:
+        first_day = timezone.localdate() - timedelta(days=self.days - 1)
+        return {
+            'statuses': Status.objects.only('id', 'name', 'tasks_count')
+            .order_by('name'),
+            'labels': Label.objects.filter(tasks_count__gt=0)
+            .only('id', 'name', 'tasks_count')
+            .order_by('-tasks_count')[:self.top_labels],
+            'executors': get_user_model().objects.filter(
+                assigned_tasks_count__gt=0
+            ).only('id', 'first_name', 'last_name', 'assigned_tasks_count')
+            .order_by('-assigned_tasks_count')[:self.top_executors],
+            'days': TaskDay.objects.filter(day__gte=first_day,
+                                           tasks_count__gt=0)
+            .order_by('day'),
+        }
 
 
 class LoginUser(SuccessMessageMixin, LoginView):